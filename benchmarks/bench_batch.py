@@ -0,0 +1,58 @@
+"""Rows per second of a scoring rule evaluated row by row and as a batch.
+
+The rule mixes arithmetic, comparisons and an if/else whose branch differs
+between rows. Row by row runs evaluate once per row in a fresh environment,
+over the first ROWS / 50 rows only. Run with `python -m benchmarks.bench_batch
+[ROWS]`, ROWS defaults to 1_000_000.
+"""
+
+import random
+import sys
+import time
+
+from sloth.batch import evaluate_batch
+from sloth.evaluation import evaluate
+from sloth.ffi import from_python
+from sloth.numeric import HAVE_NUMPY, NumArray
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+RULE = """
+var cost = price * quantity - discount;
+if (cost > 1000) { cost - cost / 10 } else { cost + shipping * 2 }
+"""
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    random.seed(0)
+    columns = {
+        "price": [random.randrange(1, 200) for _ in range(rows)],
+        "quantity": [random.randrange(1, 20) for _ in range(rows)],
+        "discount": [random.randrange(0, 50) for _ in range(rows)],
+        "shipping": [random.randrange(0, 30) for _ in range(rows)],
+    }
+    program = Parser.from_input(RULE).parse_program()
+    print(f"NumPy {'installed' if HAVE_NUMPY else 'missing'}, {rows} rows")
+
+    sample = rows // 50
+    start = time.perf_counter()
+    expected = []
+    for row in range(sample):
+        store = {name: from_python(values[row]) for name, values in columns.items()}
+        expected.append(evaluate(program, Environment(store)).value)
+    per_row = sample / (time.perf_counter() - start)
+
+    if HAVE_NUMPY:
+        columns = {name: NumArray.from_values(col) for name, col in columns.items()}
+    start = time.perf_counter()
+    result = evaluate_batch(program, columns)
+    batched = rows / (time.perf_counter() - start)
+
+    assert result.tolist()[:sample] == expected
+    print(f"row by row  {per_row:12,.0f} rows/s")
+    print(f"batch       {batched:12,.0f} rows/s  {batched / per_row:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Latency of a short script run cold, through the client and in process.
+
+Cold runs start a Python process that imports the runtime, then parses and
+evaluates the prelude and the script. Client runs start `python -m sloth.client`,
+which only imports the standard library, against a warm daemon. Warm runs reuse
+a single connection. Run with `python -m benchmarks.bench_daemon [RUNS]`, RUNS defaults
+to 50. Memoization is off everywhere, so warm runs still evaluate fib.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from sloth.client import Client
+from sloth.daemon import Daemon
+from sloth.memo import MEMO
+
+PRELUDE = "var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };"
+
+SOURCE = "fib(12)"
+
+COLD = f"""
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parser import Parser
+MEMO.configure(enabled=False)
+env = Environment()
+print(evaluate(Parser.from_input({PRELUDE + SOURCE!r}).parse_program(), env).inspect())
+"""
+
+
+def percentiles(samples: list[float]) -> str:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    return f"p50 {p50 * 1e3:8.2f} ms  p90 {p90 * 1e3:8.2f} ms  p99 {p99 * 1e3:8.2f} ms"
+
+
+def measure(runs: int, run) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    MEMO.configure(enabled=False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sloth.sock")
+        server = Daemon(PRELUDE).bind(path)
+        thread = server.serve_in_background()
+
+        def cold() -> None:
+            command = [sys.executable, "-c", COLD]
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+        def client() -> None:
+            command = [sys.executable, "-m", "sloth.client", path, SOURCE]
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+        with Client(path) as connection:
+            assert connection.evaluate(SOURCE) == {"value": "144"}
+            rows = (
+                ("cold process", measure(runs, cold)),
+                ("client process", measure(runs, client)),
+                ("warm connection", measure(runs, lambda: connection.evaluate(SOURCE))),
+            )
+
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    for name, samples in rows:
+        print(f"{name:<16} {percentiles(samples)}")
+
+
+if __name__ == "__main__":
+    main()
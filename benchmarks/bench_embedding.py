@@ -0,0 +1,71 @@
+"""Cost of a request parsing its program every time against a compiled one.
+
+Each request scores an order with a rule of a few dozen lines, once by parsing
+and evaluating the source in a fresh environment, once by running a program
+compiled up front. Run with `python -m benchmarks.bench_embedding [REQUESTS]`,
+REQUESTS defaults to 5000.
+"""
+
+import sys
+import time
+
+from sloth import Interpreter
+from sloth.evaluation import evaluate
+from sloth.ffi import from_python
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+RULE = """
+var clamp = func(x, low, high) {
+    if (x < low) { low } else { if (x > high) { high } else { x } }
+};
+var discount = func(total, loyal) {
+    if (loyal) { total / 10 } else { if (total > 500) { total / 20 } else { 0 } }
+};
+var shipping = func(weight, express) {
+    var base = weight * 3 + 5;
+    if (express) { base * 2 } else { base }
+};
+var score = func(total, weight, loyal, express) {
+    var cost = total - discount(total, loyal) + shipping(weight, express);
+    clamp(cost, 0, 10000)
+};
+score(total, weight, loyal, express)
+"""
+
+
+def bindings(i: int) -> dict:
+    return {
+        "total": i % 900,
+        "weight": i % 13,
+        "loyal": i % 3 == 0,
+        "express": i % 2 == 0,
+    }
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    MEMO.configure(enabled=False)
+    program = Interpreter().compile(RULE)
+    assert program.run(bindings(7)).value == 7 + 26
+
+    start = time.perf_counter()
+    for i in range(requests):
+        store = {name: from_python(value) for name, value in bindings(i).items()}
+        parsed = Parser.from_input(RULE).parse_program()
+        evaluate(parsed, Environment(store))
+    reparse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(requests):
+        program.run(bindings(i))
+    compiled = time.perf_counter() - start
+
+    for name, elapsed in (("parse every time", reparse), ("compiled", compiled)):
+        print(f"{name:<17} {elapsed / requests * 1e6:8.1f} us/request")
+    print(f"speedup {reparse / compiled:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Counting with `while`, `for` and tail recursion.
+
+Run with `python -m benchmarks.bench_loops [COUNT]`, COUNT defaults to one
+million; `python -m benchmarks.bench_loops 10000000` counts to ten million.
+"""
+
+import sys
+import time
+
+from sloth.evaluation import evaluate
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+PROGRAMS = {
+    "while": "var i = 0; while (i < {n}) {{ var i = i + 1 }}; i",
+    "for": "var i = 0; for (x in range(0, {n})) {{ var i = i + 1 }}; i",
+    "recursion": """
+        var count = func(n, acc) {{
+            if (n == 0) {{ acc }} else {{ count(n - 1, acc + 1) }}
+        }};
+        count({n}, 0)
+    """,
+}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for name, source in PROGRAMS.items():
+        program = Parser.from_input(source.format(n=count)).parse_program()
+
+        start = time.perf_counter()
+        result = evaluate(program, Environment())
+        elapsed = time.perf_counter() - start
+
+        assert result.value == count
+        per_iteration = elapsed / count * 1e6
+        print(f"{name:<10} {elapsed:6.2f} s  {per_iteration:.2f} us per iteration")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Element-wise arithmetic on NumArray against the same work done in Sloth.
+
+Run with `python -m benchmarks.bench_numeric`. Both programs compute
+sum(2 * x + 1) over SIZE integers, once with a recursive Sloth loop and once
+with NumArray operators.
+"""
+
+import timeit
+
+from sloth.evaluation import evaluate
+from sloth.numeric import HAVE_NUMPY
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+SIZE = 2_000
+
+RECURSIVE = f"""
+var loop = func(n, acc) {{
+    if (n == 0) {{ acc }} else {{ loop(n - 1, acc + 2 * n + 1) }}
+}};
+loop({SIZE}, 0);
+"""
+
+VECTORIZED = f"sum(numrange(1, {SIZE + 1}) * 2 + 1)"
+
+
+def _time(source: str, runs: int) -> float:
+    program = Parser.from_input(source).parse_program()
+    return timeit.timeit(lambda: evaluate(program, Environment()), number=runs) / runs
+
+
+def main() -> None:
+    recursive = _time(RECURSIVE, 5)
+    vectorized = _time(VECTORIZED, 50)
+    backend = "numpy" if HAVE_NUMPY else "array module"
+    print(f"recursive loop:   {recursive * 1e3:.2f} ms")
+    print(f"numarray ({backend}): {vectorized * 1e3:.3f} ms")
+    print(f"speedup:          {recursive / vectorized:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
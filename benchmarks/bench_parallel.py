@@ -0,0 +1,57 @@
+"""Scaling of `parallel_map` on a pure recursive workload.
+
+Computes fib(N) for COUNT elements with `map` and with `parallel_map` on 1, 2,
+4, ... workers up to the number of CPUs, memoization is turned off so every
+call is evaluated. Run with
+`python -m benchmarks.bench_parallel [COUNT] [N]`, defaults to 32 and 18.
+"""
+
+import os
+import sys
+import time
+
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parallel import WORKERS
+from sloth.parser import Parser
+
+SOURCE = """
+var fib = func(n) {{ if (n < 2) {{ n }} else {{ fib(n - 1) + fib(n - 2) }} }};
+{mapper}(func(i) {{ fib({n}) }}, collect(range(0, {count})))
+"""
+
+
+def run(mapper: str, count: int, n: int) -> float:
+    source = SOURCE.format(mapper=mapper, count=count, n=n)
+    program = Parser.from_input(source).parse_program()
+
+    start = time.perf_counter()
+    result = evaluate(program, Environment())
+    elapsed = time.perf_counter() - start
+
+    assert len(result.elements) == count, result.inspect()
+    return elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 18
+    MEMO.configure(enabled=False)
+
+    sequential = run("map", count, n)
+    print(f"map             {sequential:6.2f} s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        WORKERS.resize(workers)
+        run("parallel_map", workers, 2)  # Start the workers outside the timing
+        elapsed = run("parallel_map", count, n)
+        speedup = sequential / elapsed
+        print(f"{workers:>3} workers     {elapsed:6.2f} s  {speedup:5.2f}x")
+        workers *= 2
+    WORKERS.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Cost of `return` in the evaluators.
+
+Times a program where every call ends in a `return`, some of them from inside
+an `if` block, so the return value is passed up to the function boundary.
+Compare evaluator versions by running the same file on both checkouts. Run
+with `python -m benchmarks.bench_returns [CALLS]`, CALLS defaults to 300.
+"""
+
+import sys
+import timeit
+
+from sloth.evaluation import evaluate
+from sloth.machine import StackEvaluator
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+SOURCE = """
+var clamp = func(n) {
+    if (n > 200) { return 200; };
+    if (n < 0) { return 0; };
+    return n;
+};
+var sum = func(n, acc) {
+    return if (n == 0) { acc } else { sum(n - 1, acc + clamp(n)) };
+};
+sum(%d, 0);
+"""
+
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    MEMO.configure(enabled=False)
+    program = Parser.from_input(SOURCE % calls).parse_program()
+    evaluators = (("evaluate", evaluate), ("stack", StackEvaluator().evaluate))
+
+    runs = 20
+    for name, evaluator in evaluators:
+        seconds = min(
+            timeit.repeat(
+                lambda: evaluator(program, Environment()), number=runs, repeat=5
+            )
+        )
+        print(f"{name:<9} {seconds / runs / (calls * 2) * 1e6:6.2f} us per return")
+
+
+if __name__ == "__main__":
+    main()
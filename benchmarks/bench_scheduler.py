@@ -0,0 +1,44 @@
+"""Independent top-level statements, sequential against evaluate_parallel.
+
+The program binds COUNT results of fib(N) that do not depend on each other and
+then adds them up. Run with `python -m benchmarks.bench_scheduler [COUNT] [N]`,
+defaults to 8 and 18. Memoization is turned off so every call is evaluated.
+"""
+
+import sys
+import time
+
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parallel import WORKERS
+from sloth.parser import Parser
+from sloth.scheduler import evaluate_parallel
+
+FIB = "var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };"
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 18
+    MEMO.configure(enabled=False)
+
+    # Identifiers can not hold digits, spell the index with letters instead
+    letters = str.maketrans("0123456789", "abcdefghij")
+    names = ["r" + str(i).translate(letters) for i in range(count)]
+    source = FIB + "".join(f"var {name} = fib({n});" for name in names)
+    source += " + ".join(names)
+    program = Parser.from_input(source).parse_program()
+    WORKERS.start()
+
+    print(f"{WORKERS.max_workers} workers")
+    for name, run in (("sequential", evaluate), ("parallel", evaluate_parallel)):
+        start = time.perf_counter()
+        result = run(program, Environment())
+        elapsed = time.perf_counter() - start
+        print(f"{name:<10} {elapsed:6.2f} s  result {result.inspect()}")
+    WORKERS.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Peak memory of a map/filter/sum pipeline, streamed against collected.
+
+Run with `python -m benchmarks.bench_streams [COUNT]`, COUNT defaults to
+200000 since tracing allocations slows evaluation down a lot. The streamed
+peak should stay flat as COUNT grows while the collected one holds every
+element at once.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from sloth.evaluation import evaluate
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+PIPELINE = """
+    var even = func(x) {{ x / 2 * 2 == x }};
+    var square = func(x) {{ x * x }};
+    sum({source}(map(square, filter(even, range(0, {n})))))
+"""
+
+PROGRAMS = {
+    "streamed": PIPELINE.replace("{source}", ""),
+    "collected": PIPELINE.replace("{source}", "collect"),
+}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    expected = sum(x * x for x in range(0, count, 2))
+    for name, source in PROGRAMS.items():
+        program = Parser.from_input(source.format(n=count)).parse_program()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = evaluate(program, Environment())
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert result.value == expected
+        print(f"{name:<10} {elapsed:6.2f} s  peak {peak / 2**20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
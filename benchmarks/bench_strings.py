@@ -0,0 +1,78 @@
+"""Building a 10 MB string from small pieces, then consuming a big text.
+
+Run with `python -m benchmarks.bench_strings`. The first Sloth program appends
+a PIECE_LENGTH piece at a time until the result reaches TARGET bytes, once with
+rope concatenation and once with every concatenation copied eagerly, which is
+how `+` on strings used to work. The second one drops a TOKEN_LENGTH prefix of
+a TEXT_LENGTH text at a time, with views and with copied slices.
+"""
+
+import time
+
+from sloth import objects
+from sloth.evaluation import evaluate
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+TARGET = 10 * 1024 * 1024
+PIECE_LENGTH = 4096
+
+PROGRAM = f"""
+var piece = "{'x' * PIECE_LENGTH}";
+var build = func(text, n) {{
+    if (n == 0) {{ text }} else {{ build(text + piece, n - 1) }}
+}};
+len(build("", {TARGET // PIECE_LENGTH}));
+"""
+
+TEXT_LENGTH = 1024 * 1024
+TOKEN_LENGTH = 16
+TOKENS = 5_000
+
+TOKENIZE = f"""
+var text = "{'y' * TEXT_LENGTH}";
+var skip = func(rest, n) {{
+    if (n == 0) {{ rest }} else {{ skip(slice(rest, {TOKEN_LENGTH}, len(rest)), n - 1) }}
+}};
+len(skip(text, {TOKENS}));
+"""
+
+
+def _run(source: str, limit: str, value: int, expected: int) -> float:
+    """Time :source: with objects.:limit: set to :value:"""
+    program = Parser.from_input(source).parse_program()
+    saved = getattr(objects, limit)
+    setattr(objects, limit, value)
+
+    start = time.perf_counter()
+    try:
+        result = evaluate(program, Environment())
+    finally:
+        setattr(objects, limit, saved)
+    elapsed = time.perf_counter() - start
+
+    assert result.value == expected
+    return elapsed
+
+
+def main() -> None:
+    rope_limit = objects.ROPE_MIN_LENGTH
+    rope = _run(PROGRAM, "ROPE_MIN_LENGTH", rope_limit, TARGET)
+    eager = _run(PROGRAM, "ROPE_MIN_LENGTH", TARGET + 1, TARGET)
+    print(f"pieces:           {TARGET // PIECE_LENGTH} x {PIECE_LENGTH} bytes")
+    print(f"rope:             {rope * 1e3:.0f} ms")
+    print(f"eager copies:     {eager * 1e3:.0f} ms")
+    print(f"speedup:          {eager / rope:.1f}x")
+
+    left = TEXT_LENGTH - TOKENS * TOKEN_LENGTH
+    view_limit = objects.VIEW_MIN_LENGTH
+    views = _run(TOKENIZE, "VIEW_MIN_LENGTH", view_limit, left)
+    copies = _run(TOKENIZE, "VIEW_MIN_LENGTH", TEXT_LENGTH + 1, left)
+    print(f"slices:           {TOKENS} of a {TEXT_LENGTH} byte text")
+    print(f"views:            {views * 1e3:.0f} ms")
+    print(f"copied slices:    {copies * 1e3:.0f} ms")
+    print(f"speedup:          {copies / views:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Throughput of an I/O bound script against the number of concurrent tasks.
+
+Every job sleeps 20 ms and reads a small file, jobs are spawned WIDTH at a time
+and awaited before the next batch. Run with `python -m benchmarks.bench_tasks
+[JOBS]`, JOBS defaults to 128 and should be a multiple of 64.
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+
+from sloth.machine import StackEvaluator
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+SOURCE = """
+var job = func(i) {{ sleep(20); len(read("{path}")) }};
+var total = 0; var i = 0;
+while (i < {jobs}) {{
+    var batch = [];
+    for (j in range(0, {width})) {{ var batch = push(batch, spawn job(i + j)) }};
+    for (t in batch) {{ var total = total + await t }};
+    var i = i + {width}
+}};
+total
+"""
+
+WIDTHS = (1, 4, 16, 64)
+
+
+def main() -> None:
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 128
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+        file.write("sloth\n" * 100)
+        file.flush()
+
+        for width in WIDTHS:
+            source = SOURCE.format(path=file.name, jobs=jobs, width=width)
+            program = Parser.from_input(source).parse_program()
+            evaluator = StackEvaluator()
+
+            start = time.perf_counter()
+            result = asyncio.run(evaluator.evaluate_async(program, Environment()))
+            elapsed = time.perf_counter() - start
+
+            assert result.value == 600 * jobs
+            print(f"width {width:<3} {elapsed:6.2f} s  {jobs / elapsed:8.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Evaluations per second against the number of threads.
+
+Every thread evaluates the same parsed program, calling fib(N) defined once in
+a shared environment, each in a scope of its own. Throughput only scales on a
+free-threaded build with the GIL disabled, e.g. `python3.13t -X gil=0`. Run
+with `python -m benchmarks.bench_threads [RUNS] [N]`, defaults to 32 and 15.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
+
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO
+from sloth.objects import Environment
+from sloth.parser import Parser
+
+FIB = "var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };"
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    MEMO.configure(enabled=False)
+
+    shared = Environment()
+    evaluate(Parser.from_input(FIB).parse_program(), shared)
+    program = Parser.from_input(f"var result = fib({n}); result").parse_program()
+    expected = evaluate(program, shared.child())
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil else 'disabled'}, {os.cpu_count()} CPUs")
+
+    baseline = None
+    threads = 1
+    while threads <= max(os.cpu_count() or 1, 4):
+        with ThreadPoolExecutor(threads) as pool:
+            start = time.perf_counter()
+            results = list(
+                pool.map(lambda _: evaluate(program, shared.child()), range(runs))
+            )
+            elapsed = time.perf_counter() - start
+
+        assert all(result == expected for result in results)
+        throughput = runs / elapsed
+        baseline = baseline or throughput
+        speedup = throughput / baseline
+        print(f"{threads:>3} threads  {throughput:8.1f} runs/s  {speedup:5.2f}x")
+        threads *= 2
+
+
+if __name__ == "__main__":
+    main()
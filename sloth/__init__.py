@@ -0,0 +1,17 @@
+"""Sloth, a toy programming language.
+
+The embedding API is importable from here, loaded on first access so that
+modules like :mod:`sloth.client` start without the interpreter.
+"""
+
+from typing import Any
+
+__all__ = ["CompileError", "CompiledProgram", "Interpreter"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        from . import interpreter
+
+        return getattr(interpreter, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
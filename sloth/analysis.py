@@ -0,0 +1,160 @@
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Iterator
+
+from .ast import (
+    BlockStatement,
+    CallExpression,
+    ForStatement,
+    FunctionLiteral,
+    Identifier,
+    Node,
+    VarStatement,
+)
+
+
+def child_nodes(node: Node) -> Iterator[Node]:
+    """Direct sub-nodes of :node:, in source order"""
+    if not is_dataclass(node):
+        return
+
+    for f in fields(node):
+        value = getattr(node, f.name)
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            # Hash literals keep (key, value) pairs
+            for child in item if isinstance(item, tuple) else (item,):
+                if is_dataclass(child) and hasattr(child, "token_literal"):
+                    yield child
+
+
+def free_variables(func: FunctionLiteral) -> frozenset[str]:
+    """Names :func: reads that are neither its arguments nor its own locals.
+
+    Statements are walked in order, so `var x = x + 1` still reads the outer `x`.
+    """
+    bound = {ident.value for ident in func.arguments}
+    free: set[str] = set()
+
+    for stmt in func.body.body:
+        _collect_free(stmt, bound, free)
+    return frozenset(free)
+
+
+def _collect_free(node: Node, bound: set[str], free: set[str]) -> None:
+    match node:
+        case Identifier():
+            if node.value not in bound:
+                free.add(node.value)
+        case FunctionLiteral():
+            free.update(name for name in node.free_variables if name not in bound)
+        case ForStatement():
+            _collect_free(node.iterable, bound, free)
+            bound.add(node.name.value)
+            _collect_free(node.body, bound, free)
+        case VarStatement():
+            name = node.name_value()
+            if isinstance(node.value, FunctionLiteral):
+                # The body runs after the binding, so it may refer to itself
+                bound.add(name)
+                _collect_free(node.value, bound, free)
+            else:
+                _collect_free(node.value, bound, free)
+                bound.add(name)
+        case _:
+            for child in child_nodes(node):
+                _collect_free(child, bound, free)
+
+
+@dataclass(frozen=True, slots=True)
+class Callees:
+    """Functions a body calls directly.
+
+    :free: are callee names resolved outside the function, :dynamic: is set when
+    the body calls one of its own arguments or locals, which can be anything.
+    """
+
+    free: frozenset[str]
+    dynamic: bool
+
+
+def callees(arguments: list[Identifier], body: BlockStatement) -> Callees:
+    bound = {ident.value for ident in arguments}
+    free: set[str] = set()
+    dynamic = _collect_callees(body, bound, free)
+    return Callees(frozenset(free), dynamic)
+
+
+def _collect_callees(node: Node, bound: set[str], free: set[str]) -> bool:
+    match node:
+        case FunctionLiteral():
+            # Only runs when called, and then it is a call to a local
+            return False
+        case VarStatement():
+            dynamic = _collect_callees(node.value, bound, free)
+            bound.add(node.name_value())
+            return dynamic
+        case ForStatement():
+            dynamic = _collect_callees(node.iterable, bound, free)
+            bound.add(node.name.value)
+            return _collect_callees(node.body, bound, free) or dynamic
+        case CallExpression(function=Identifier(value=name)):
+            dynamic = name in bound
+            if not dynamic:
+                free.add(name)
+        case CallExpression():
+            dynamic = True
+        case _:
+            dynamic = False
+
+    for child in child_nodes(node):
+        dynamic = _collect_callees(child, bound, free) or dynamic
+    return dynamic
+
+
+def statement_reads(stmt: Node) -> frozenset[str]:
+    """Names :stmt: reads from the scope it runs in"""
+    free: set[str] = set()
+    _collect_free(stmt, set(), free)
+    return frozenset(free)
+
+
+def statement_writes(stmt: Node) -> frozenset[str]:
+    """Names :stmt: binds in the scope it runs in, function bodies excluded"""
+    return frozenset(_collect_writes(stmt))
+
+
+def enclose(func: FunctionLiteral) -> None:
+    """Record the names :func: binds on every function literal nested in it.
+
+    A nested closure created before one of these bindings must not resolve the
+    name to a global of the same name.
+    """
+    writes = {ident.value for ident in func.arguments}
+    for stmt in func.body.body:
+        writes.update(_collect_writes(stmt))
+
+    for literal in _nested_literals(func.body):
+        # Set once right after parsing, the literal is frozen otherwise
+        object.__setattr__(
+            literal, "enclosing_writes", literal.enclosing_writes | writes
+        )
+
+
+def _nested_literals(node: Node) -> Iterator[FunctionLiteral]:
+    for child in child_nodes(node):
+        if isinstance(child, FunctionLiteral):
+            yield child
+        yield from _nested_literals(child)
+
+
+def _collect_writes(node: Node) -> Iterator[str]:
+    match node:
+        case FunctionLiteral():
+            return
+        case VarStatement():
+            yield node.name_value()
+        case ForStatement():
+            yield node.name.value
+
+    for child in child_nodes(node):
+        yield from _collect_writes(child)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Protocol, runtime_checkable
 from .token import Token
 
@@ -40,6 +41,13 @@ class IntegerLiteral(Expression):
     token: Token
     value: int
 
+    @cached_property
+    def boxed(self):
+        """Runtime value of the literal, boxed once and shared by every evaluation"""
+        from .objects import make_integer
+
+        return make_integer(self.value)
+
     def token_literal(self) -> str:
         return self.token.literal
 
@@ -55,6 +63,13 @@ class StringLiteral(Expression):
     token: Token
     value: str
 
+    @cached_property
+    def boxed(self):
+        """Runtime value of the literal, boxed once and shared by every evaluation"""
+        from .objects import make_string
+
+        return make_string(self.value)
+
     def token_literal(self) -> str:
         return self.token.literal
 
@@ -120,6 +135,10 @@ class FunctionLiteral(Expression):
     token: Token
     arguments: list[Identifier]
     body: BlockStatement
+    # Names the enclosing functions bind, filled in by the parser
+    enclosing_writes: frozenset[str] = field(
+        default=frozenset(), compare=False, repr=False
+    )
 
     def token_literal(self) -> str:
         return self.token.literal
@@ -132,6 +151,12 @@ class FunctionLiteral(Expression):
 
         return f"{self.token_literal()}({arg_strs}) {{ {self.body} }}"
 
+    @cached_property
+    def free_variables(self) -> frozenset[str]:
+        from .analysis import free_variables
+
+        return free_variables(self)
+
 
 @dataclass(frozen=True)
 class CallExpression(Expression):
@@ -145,6 +170,12 @@ class CallExpression(Expression):
 
         return self.function.value
 
+    @cached_property
+    def inline_cache(self):
+        from .inline_cache import InlineCache
+
+        return InlineCache()
+
     def token_literal(self) -> str:
         return self.token.literal
 
@@ -265,3 +296,112 @@ class InfixExpression(Expression):
 
     def __str__(self) -> str:
         return f"({self.left} {self.operator} {self.right})"
+
+
+@dataclass(frozen=True)
+class ArrayLiteral(Expression):
+    token: Token
+    elements: list[Expression]
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def expression_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"[{', '.join(map(str, self.elements))}]"
+
+
+@dataclass(frozen=True)
+class IndexExpression(Expression):
+    token: Token
+    left: Expression
+    index: Expression
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def expression_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"({self.left}[{self.index}])"
+
+
+@dataclass(frozen=True)
+class HashLiteral(Expression):
+    token: Token
+    pairs: list[tuple[Expression, Expression]]
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def expression_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"{{{', '.join(f'{key}: {value}' for key, value in self.pairs)}}}"
+
+
+@dataclass(frozen=True)
+class SpawnExpression(Expression):
+    token: Token
+    call: CallExpression
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def expression_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"(spawn {self.call})"
+
+
+@dataclass(frozen=True)
+class AwaitExpression(Expression):
+    token: Token
+    value: Expression
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def expression_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"(await {self.value})"
+
+
+@dataclass(frozen=True)
+class WhileStatement(Statement):
+    token: Token
+    condition: Expression
+    body: BlockStatement
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def statement_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"while {self.condition} {{ {self.body} }}"
+
+
+@dataclass(frozen=True)
+class ForStatement(Statement):
+    token: Token
+    name: Identifier
+    iterable: Expression
+    body: BlockStatement
+
+    def token_literal(self) -> str:
+        return self.token.literal
+
+    def statement_node(self):
+        raise NotImplementedError()
+
+    def __str__(self) -> str:
+        return f"for ({self.name} in {self.iterable}) {{ {self.body} }}"
@@ -0,0 +1,544 @@
+"""Evaluate a program over many rows of input bindings at once.
+
+Inputs come as columns, one per name. Integers and booleans are held in NumPy
+arrays when NumPy is installed, otherwise in lists, and arithmetic,
+comparisons and prefix operators run over a whole column at a time. An if/else
+splits the rows by their condition and evaluates each branch over its own rows
+only. Values of other types, and operators that give a Fault for some rows,
+are applied row by row with the operators of the evaluator, so every row gets
+the result evaluate would give it.
+
+Only programs made of bindings and expressions over literals, names, operators
+and if/else are vectorized. Anything else, e.g. a call, is evaluated one row
+at a time, and so is a program with operands the evaluator can not combine.
+"""
+
+from dataclasses import dataclass
+from itertools import compress, repeat
+import operator
+from typing import Any, Callable, Mapping
+
+from .ast import (
+    BlockStatement,
+    BooleanLiteral,
+    Expression,
+    ExpressionStatement,
+    Identifier,
+    IfElseExpression,
+    InfixExpression,
+    IntegerLiteral,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    Statement,
+    StringLiteral,
+    VarStatement,
+)
+from .evaluation import (
+    apply_infix_operator,
+    apply_prefix_operator,
+    evaluate,
+    evaluate_identifier,
+    is_truthy,
+)
+from .ffi import from_python
+from .numeric import NumArray, numpy
+from .objects import (
+    FALSE,
+    NULL,
+    TRUE,
+    Array,
+    Boolean,
+    Environment,
+    Fault,
+    Integer,
+    make_integer,
+)
+
+_INT, _BOOL, _OBJECT = "int", "bool", "object"
+
+_INT64 = 1 << 63
+
+_ARITHMETIC: dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+}
+
+_COMPARISONS: dict[str, Callable[[Any, Any], Any]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_LEAVES = (Identifier, IntegerLiteral, BooleanLiteral, StringLiteral)
+
+
+@dataclass(frozen=True, slots=True)
+class _Column:
+    """Values of an expression over the rows evaluated.
+
+    ``data`` is a list or an array with a value per row, or a single value
+    when it is the same for all of them: an int, a bool, or a Sloth object
+    when ``kind`` is object.
+    """
+
+    kind: str
+    data: Any
+
+    @property
+    def uniform(self) -> bool:
+        return type(self.data) is not list and not _is_array(self.data)
+
+
+@dataclass(frozen=True, slots=True)
+class _Rows:
+    """Rows an expression is evaluated over, with the bindings they see.
+
+    ``rows`` holds the positions of the rows in the batch, None for all of
+    them. Columns in ``scope`` always cover the whole batch.
+    """
+
+    scope: dict[str, _Column]
+    env: Environment
+    rows: Any
+    size: int
+
+    def subset(self, positions: Any) -> "_Rows":
+        rows = positions if self.rows is None else _take(self.rows, positions)
+        return _Rows(self.scope, self.env, rows, len(positions))
+
+
+def evaluate_batch(
+    program: Program, columns: Mapping[str, Any], env: Environment | None = None
+) -> NumArray | Array:
+    """Result of :program: for every row of :columns:, in order.
+
+    Columns are lists, tuples, Arrays or NumArrays of the same length, each
+    row runs with the names of :columns: bound on top of :env:. The results
+    come as a NumArray when all of them are integers that fit in 64 bits,
+    otherwise as an Array, Faults included.
+    """
+    if env is None:
+        env = Environment()
+    batch = {name: _input(values) for name, values in columns.items()}
+    sizes = {len(column.data) for column in batch.values()}
+    if len(sizes) != 1:
+        raise ValueError("evaluate_batch needs columns, all of the same length")
+    size = sizes.pop()
+
+    if _vectorizable_program(program):
+        try:
+            return _vectorized(program, batch, env, size)
+        except NotImplementedError:
+            # Operands evaluate can not combine, maybe only in rows it never
+            # gets to, e.g. after a Fault. Row by row gives the exact outcome.
+            pass
+    return _result(_typed(_row_by_row(program, batch, env, size)), {}, size)
+
+
+def _vectorized(
+    program: Program, batch: dict[str, _Column], env: Environment, size: int
+) -> NumArray | Array:
+    scope = dict(batch)
+    rows = _Rows(scope, env, None, size)
+    faults: dict[int, Fault] = {}
+    result = _Column(_OBJECT, NULL)
+    for stmt in program.statements:
+        match stmt:
+            case VarStatement():
+                column = _evaluate(stmt.value, rows)
+                scope[stmt.name_value()] = column
+                result = _Column(_OBJECT, NULL)
+            case ExpressionStatement():
+                column = result = _evaluate(stmt.expression, rows)
+            case ReturnStatement():
+                column = result = _evaluate(stmt.expression, rows)
+        _record_faults(column, faults, size)
+        if type(stmt) is ReturnStatement:
+            break
+
+    return _result(result, faults, size)
+
+
+def _vectorizable_program(program: Program) -> bool:
+    return bool(program.statements) and all(
+        _vectorizable_statement(stmt) for stmt in program.statements
+    )
+
+
+def _vectorizable_statement(stmt: Statement) -> bool:
+    match stmt:
+        case VarStatement():
+            return _vectorizable(stmt.value)
+        case ExpressionStatement() | ReturnStatement():
+            return _vectorizable(stmt.expression)
+        case _:
+            return False
+
+
+def _vectorizable(node: Expression) -> bool:
+    match node:
+        case _ if isinstance(node, _LEAVES):
+            return True
+        case PrefixExpression():
+            return _vectorizable(node.right)
+        case InfixExpression():
+            return _vectorizable(node.left) and _vectorizable(node.right)
+        case IfElseExpression():
+            return (
+                _vectorizable(node.condition)
+                and _vectorizable_block(node.consequence)
+                and (node.alternative is None or _vectorizable_block(node.alternative))
+            )
+        case _:
+            return False
+
+
+def _vectorizable_block(block: BlockStatement) -> bool:
+    # Statements of a block bind in the enclosing scope, keep to expressions
+    return (
+        len(block.body) == 1
+        and type(block.body[0]) is ExpressionStatement
+        and _vectorizable(block.body[0].expression)
+    )
+
+
+def _row_by_row(
+    program: Program, batch: dict[str, _Column], env: Environment, size: int
+) -> list:
+    names = list(batch)
+    values = [_expand(_objects(batch[name]), size) for name in names]
+    results = []
+    for row in zip(*values) if names else repeat((), size):
+        result = evaluate(program, Environment(dict(zip(names, row)), env))
+        results.append(NULL if result is None else result)
+    return results
+
+
+def _evaluate(node: Expression, rows: _Rows) -> _Column:
+    match node:
+        case Identifier():
+            return _identifier(node, rows)
+        case IntegerLiteral():
+            return _Column(_INT, node.value)
+        case BooleanLiteral():
+            return _Column(_BOOL, node.value)
+        case StringLiteral():
+            return _Column(_OBJECT, node.boxed)
+        case PrefixExpression():
+            return _prefix(node.operator, _evaluate(node.right, rows))
+        case InfixExpression():
+            return _infix_expression(node, rows)
+        case IfElseExpression():
+            return _if_else(node, rows)
+    raise NotImplementedError(f"{type(node)} can not be evaluated in a batch")
+
+
+def _identifier(node: Identifier, rows: _Rows) -> _Column:
+    column = rows.scope.get(node.value)
+    if column is None:
+        return _scalar(evaluate_identifier(node, rows.env))
+    if rows.rows is None or column.uniform:
+        return column
+    return _Column(column.kind, _take(column.data, rows.rows))
+
+
+def _prefix(operator_: str, right: _Column) -> _Column:
+    match operator_, right.kind:
+        case "-", "int":
+            return _infix("-", _Column(_INT, 0), right)
+        case "!", "bool":
+            return _infix("==", right, _Column(_BOOL, False))
+        case "!", "int":
+            return _Column(_BOOL, False)
+
+    def apply(value: Any) -> Any:
+        if type(value) is Fault:
+            return value
+        return apply_prefix_operator(operator_, value)
+
+    values = _objects(right)
+    if type(values) is not list:
+        return _scalar(apply(values))
+    return _typed(list(map(apply, values)))
+
+
+def _infix_expression(node: InfixExpression, rows: _Rows) -> _Column:
+    left = _evaluate(node.left, rows)
+    if left.kind != _OBJECT:
+        return _infix(node.operator, left, _evaluate(node.right, rows))
+    if left.uniform:
+        if type(left.data) is Fault:
+            return left
+        return _infix(node.operator, left, _evaluate(node.right, rows))
+
+    # Like evaluate, the right operand is skipped in rows where the left faulted
+    faults = [i for i, value in enumerate(left.data) if type(value) is Fault]
+    if not faults:
+        return _infix(node.operator, left, _evaluate(node.right, rows))
+    if len(faults) == rows.size:
+        return left
+
+    valid = sorted(set(range(rows.size)) - set(faults))
+    right = _evaluate(node.right, rows.subset(valid))
+    values = _infix(node.operator, _typed(_take(left.data, valid)), right)
+    pieces = [(valid, values), (faults, _Column(_OBJECT, _take(left.data, faults)))]
+    return _merge(pieces, rows.size)
+
+
+def _infix(operator_: str, left: _Column, right: _Column) -> _Column:
+    lhs, rhs = left.data, right.data
+    if left.kind == _INT and right.kind == _INT:
+        comparison = operator_ in _COMPARISONS
+        function = _COMPARISONS[operator_] if comparison else _ARITHMETIC.get(operator_)
+        # Zero divisors give a Fault for their rows, left to the row by row path
+        if function is not None and not (operator_ == "/" and _has_zero(rhs)):
+            if list not in (type(lhs), type(rhs)) and not _fits(operator_, lhs, rhs):
+                lhs, rhs = _to_list(lhs), _to_list(rhs)  # Python ints do not wrap
+            return _Column(_BOOL if comparison else _INT, _apply(function, lhs, rhs))
+
+    elif left.kind == _BOOL and right.kind == _BOOL and operator_ in ("==", "!="):
+        return _Column(_BOOL, _apply(_COMPARISONS[operator_], lhs, rhs))
+
+    def apply(lhs: Any, rhs: Any) -> Any:
+        if type(lhs) is Fault:
+            return lhs
+        if type(rhs) is Fault:
+            return rhs
+        return apply_infix_operator(operator_, lhs, rhs)
+
+    lhs, rhs = _objects(left), _objects(right)
+    if type(lhs) is not list and type(rhs) is not list:
+        return _scalar(apply(lhs, rhs))
+    return _typed(_map(apply, lhs, rhs))
+
+
+def _if_else(node: IfElseExpression, rows: _Rows) -> _Column:
+    condition = _evaluate(node.condition, rows)
+    if condition.uniform:
+        if condition.kind == _OBJECT:
+            if type(condition.data) is Fault:
+                return condition
+            truthy = is_truthy(condition.data)
+        else:
+            truthy = bool(condition.data)
+        return _branch(node.consequence if truthy else node.alternative, rows)
+
+    faults: list[int] = []
+    match condition.kind:
+        case "int":
+            truth = _apply(operator.ne, condition.data, 0)
+        case "bool":
+            truth = condition.data
+        case _:
+            truth = []
+            for position, value in enumerate(condition.data):
+                if type(value) is Fault:
+                    faults.append(position)
+                truth.append(type(value) is not Fault and is_truthy(value))
+
+    if _is_array(truth):
+        consequence, alternative = numpy.flatnonzero(truth), numpy.flatnonzero(~truth)
+    else:
+        consequence = list(compress(range(rows.size), truth))
+        alternative = list(compress(range(rows.size), map(operator.not_, truth)))
+        if faults:
+            alternative = sorted(set(alternative) - set(faults))
+
+    pieces = []
+    branches = ((consequence, node.consequence), (alternative, node.alternative))
+    for positions, branch in branches:
+        if len(positions) == rows.size:
+            return _branch(branch, rows)
+        if len(positions):
+            pieces.append((positions, _branch(branch, rows.subset(positions))))
+    if faults:
+        pieces.append((faults, _Column(_OBJECT, _take(condition.data, faults))))
+    return _merge(pieces, rows.size)
+
+
+def _branch(block: BlockStatement | None, rows: _Rows) -> _Column:
+    if block is None:
+        return _Column(_OBJECT, NULL)
+    return _evaluate(block.body[0].expression, rows)  # type: ignore[attr-defined]
+
+
+def _merge(pieces: list[tuple[Any, _Column]], size: int) -> _Column:
+    kinds = {column.kind for _, column in pieces}
+    kind = kinds.pop() if len(kinds) == 1 else _OBJECT
+
+    if kind != _OBJECT and numpy is not None:
+        if not any(type(column.data) is list for _, column in pieces):
+            out = numpy.empty(size, dtype=numpy.int64 if kind == _INT else bool)
+            for positions, column in pieces:
+                out[positions] = column.data
+            return _Column(kind, out)
+
+    merged: list = [None] * size
+    for positions, column in pieces:
+        data = _objects(column) if kind == _OBJECT else _to_list(column.data)
+        if type(data) is list:
+            for position, value in zip(positions, data):
+                merged[position] = value
+        else:
+            for position in positions:
+                merged[position] = data
+    return _Column(kind, merged)
+
+
+def _record_faults(column: _Column, faults: dict[int, Fault], size: int) -> None:
+    """Rows whose statement gave a Fault end there, like evaluate does"""
+    if column.kind != _OBJECT:
+        return
+    if column.uniform:
+        if type(column.data) is Fault:
+            for position in range(size):
+                faults.setdefault(position, column.data)
+        return
+    for position, value in enumerate(column.data):
+        if type(value) is Fault:
+            faults.setdefault(position, value)
+
+
+def _result(column: _Column, faults: dict[int, Fault], size: int) -> NumArray | Array:
+    if not faults and column.kind == _INT:
+        try:
+            if column.uniform:
+                return NumArray.filled(column.data, size)
+            if _is_array(column.data):
+                return NumArray(column.data)
+            return NumArray.from_values(column.data)
+        except OverflowError:
+            pass
+
+    values = list(_expand(_objects(column), size))
+    for position, fault in faults.items():
+        values[position] = fault
+    return Array.from_iterable(values)
+
+
+def _input(values: Any) -> _Column:
+    match values:
+        case NumArray():
+            data = values.data
+            return _Column(_INT, data if _is_array(data) else list(data))
+        case Array():
+            return _typed(list(values.elements))
+        case list() | tuple():
+            if all(type(value) is int for value in values):
+                return _Column(_INT, _ints(list(values)))
+            if all(type(value) is bool for value in values):
+                return _Column(_BOOL, _bools(list(values)))
+            return _typed([from_python(value) for value in values])
+    if _is_array(values):
+        if values.dtype == bool:
+            return _Column(_BOOL, values)
+        return _Column(_INT, values.astype(numpy.int64, copy=False))
+    raise TypeError(f"{type(values).__name__} can not be used as a column")
+
+
+def _scalar(value: Any) -> _Column:
+    match value:
+        case Integer():
+            return _Column(_INT, value.value)
+        case Boolean():
+            return _Column(_BOOL, value.value)
+        case _:
+            return _Column(_OBJECT, value)
+
+
+def _typed(values: list) -> _Column:
+    """Column of Sloth objects, unboxed when they are all integers or booleans"""
+    if all(type(value) is Integer for value in values):
+        return _Column(_INT, _ints([value.value for value in values]))
+    if all(type(value) is Boolean for value in values):
+        return _Column(_BOOL, _bools([value.value for value in values]))
+    return _Column(_OBJECT, values)
+
+
+def _objects(column: _Column) -> Any:
+    """Sloth objects of :column:, a list or a single one when uniform"""
+    if column.kind == _OBJECT:
+        return column.data
+    box = make_integer if column.kind == _INT else _boolean
+    if column.uniform:
+        return box(column.data)
+    return list(map(box, _to_list(column.data)))
+
+
+def _boolean(value: bool) -> Boolean:
+    return TRUE if value else FALSE
+
+
+def _expand(values: Any, size: int) -> list:
+    return values if type(values) is list else [values] * size
+
+
+def _ints(values: list[int]) -> Any:
+    if numpy is None:
+        return values
+    try:
+        return numpy.array(values, dtype=numpy.int64)
+    except OverflowError:
+        return values
+
+
+def _bools(values: list[bool]) -> Any:
+    return values if numpy is None else numpy.array(values, dtype=bool)
+
+
+def _is_array(data: Any) -> bool:
+    return numpy is not None and type(data) is numpy.ndarray
+
+
+def _to_list(data: Any) -> Any:
+    return data.tolist() if _is_array(data) else data
+
+
+def _take(data: Any, positions: Any) -> Any:
+    if _is_array(data):
+        return data[positions]
+    return [data[position] for position in positions]
+
+
+def _apply(function: Callable[[Any, Any], Any], lhs: Any, rhs: Any) -> Any:
+    """:function: over two operands, each a list, an array or a single value"""
+    if type(lhs) is list or type(rhs) is list:
+        return _map(function, _to_list(lhs), _to_list(rhs))
+    return function(lhs, rhs)
+
+
+def _map(function: Callable[[Any, Any], Any], lhs: Any, rhs: Any) -> list:
+    if type(lhs) is list:
+        return list(map(function, lhs, rhs if type(rhs) is list else repeat(rhs)))
+    return list(map(function, repeat(lhs), rhs))
+
+
+def _has_zero(data: Any) -> bool:
+    if _is_array(data):
+        return bool((data == 0).any())
+    return data == 0 if type(data) is int else 0 in data
+
+
+def _magnitude(data: Any) -> int:
+    if not _is_array(data):
+        return abs(data)
+    if not len(data):
+        return 0
+    return max(abs(int(data.min())), abs(int(data.max())))
+
+
+def _fits(operator_: str, lhs: Any, rhs: Any) -> bool:
+    """Whether 64-bit operations on :lhs: and :rhs: give the exact result"""
+    left, right = _magnitude(lhs), _magnitude(rhs)
+    match operator_:
+        case "+" | "-":
+            return left + right < _INT64
+        case "*":
+            return left * right < _INT64
+        case _:
+            # Operands fit, and the lowest value is never divided by -1
+            return max(left, right) < _INT64
@@ -0,0 +1,504 @@
+import asyncio
+import inspect
+import time
+from inspect import Parameter
+from itertools import islice
+from typing import Any, Awaitable, Callable, Iterator, TextIO
+
+from .ffi import from_python, sloth_type, to_python
+from .numeric import NumArray
+from .objects import (
+    NULL,
+    Array,
+    Builtin,
+    Fault,
+    Function,
+    Hash,
+    Integer,
+    Null,
+    Range,
+    Stream,
+    String,
+    make_integer,
+    make_string,
+)
+
+BUILTINS: dict[str, Builtin] = {}
+
+
+def builtin(
+    name: str,
+    arity: int,
+    pure: bool = False,
+    blocking: bool = False,
+    awaitable: Callable[..., Awaitable[Any]] | None = None,
+):
+    """Register the decorated function as the Sloth builtin :name:.
+
+    A :pure: builtin has no side effects and depends on its arguments only,
+    calls to Sloth functions using it may be memoized. Under evaluate_async a
+    :blocking: builtin runs in a worker thread, or :awaitable: is awaited
+    instead when given.
+    """
+
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        variant = _in_thread(fn) if blocking and awaitable is None else awaitable
+        BUILTINS[name] = Builtin(name, arity, fn, pure, variant)
+        return fn
+
+    return register
+
+
+def _in_thread(fn: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    async def run(*values: Any) -> Any:
+        return await asyncio.to_thread(fn, *values)
+
+    return run
+
+
+def expose(
+    fn: Callable[..., Any] | None = None,
+    *,
+    name: str | None = None,
+    arity: int | None = None,
+    pure: bool = False,
+    blocking: bool = False,
+):
+    """Make the Python callable :fn: available to Sloth.
+
+    Arguments are converted with :func:`sloth.ffi.to_python` and the result
+    with :func:`sloth.ffi.from_python`, exceptions raised by :fn: become
+    Faults. Annotated parameters only accept the matching Sloth type.
+    :arity: defaults to the required positional parameters of :fn:. Set
+    :pure: when :fn: has no side effects and depends on its arguments only,
+    and :blocking: for I/O so evaluate_async runs it in a worker thread. Works
+    as a plain call or as a decorator, with or without arguments.
+    """
+
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        builtin_name = name or fn.__name__
+        parameters = _required_parameters(fn)
+        if arity is not None:
+            count = arity
+        elif parameters is not None:
+            count = len(parameters)
+        else:
+            raise ValueError(f"arity of {fn!r} can not be inferred, pass arity=")
+
+        expected = [sloth_type(p.annotation) for p in parameters or ()]
+
+        def call(*values: Any) -> Any:
+            for value, type_ in zip(values, expected):
+                if type_ is not None and type(value) is not type_:
+                    return Fault(f"{builtin_name} does not support {value.type()}")
+            try:
+                return from_python(fn(*map(to_python, values)))
+            except Exception as e:
+                return Fault(f"{builtin_name}: {e}")
+
+        awaitable = _in_thread(call) if blocking else None
+        BUILTINS[builtin_name] = Builtin(builtin_name, count, call, pure, awaitable)
+        return fn
+
+    return register if fn is None else register(fn)
+
+
+def _required_parameters(fn: Callable[..., Any]) -> list[Parameter] | None:
+    try:
+        parameters = inspect.signature(fn, eval_str=True).parameters.values()
+    except (ValueError, NameError):
+        return None
+
+    if any(p.kind is Parameter.VAR_POSITIONAL for p in parameters):
+        return None
+    positional = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+    return [p for p in parameters if p.kind in positional and p.default is p.empty]
+
+
+def apply(func: Any, values: list) -> Any:
+    """Call a Sloth function or builtin from Python"""
+    from .evaluation import call_function
+
+    match func:
+        case Builtin():
+            if len(values) != func.arity:
+                return Fault(
+                    f"arguments passed {len(values)}, but arguments expected {func.arity}"
+                )
+            return func.fn(*values)
+        case Function():
+            if len(values) != len(func.arguments):
+                return Fault(
+                    f"arguments passed {len(values)}, but arguments expected {func.arguments}"
+                )
+            if func.unboxed:
+                from .unboxed import call_unboxed
+
+                return call_unboxed(func, values)
+            return call_function(func, values)
+        case _:
+            return Fault(f"{func.inspect()} is not a function")
+
+
+def _expect(value: Any, type_: type, builtin_name: str) -> Fault | None:
+    if type(value) is not type_:
+        return Fault(f"{builtin_name} does not support {value.type()}")
+    return None
+
+
+@builtin("len", 1, pure=True)
+def len_(value: Any) -> Integer | Fault:
+    match value:
+        case Array():
+            return make_integer(len(value.elements))
+        case String():
+            return make_integer(value.length)
+        case NumArray():
+            return make_integer(len(value))
+        case Hash():
+            return make_integer(len(value.pairs))
+        case Range():
+            return make_integer(len(value))
+        case _:
+            return Fault(f"len does not support {value.type()}")
+
+
+@builtin("push", 2, pure=True)
+def push(array: Any, value: Any) -> Array | Fault:
+    if fault := _expect(array, Array, "push"):
+        return fault
+    return Array(array.elements.append(value))
+
+
+@builtin("set", 3, pure=True)
+def set_(array: Any, index: Any, value: Any) -> Array | Fault:
+    if fault := _expect(array, Array, "set") or _expect(index, Integer, "set"):
+        return fault
+    if not 0 <= index.value < len(array.elements):
+        return Fault(f"index {index.value} out of range")
+    return Array(array.elements.set(index.value, value))
+
+
+def _lazy(value: Any) -> Iterator[Any] | None:
+    """Elements of a Range or Stream pulled on demand, None for anything else"""
+    if type(value) is Range or type(value) is Stream:
+        return iter(value)
+    return None
+
+
+def _mapped(func: Any, elements: Iterator[Any]) -> Iterator[Any]:
+    for element in elements:
+        if type(element) is Fault:
+            yield element
+            return
+        result = apply(func, [element])
+        yield result
+        if type(result) is Fault:
+            return
+
+
+def _filtered(func: Any, elements: Iterator[Any]) -> Iterator[Any]:
+    from .evaluation import is_truthy
+
+    for element in elements:
+        if type(element) is Fault:
+            yield element
+            return
+        result = apply(func, [element])
+        if type(result) is Fault:
+            yield result
+            return
+        if is_truthy(result):
+            yield element
+
+
+@builtin("map", 2)
+def map_(func: Any, values: Any) -> Array | Stream | Fault:
+    if (elements := _lazy(values)) is not None:
+        return Stream(_mapped(func, elements))
+    if fault := _expect(values, Array, "map"):
+        return fault
+
+    results = []
+    for result in _mapped(func, iter(values.elements)):
+        if type(result) is Fault:
+            return result
+        results.append(result)
+    return Array.from_iterable(results)
+
+
+@builtin("filter", 2)
+def filter_(func: Any, values: Any) -> Array | Stream | Fault:
+    if (elements := _lazy(values)) is not None:
+        return Stream(_filtered(func, elements))
+    if fault := _expect(values, Array, "filter"):
+        return fault
+
+    kept = []
+    for element in _filtered(func, iter(values.elements)):
+        if type(element) is Fault:
+            return element
+        kept.append(element)
+    return Array.from_iterable(kept)
+
+
+@builtin("reduce", 3)
+def reduce_(func: Any, values: Any, initial: Any) -> Any:
+    elements = _lazy(values)
+    if elements is None:
+        if fault := _expect(values, Array, "reduce"):
+            return fault
+        elements = iter(values.elements)
+
+    accumulator = initial
+    for element in elements:
+        if type(element) is Fault:
+            return element
+        accumulator = apply(func, [accumulator, element])
+        if type(accumulator) is Fault:
+            return accumulator
+    return accumulator
+
+
+@builtin("parallel_map", 2)
+def parallel_map(func: Any, values: Any) -> Array | Fault:
+    from .parallel import parallel_map
+
+    return parallel_map(func, values)
+
+
+@builtin("take", 2)
+def take(values: Any, count: Any) -> Array | Range | Stream | Fault:
+    if fault := _expect(count, Integer, "take"):
+        return fault
+
+    size = max(count.value, 0)
+    match values:
+        case Range():
+            return Range(values.start, min(values.stop, values.start + size))
+        case Stream():
+            return Stream(islice(values, size))
+        case Array():
+            return Array.from_iterable(islice(values.elements, size))
+        case _:
+            return Fault(f"take does not support {values.type()}")
+
+
+@builtin("collect", 1)
+def collect(values: Any) -> Array | Fault:
+    if (elements := _lazy(values)) is None:
+        return Fault(f"collect does not support {values.type()}")
+
+    results = []
+    for element in elements:
+        if type(element) is Fault:
+            return element
+        results.append(element)
+    return Array.from_iterable(results)
+
+
+def _read_lines(file: TextIO) -> Iterator[String]:
+    with file:
+        for line in file:
+            yield make_string(line.rstrip("\n"))
+
+
+@builtin("lines", 1)
+def lines(path: Any) -> Stream | Fault:
+    if fault := _expect(path, String, "lines"):
+        return fault
+
+    # Opened right away so a missing file is reported here, not on first pull
+    try:
+        file = open(path.value, encoding="utf-8")
+    except OSError as error:
+        return Fault(f"lines: {error.strerror}: {path.value}")
+    return Stream(_read_lines(file))
+
+
+@builtin("read", 1, blocking=True)
+def read(path: Any) -> String | Fault:
+    if fault := _expect(path, String, "read"):
+        return fault
+
+    try:
+        with open(path.value, encoding="utf-8") as file:
+            return make_string(file.read())
+    except OSError as error:
+        return Fault(f"read: {error.strerror}: {path.value}")
+
+
+async def _sleep_async(milliseconds: Any) -> Any:
+    if fault := _expect(milliseconds, Integer, "sleep"):
+        return fault
+    await asyncio.sleep(max(milliseconds.value, 0) / 1000)
+    return NULL
+
+
+@builtin("sleep", 1, awaitable=_sleep_async)
+def sleep(milliseconds: Any) -> Any:
+    if fault := _expect(milliseconds, Integer, "sleep"):
+        return fault
+    time.sleep(max(milliseconds.value, 0) / 1000)
+    return NULL
+
+
+@builtin("range", 2, pure=True)
+def range_(start: Any, stop: Any) -> Range | Fault:
+    if fault := _expect(start, Integer, "range") or _expect(stop, Integer, "range"):
+        return fault
+    return Range(start.value, stop.value)
+
+
+@builtin("numarray", 1, pure=True)
+def numarray(array: Any) -> NumArray | Fault:
+    if fault := _expect(array, Array, "numarray"):
+        return fault
+    for element in array.elements:
+        if fault := _expect(element, Integer, "numarray"):
+            return fault
+
+    try:
+        return NumArray.from_values(element.value for element in array.elements)
+    except OverflowError:
+        return Fault("numarray elements must fit in 64 bits")
+
+
+@builtin("numrange", 2, pure=True)
+def numrange(start: Any, stop: Any) -> NumArray | Fault:
+    fault = _expect(start, Integer, "numrange") or _expect(stop, Integer, "numrange")
+    if fault:
+        return fault
+    return NumArray.range(start.value, stop.value)
+
+
+@builtin("broadcast", 2, pure=True)
+def broadcast(value: Any, size: Any) -> NumArray | Fault:
+    fault = _expect(value, Integer, "broadcast") or _expect(size, Integer, "broadcast")
+    if fault:
+        return fault
+    return NumArray.filled(value.value, max(size.value, 0))
+
+
+@builtin("sum", 1, pure=True)
+def sum_(value: Any) -> Integer | Fault:
+    match value:
+        case NumArray():
+            return make_integer(value.sum())
+        case Range():
+            # Arithmetic series, no element is produced
+            count = len(value)
+            return make_integer(count * (2 * value.start + count - 1) // 2)
+        case Array() | Stream():
+            elements = value.elements if type(value) is Array else value
+            total = 0
+            for element in elements:
+                if type(element) is Fault:
+                    return element
+                if fault := _expect(element, Integer, "sum"):
+                    return fault
+                total += element.value
+            return make_integer(total)
+        case _:
+            return Fault(f"sum does not support {value.type()}")
+
+
+@builtin("slice", 3, pure=True)
+def slice_(value: Any, start: Any, stop: Any) -> Any:
+    """Elements from :start: up to :stop:, negative indexes count from the end"""
+    if fault := _expect(start, Integer, "slice") or _expect(stop, Integer, "slice"):
+        return fault
+
+    match value:
+        case NumArray() | String():
+            return value.slice(start.value, stop.value)
+        case Array():
+            indexes = range(len(value.elements))[start.value : stop.value]
+            return Array.from_iterable(value.elements[i] for i in indexes)
+        case _:
+            return Fault(f"slice does not support {value.type()}")
+
+
+@builtin("get", 2, pure=True)
+def get(hash_: Any, key: Any) -> Any:
+    if fault := _expect(hash_, Hash, "get") or Hash.key_fault(key):
+        return fault
+    return hash_.pairs.get(key, NULL)
+
+
+@builtin("put", 3, pure=True)
+def put(hash_: Any, key: Any, value: Any) -> Hash | Fault:
+    if fault := _expect(hash_, Hash, "put") or Hash.key_fault(key):
+        return fault
+    return Hash(hash_.pairs.set(key, value))
+
+
+@builtin("del", 2, pure=True)
+def del_(hash_: Any, key: Any) -> Hash | Fault:
+    if fault := _expect(hash_, Hash, "del") or Hash.key_fault(key):
+        return fault
+    return Hash(hash_.pairs.delete(key))
+
+
+@builtin("keys", 1, pure=True)
+def keys(hash_: Any) -> Array | Fault:
+    """Keys of :hash_:, in no particular order"""
+    if fault := _expect(hash_, Hash, "keys"):
+        return fault
+    return Array.from_iterable(hash_.pairs)
+
+
+@builtin("index", 2, pure=True)
+def index(string: Any, position: Any) -> String | Null | Fault:
+    if fault := _expect(string, String, "index") or _expect(position, Integer, "index"):
+        return fault
+    if not 0 <= position.value < string.length:
+        return NULL
+    return make_string(string.char_at(position.value))
+
+
+@builtin("find", 2, pure=True)
+def find(string: Any, sub: Any) -> Integer | Fault:
+    if fault := _expect(string, String, "find") or _expect(sub, String, "find"):
+        return fault
+    return make_integer(string.find(sub))
+
+
+@expose(name="abs", pure=True)
+def abs_(number: int) -> int:
+    return abs(number)
+
+
+@expose(name="min", pure=True)
+def min_(a: int, b: int) -> int:
+    return min(a, b)
+
+
+@expose(name="max", pure=True)
+def max_(a: int, b: int) -> int:
+    return max(a, b)
+
+
+@expose(name="int", pure=True)
+def int_(text: str) -> int:
+    return int(text)
+
+
+@expose(pure=True)
+def upper(text: str) -> str:
+    return text.upper()
+
+
+@expose(pure=True)
+def lower(text: str) -> str:
+    return text.lower()
+
+
+@expose(pure=True)
+def split(text: str, separator: str) -> list[str]:
+    return text.split(separator)
+
+
+@expose(pure=True)
+def join(parts: list[str], separator: str) -> str:
+    return separator.join(parts)
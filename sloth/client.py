@@ -0,0 +1,111 @@
+"""Thin client of the evaluation daemon, see :mod:`sloth.daemon`.
+
+Only the standard library is imported here, so a client process starts
+without loading the interpreter. Messages are JSON objects sent as UTF-8,
+each preceded by its length as a 4 byte big endian integer.
+
+A request is ``{"source": ...}``. The reply holds one of ``value``, the
+inspected result, ``fault``, the message of a Fault, ``errors``, the parse
+errors, or ``error`` when the daemon itself failed.
+
+Usage: `python -m sloth.client SOCKET [SOURCE]`, SOURCE defaults to stdin.
+"""
+
+import json
+import socket
+import struct
+import sys
+from typing import Any
+
+_HEADER = struct.Struct(">I")
+
+MAX_MESSAGE = 64 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """The other side sent something that is not a message"""
+
+
+def send_message(sock: socket.socket, message: dict[str, Any]) -> None:
+    body = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def recv_message(sock: socket.socket) -> dict[str, Any] | None:
+    """Next message, None once the other side closed the connection"""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_MESSAGE:
+        raise ProtocolError(f"message of {length} bytes is over the limit")
+    body = _recv_exactly(sock, length)
+    if body is None:
+        raise ProtocolError("connection closed in the middle of a message")
+    return json.loads(body)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 16))
+        if not chunk:
+            if chunks:
+                raise ProtocolError("connection closed in the middle of a message")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class Client:
+    """Connection to a daemon, requests are answered one at a time"""
+
+    def __init__(self, path: str) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(path)
+
+    def evaluate(self, source: str) -> dict[str, Any]:
+        send_message(self._sock, {"source": source})
+        reply = recv_message(self._sock)
+        if reply is None:
+            raise ProtocolError("daemon closed the connection")
+        return reply
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def main(argv: list[str]) -> int:
+    if not argv:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+
+    source = argv[1] if len(argv) > 1 else sys.stdin.read()
+    with Client(argv[0]) as client:
+        reply = client.evaluate(source)
+
+    match reply:
+        case {"value": value}:
+            print(value)
+            return 0
+        case {"fault": message}:
+            print(f"Fault: {message}")
+            return 1
+        case {"errors": errors}:
+            print(f"ERRORS: {chr(10).join(errors)}", file=sys.stderr)
+            return 1
+        case _:
+            print(f"ERROR: {reply.get('error')}", file=sys.stderr)
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
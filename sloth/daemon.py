@@ -0,0 +1,149 @@
+"""Long running evaluation service listening on a Unix socket.
+
+Starting Python, importing the runtime and parsing dominate short runs. The
+daemon pays for them once: programs are parsed once and cached by source, so
+their inline caches stay warm across requests, and a prelude can define
+functions every request sees. Each connection is read by a thread of its
+own, and its requests are evaluated by a fixed pool of worker threads, so
+idle clients never keep a worker from the others. Each request runs in a
+fresh scope on top of the prelude bindings.
+
+The protocol and a client live in :mod:`sloth.client`.
+
+Usage: `python -m sloth.daemon SOCKET [--prelude FILE] [--workers N]`
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import socket
+import socketserver
+import stat
+import threading
+from typing import Any
+
+from .client import ProtocolError, recv_message, send_message
+from .evaluation import evaluate
+from .interpreter import CompiledProgram, CompileError, Evaluator, Interpreter
+from .memo import LRUCache
+from .objects import Fault
+
+
+class Daemon:
+    """Parse cache and prelude bindings shared by every request"""
+
+    def __init__(
+        self,
+        prelude: str = "",
+        workers: int = 4,
+        cache_size: int = 256,
+        evaluator: Evaluator = evaluate,
+    ) -> None:
+        self.workers = workers
+        self.programs = LRUCache(cache_size)
+        self.interpreter = Interpreter(evaluator)
+        if prelude:
+            self.interpreter.load(prelude)
+
+    def compile(self, source: str) -> CompiledProgram | CompileError:
+        compiled = self.programs.get(source)
+        if compiled is None:
+            try:
+                compiled = self.interpreter.compile(source)
+            except CompileError as e:
+                compiled = e
+            self.programs.put(source, compiled)
+        return compiled
+
+    def evaluate(self, source: str) -> dict[str, Any]:
+        """Reply to a request for :source:"""
+        compiled = self.compile(source)
+        if type(compiled) is CompileError:
+            return {"errors": compiled.errors}
+
+        try:
+            result = compiled.run()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        if type(result) is Fault:
+            return {"fault": result.message}
+        return {"value": result.inspect() if result is not None else ""}
+
+    def bind(self, path: str) -> "_Server":
+        """Listen on :path:, a stale socket left there is replaced"""
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        return _Server(path, self)
+
+    def serve(self, path: str) -> None:
+        with self.bind(path) as server:
+            server.serve_forever()
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: "_Server"
+
+    def handle(self) -> None:
+        sock: socket.socket = self.request
+        while True:
+            try:
+                request = recv_message(sock)
+            except (ProtocolError, ValueError) as e:
+                send_message(sock, {"error": str(e)})
+                return
+            if request is None:
+                return
+
+            if not isinstance(request, dict):
+                reply = {"error": "request is not an object"}
+            elif not isinstance(source := request.get("source"), str):
+                reply = {"error": "request without a source"}
+            else:
+                reply = self.server.evaluate(source)
+            send_message(sock, reply)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Reads every connection in a thread, evaluates on a fixed pool"""
+
+    # Connections left open by clients do not hold up a shutdown
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, path: str, daemon: Daemon) -> None:
+        self.daemon = daemon
+        self.pool = ThreadPoolExecutor(daemon.workers)
+        super().__init__(path, _Handler)
+
+    def evaluate(self, source: str) -> dict[str, Any]:
+        return self.pool.submit(self.daemon.evaluate, source).result()
+
+    def serve_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown(wait=False)
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m sloth.daemon")
+    parser.add_argument("socket", help="path of the Unix socket to listen on")
+    parser.add_argument("--prelude", help="file evaluated once, seen by requests")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    prelude = ""
+    if args.prelude:
+        with open(args.prelude, encoding="utf-8") as file:
+            prelude = file.read()
+
+    Daemon(prelude, workers=args.workers).serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,64 @@
-from io import IncrementalNewlineDecoder
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
 from .ast import (
+    ArrayLiteral,
+    AwaitExpression,
     BlockStatement,
     BooleanLiteral,
     CallExpression,
     Expression,
     ExpressionStatement,
+    ForStatement,
     FunctionLiteral,
+    HashLiteral,
     Identifier,
     IfElseExpression,
+    IndexExpression,
     InfixExpression,
     IntegerLiteral,
     Node,
     PrefixExpression,
     Program,
     ReturnStatement,
+    SpawnExpression,
     Statement,
     StringLiteral,
     VarStatement,
+    WhileStatement,
 )
-
+from .frames import FRAME_POOL, Frame
+from .memo import MEMO, MISSING
+from .numeric import NumArray, apply_elementwise
+from .persistent import PersistentMap
+from .builtins import BUILTINS
 from .objects import (
+    FALSE,
+    NULL,
+    TRUE,
+    Array,
     Boolean,
+    Builtin,
     Fault,
+    Hash,
     Integer,
     Null,
     Function,
+    Range,
     Environment,
     ObjectType,
+    Stream,
     String,
+    Task,
+    make_integer,
+    make_string,
 )
 
 
-# Native constants
-TRUE = Boolean(True)
-FALSE = Boolean(False)
-NULL = Null()
-ZERO = Integer(0)
-
-
-class ReturnStopExcexution(Exception):
-    def __init__(self, expression: Expression, *args) -> None:
-        self.expression = expression
-        super().__init__(*args)
-
-
-class FaultStopExcexution(Exception):
-    def __init__(self, msg: str, *args) -> None:
-        self.fault = Fault(msg)
-        super().__init__(*args)
+ZERO = make_integer(0)
 
 
-def raise_operator_not_supported(operator: str, type: ObjectType):
-    raise FaultStopExcexution(f'operator "{operator}" for {type} is not supported')
+def operator_not_supported(operator: str, type: ObjectType) -> Fault:
+    return Fault(f'operator "{operator}" for {type} is not supported')
 
 
 def _native_to_boolean(native: bool) -> Boolean:
@@ -62,28 +68,36 @@ def _native_to_boolean(native: bool) -> Boolean:
 
 
 def evaluate_statements(statements: list[Statement], env: Environment) -> Any:
+    # Faults are plain values checked after every step, a return is a
+    # ReturnValue every enclosing block passes up until the function unwraps
+    # it. Raising exceptions for either was the bulk of the call overhead.
     result = None
     for stmt in statements:
-        try:
-            result = evaluate(stmt, env)
-        except ReturnStopExcexution as e:
-            # No need to continue the body of the execution
-            return evaluate(e.expression, env)
-        except FaultStopExcexution as e:
-            return e.fault  # No need to continue the body of the execution
+        if type(stmt) is ReturnStatement:
+            return evaluate_return_statement(stmt, env)
+
+        result = evaluate(stmt, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result  # No need to continue the body of the execution
 
     return result
 
 
-def evaluate_prefix_boolean(boolean: BooleanLiteral):
-    return FALSE if boolean.value else TRUE
+def evaluate_return_statement(node: ReturnStatement, env: Environment):
+    value = evaluate(node.expression, env)
+    if type(value) is Fault:
+        return value
+    return ReturnValue(value)
+
 
+def evaluate_program(program: Program, env: Environment):
+    result = evaluate_statements(program.statements, env)
+    if type(result) is ReturnValue:
+        return result.value
+    return result
 
-def evaluate_prefix_bang(
-    expression: PrefixExpression, env: Environment
-) -> Boolean | Null:
-    evaluated = evaluate(expression.right, env)
 
+def evaluate_prefix_bang(evaluated: Any) -> Boolean | Null:
     if evaluated == TRUE:
         return FALSE
     elif evaluated == FALSE:
@@ -94,43 +108,48 @@ def evaluate_prefix_bang(
     return NULL
 
 
-def evaluate_prefix_minus(
-    expression: PrefixExpression, env: Environment
-) -> Integer | Null:
-    evaluated = evaluate(expression.right, env)
-
+def evaluate_prefix_minus(evaluated: Any) -> Integer | Null:
     if not isinstance(evaluated, Integer):
         return NULL
 
-    return Integer(value=-evaluated.value)
+    return make_integer(-evaluated.value)
+
+
+def apply_prefix_operator(
+    operator: str, right: Any
+) -> Integer | Boolean | Null | Fault:
+    match operator:
+        case "!":
+            return evaluate_prefix_bang(right)
+        case "-":
+            return evaluate_prefix_minus(right)
+        case _:
+            return operator_not_supported(operator, right.type())
 
 
 def evaluate_prefix_expression(
     node: PrefixExpression, env: Environment
-) -> Integer | Boolean | Null:
-    match node:
-        case PrefixExpression(operator="!"):
-            return evaluate_prefix_bang(node, env)
-        case PrefixExpression(operator="-"):
-            return evaluate_prefix_minus(node, env)
-        case _:
-            raise FaultStopExcexution("")
+) -> Integer | Boolean | Null | Fault:
+    right = evaluate(node.right, env)
+    if type(right) is Fault:
+        return right
+    return apply_prefix_operator(node.operator, right)
 
 
 def evaluate_integer_infix_expression(
     left: Integer, right: Integer, operator: str
-) -> Integer | Boolean | Null:
+) -> Integer | Boolean | Fault:
     match operator:
         case "+":
-            return Integer(left.value + right.value)
+            return make_integer(left.value + right.value)
         case "-":
-            return Integer(left.value - right.value)
+            return make_integer(left.value - right.value)
         case "*":
-            return Integer(left.value * right.value)
+            return make_integer(left.value * right.value)
         case "/":
             if right.value == 0:
-                raise FaultStopExcexution("can not divide by zero")
-            return Integer(left.value // right.value)
+                return Fault("can not divide by zero")
+            return make_integer(left.value // right.value)
         case "==":
             return _native_to_boolean(left.value == right.value)
         case "!=":
@@ -140,7 +159,7 @@ def evaluate_integer_infix_expression(
         case "<":
             return _native_to_boolean(left.value < right.value)
         case _:
-            raise_operator_not_supported(operator, ZERO.type())
+            return operator_not_supported(operator, ZERO.type())
 
 
 def evaluate_boolean_infix_expression(left: Boolean, right: Boolean, operator: str):
@@ -150,108 +169,440 @@ def evaluate_boolean_infix_expression(left: Boolean, right: Boolean, operator: s
         case "!=":
             return _native_to_boolean(left.value != right.value)
         case _:
-            raise_operator_not_supported(operator, ZERO.type())
+            return operator_not_supported(operator, ZERO.type())
 
 
 def evaluate_string_infix_expression(left: String, right: String, operator: str):
     match operator:
         case "+":
-            return String(left.value + right.value)
+            return String.concat(left, right)
         case _:
-            raise_operator_not_supported(operator, left.type())
+            return operator_not_supported(operator, left.type())
 
 
-def evaluate_infix_expression(infix: InfixExpression, env):
-    left = evaluate(infix.left, env)
-    right = evaluate(infix.right, env)
+def apply_infix_operator(operator: str, left: Any, right: Any):
+    if type(left) is Integer and type(right) is Integer:
+        # Loop counters and arithmetic, skip the class patterns below
+        return evaluate_integer_infix_expression(left, right, operator)
 
     match left, right:
         case String(), String():
-            return evaluate_string_infix_expression(left, right, infix.operator)
+            return evaluate_string_infix_expression(left, right, operator)
         case Integer(), Integer():
-            return evaluate_integer_infix_expression(left, right, infix.operator)
+            return evaluate_integer_infix_expression(left, right, operator)
         case Boolean(), Boolean():
-            return evaluate_boolean_infix_expression(left, right, infix.operator)
+            return evaluate_boolean_infix_expression(left, right, operator)
+        case (NumArray(), _) | (_, NumArray()):
+            return apply_elementwise(operator, left, right)
         case _:
             raise NotImplementedError(f"{left} and {right} combination not implemented")
 
 
+def evaluate_infix_expression(infix: InfixExpression, env):
+    left = evaluate(infix.left, env)
+    if type(left) is Fault:
+        return left
+
+    right = evaluate(infix.right, env)
+    if type(right) is Fault:
+        return right
+
+    return apply_infix_operator(infix.operator, left, right)
+
+
+def is_truthy(evaluated: Any) -> bool:
+    if evaluated is TRUE:
+        return True
+    return evaluated not in (FALSE, NULL, ZERO)
+
+
 def evaluate_if_else_expression(if_else: IfElseExpression, env: Environment):
     eval_condition = evaluate(if_else.condition, env)
+    if type(eval_condition) is Fault:
+        return eval_condition
 
-    if eval_condition in (FALSE, NULL, ZERO):
+    if not is_truthy(eval_condition):
         return evaluate(if_else.alternative, env) if if_else.alternative else NULL
     return evaluate(if_else.consequence, env)
 
 
-def evaluate_return_statement(return_stmt: ReturnStatement):
-    raise ReturnStopExcexution(return_stmt.expression)
-
-
 def evaluate_var_statement(var_stmt: VarStatement, env: Environment):
-    name = var_stmt.name_value()
-    env[name] = evaluate(var_stmt.value, env)
+    value = evaluate(var_stmt.value, env)
+    if type(value) is Fault or type(value) is ReturnValue:
+        return value
+
+    env[var_stmt.name_value()] = value
     return NULL
 
 
 def evaluate_identifier(ident: Identifier, env: Environment):
-    name = ident.value
+    value = env.get(ident.value)
+
+    if value is None:
+        value = BUILTINS.get(ident.value)
+        if value is None:
+            return Fault(f"name {ident.value} is not defined")
+    return value
+
+
+def evaluate_array_literal(array: ArrayLiteral, env: Environment) -> Array | Fault:
+    elements = []
+    for node in array.elements:
+        element = evaluate(node, env)
+        if type(element) is Fault:
+            return element
+        elements.append(element)
+    return Array.from_iterable(elements)
+
+
+def evaluate_hash_literal(node: HashLiteral, env: Environment) -> Hash | Fault:
+    pairs = PersistentMap()
+    for key_node, value_node in node.pairs:
+        key = evaluate(key_node, env)
+        if type(key) is Fault:
+            return key
+        if fault := Hash.key_fault(key):
+            return fault
+
+        value = evaluate(value_node, env)
+        if type(value) is Fault:
+            return value
+        pairs = pairs.set(key, value)
+    return Hash(pairs)
+
+
+def apply_index(left: Any, index: Any):
+    match left, index:
+        case Array(), Integer():
+            if 0 <= index.value < len(left.elements):
+                return left.elements[index.value]
+            return NULL
+        case NumArray(), Integer():
+            if 0 <= index.value < len(left):
+                return make_integer(left[index.value])
+            return NULL
+        case String(), Integer():
+            if 0 <= index.value < left.length:
+                return make_string(left.char_at(index.value))
+            return NULL
+        case Hash(), _:
+            if fault := Hash.key_fault(index):
+                return fault
+            return left.pairs.get(index, NULL)
+        case _:
+            return Fault(f"index operator for {left.type()} is not supported")
+
+
+def evaluate_index_expression(node: IndexExpression, env: Environment):
+    left = evaluate(node.left, env)
+    if type(left) is Fault:
+        return left
+
+    index = evaluate(node.index, env)
+    if type(index) is Fault:
+        return index
+    return apply_index(left, index)
+
+
+@dataclass(frozen=True, slots=True)
+class TailCall:
+    """Call in tail position, left for the caller's trampoline to run"""
 
-    if name not in env:
-        raise FaultStopExcexution(f"name {name} is not defined")
-    return env[name]
+    func: Function
+    values: list
+
+
+@dataclass(frozen=True, slots=True)
+class ReturnValue:
+    """Value of a `return`, passed up by every block until its function ends"""
+
+    value: Any
+
+
+def resolve_function(call: CallExpression, env: Environment) -> Function | Fault:
+    return call.inline_cache.resolve(call.name(), len(call.arguments), env)
+
+
+def evaluate_arguments(call: CallExpression, env: Environment) -> list | Fault:
+    values = []
+    for arg in call.arguments:
+        value = evaluate(arg, env)
+        if type(value) is Fault:
+            return value
+        values.append(value)
+    return values
+
+
+def call_function(func: Function | Builtin, values: list):
+    if type(func) is Builtin:
+        return func.fn(*values)
+
+    key = MEMO.key(func, values)
+    if key is None:
+        return _run_function(func, values)
+
+    result = MEMO.cache.get(key, MISSING)
+    if result is MISSING:
+        result = _run_function(func, values)
+        MEMO.cache.put(key, result)
+    return result
+
+
+def _run_function(func: Function, values: list):
+    # Trampoline: a tail call comes back as TailCall and runs in this loop, so
+    # tail recursion does not grow the Python stack.
+    while True:
+        # Every call gets its own scope on top of the closure, so neither the
+        # caller nor other invocations of the same function see its bindings.
+        frame = FRAME_POOL.acquire(func.env, func.parameters, values)
+        result = evaluate_tail_statements(func.body.body, frame)
+        FRAME_POOL.release(frame)
+
+        if type(result) is ReturnValue:
+            return result.value
+        if type(result) is not TailCall:
+            return result
+        func, values = result.func, result.values
 
 
 def evaluate_call_expression(call: CallExpression, env: Environment):
-    if call.name() not in env:
-        raise FaultStopExcexution(f"func name {call.name()} is not defined")
+    func = resolve_function(call, env)
+    if type(func) is Fault:
+        return func
 
-    func: Function = env[call.name()]
+    values = evaluate_arguments(call, env)
+    if type(values) is Fault:
+        return values
 
-    if len(func.arguments) != len(call.arguments):
-        raise FaultStopExcexution(
-            f"arguments passed {len(call.arguments)}, but arguments expected {func.arguments}"
-        )
+    return call_function(func, values)
 
-    for ident, arg in zip(func.arguments, call.arguments):
-        func.env[ident.value] = evaluate(arg, env)
 
-    return evaluate(func.body, func.env)
+def evaluate_spawn_expression(node: SpawnExpression, env: Environment):
+    func = resolve_function(node.call, env)
+    if type(func) is Fault:
+        return func
 
+    values = evaluate_arguments(node.call, env)
+    if type(values) is Fault:
+        return values
 
-def evaluate_function_literal(func: FunctionLiteral, env: Environment):
-    return Function(func.arguments, func.body)
+    # Without an event loop the call runs to completion right away
+    return Task(value=call_function(func, values))
 
 
-def evaluate(node: Node, env: Environment):
+def await_task(task: Any):
+    """Result of :task:, a Fault for anything else or a still running job"""
+    if type(task) is not Task:
+        return Fault(f"{task.type()} can not be awaited")
+    if task.job is None:
+        return task.value
+    if not task.job.done():
+        return Fault("task is still running, await it under evaluate_async")
+    return task.job.result()
+
+
+def evaluate_await_expression(node: AwaitExpression, env: Environment):
+    task = evaluate(node.value, env)
+    if type(task) is Fault:
+        return task
+    return await_task(task)
+
+
+def evaluate_tail(node: Expression, env: Environment):
     match node:
-        case Program():
-            return evaluate_statements(node.statements, env)
-        case BlockStatement():
-            return evaluate_statements(node.body, env)
-        case ExpressionStatement():
-            return evaluate(node.expression, env)
-        case IntegerLiteral():
-            return Integer(node.value)
-        case StringLiteral():
-            return String(node.value)
-        case BooleanLiteral():
-            return _native_to_boolean(node.value)
-        case PrefixExpression():
-            return evaluate_prefix_expression(node, env)
-        case InfixExpression():
-            return evaluate_infix_expression(node, env)
-        case IfElseExpression():
-            return evaluate_if_else_expression(node, env)
-        case ReturnStatement():
-            return evaluate_return_statement(node)
-        case VarStatement():
-            return evaluate_var_statement(node, env)
-        case Identifier():
-            return evaluate_identifier(node, env)
-        case FunctionLiteral():
-            return evaluate_function_literal(node, env)
         case CallExpression():
-            return evaluate_call_expression(node, env)
+            func = resolve_function(node, env)
+            if type(func) is Fault:
+                return func
+
+            values = evaluate_arguments(node, env)
+            if type(values) is Fault:
+                return values
+
+            if type(func) is Builtin:
+                return func.fn(*values)
+            return TailCall(func, values)
+        case IfElseExpression():
+            eval_condition = evaluate(node.condition, env)
+            if type(eval_condition) is Fault:
+                return eval_condition
+
+            if not is_truthy(eval_condition):
+                if not node.alternative:
+                    return NULL
+                return evaluate_tail_statements(node.alternative.body, env)
+            return evaluate_tail_statements(node.consequence.body, env)
+        case _:
+            return evaluate(node, env)
+
+
+def evaluate_tail_statements(statements: list[Statement], env: Environment) -> Any:
+    """evaluate_statements for a block whose value is returned by a function"""
+    result = None
+    last = len(statements) - 1
+    for i, stmt in enumerate(statements):
+        if type(stmt) is ReturnStatement:
+            return evaluate_tail(stmt.expression, env)
+        if i == last and type(stmt) is ExpressionStatement:
+            return evaluate_tail(stmt.expression, env)
+
+        result = evaluate(stmt, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return result
+
+
+def evaluate_function_literal(
+    func: FunctionLiteral, env: Environment, unboxed: bool = False
+):
+    # Globals live as long as the program, so closures link to the root scope and
+    # hold cells of only the free variables coming from enclosing scopes. The
+    # cell is shared with that scope, so a rebinding is seen on both sides, and
+    # a closure never keeps a whole call frame alive.
+    root = env.root()
+    captured = {}
+    needs_link = False
+    for name in func.free_variables:
+        scope = env.scope_of(name)
+        if scope is None or scope is root:
+            # Not bound yet, e.g. a local helper calling itself, or bound later by
+            # the enclosing function and then hiding the global or builtin
+            needs_link = needs_link or name in func.enclosing_writes
+            if scope is None:
+                needs_link = needs_link or name not in BUILTINS
+        else:
+            captured[name] = scope.cell(name)
+
+    if needs_link:
+        closure = Environment(captured, env)
+        if isinstance(env, Frame):
+            env.escaped = True
+    elif captured:
+        closure = Environment(captured, root)
+    else:
+        closure = root
+
+    return Function(func.arguments, func.body, closure, unboxed)
+
+
+def iterate(value: Any) -> Iterator[Any] | Fault:
+    """Elements a `for` loop visits in :value:"""
+    match value:
+        case Range() | Stream():
+            return iter(value)
+        case Array():
+            return iter(value.elements)
+        case NumArray():
+            return map(make_integer, value.tolist())
+        case String():
+            return map(make_string, value.value)
+        case Hash():
+            return iter(value.pairs)
         case _:
-            raise NotImplementedError(f"{type(node)} is still not implemented")
+            return Fault(f"{value.type()} is not iterable")
+
+
+# Evaluator, the node it gets and the name the result is bound to, if any
+_Step = tuple[Callable[[Any, Environment], Any], Node, str | None]
+
+
+def _loop_steps(body: BlockStatement) -> list[_Step]:
+    """Body statements with their evaluators looked up once for all iterations"""
+    steps: list[_Step] = []
+    for stmt in body.body:
+        match stmt:
+            case VarStatement():
+                value = stmt.value
+                steps.append((_EVALUATORS[type(value)], value, stmt.name_value()))
+            case ExpressionStatement():
+                expression = stmt.expression
+                steps.append((_EVALUATORS[type(expression)], expression, None))
+            case _:
+                steps.append((_EVALUATORS[type(stmt)], stmt, None))
+    return steps
+
+
+def _run_steps(steps: list[_Step], env: Environment) -> Fault | ReturnValue | None:
+    """Run one iteration, a Fault or a `return` ends the loop"""
+    for evaluator, node, name in steps:
+        result = evaluator(node, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+        if name is not None:
+            env[name] = result
+    return None
+
+
+def evaluate_while_statement(node: WhileStatement, env: Environment):
+    # The loop runs in the enclosing scope, so `var` in the body rebinds the
+    # variables the condition reads. A Python loop re-runs the pre-resolved
+    # body instead of a Sloth call per iteration.
+    condition = node.condition
+    check = _EVALUATORS[type(condition)]
+    steps = _loop_steps(node.body)
+    while True:
+        value = check(condition, env)
+        if type(value) is Fault:
+            return value
+        if not is_truthy(value):
+            return NULL
+
+        result = _run_steps(steps, env)
+        if result is not None:
+            return result
+
+
+def evaluate_for_statement(node: ForStatement, env: Environment):
+    values = evaluate(node.iterable, env)
+    if type(values) is Fault:
+        return values
+
+    elements = iterate(values)
+    if type(elements) is Fault:
+        return elements
+
+    name = node.name.value
+    steps = _loop_steps(node.body)
+    for element in elements:
+        if type(element) is Fault:
+            return element
+        env[name] = element
+        result = _run_steps(steps, env)
+        if result is not None:
+            return result
+    return NULL
+
+
+def evaluate(node: Node, env: Environment):
+    evaluator = _EVALUATORS.get(type(node))
+    if evaluator is None:
+        raise NotImplementedError(f"{type(node)} is still not implemented")
+    return evaluator(node, env)
+
+
+# Keyed by the exact node type, a dict lookup instead of a chain of isinstance
+# checks against the AST protocols.
+_EVALUATORS: dict[type, Callable[[Any, Environment], Any]] = {
+    Program: evaluate_program,
+    BlockStatement: lambda node, env: evaluate_statements(node.body, env),
+    ExpressionStatement: lambda node, env: evaluate(node.expression, env),
+    IntegerLiteral: lambda node, env: node.boxed,
+    StringLiteral: lambda node, env: node.boxed,
+    BooleanLiteral: lambda node, env: TRUE if node.value else FALSE,
+    PrefixExpression: evaluate_prefix_expression,
+    InfixExpression: evaluate_infix_expression,
+    IfElseExpression: evaluate_if_else_expression,
+    ReturnStatement: evaluate_return_statement,
+    VarStatement: evaluate_var_statement,
+    Identifier: evaluate_identifier,
+    FunctionLiteral: evaluate_function_literal,
+    CallExpression: evaluate_call_expression,
+    ArrayLiteral: evaluate_array_literal,
+    IndexExpression: evaluate_index_expression,
+    HashLiteral: evaluate_hash_literal,
+    WhileStatement: evaluate_while_statement,
+    ForStatement: evaluate_for_statement,
+    SpawnExpression: evaluate_spawn_expression,
+    AwaitExpression: evaluate_await_expression,
+}
@@ -0,0 +1,91 @@
+"""Conversion between Sloth objects and plain Python values.
+
+Used by :func:`sloth.builtins.expose` so Python callables can be called from
+Sloth without knowing about the object model.
+"""
+
+from typing import Any, get_origin
+
+from .numeric import NumArray
+from .objects import (
+    FALSE,
+    NULL,
+    TRUE,
+    Array,
+    Boolean,
+    Fault,
+    Hash,
+    Integer,
+    Null,
+    String,
+    make_integer,
+    make_string,
+)
+from .persistent import PersistentMap
+
+
+_SLOTH_TYPES = (Integer, String, Boolean, Null, Array, Hash, NumArray, Fault)
+
+
+class ConversionError(TypeError):
+    """A value has no counterpart on the other side"""
+
+
+_ANNOTATIONS: dict[Any, type] = {
+    int: Integer,
+    str: String,
+    bool: Boolean,
+    list: Array,
+    tuple: Array,
+    dict: Hash,
+}
+
+
+def sloth_type(annotation: Any) -> type | None:
+    """Sloth type converted to the Python :annotation:, None if unknown"""
+    return _ANNOTATIONS.get(get_origin(annotation) or annotation)
+
+
+def to_python(obj: Any) -> Any:
+    """Python value of a Sloth object, containers are converted deeply"""
+    match obj:
+        case Integer() | String() | Boolean():
+            return obj.value
+        case Null():
+            return None
+        case Array():
+            return [to_python(element) for element in obj.elements]
+        case Hash():
+            pairs = obj.pairs.items()
+            return {to_python(key): to_python(value) for key, value in pairs}
+        case NumArray():
+            return obj.tolist()
+        case _:
+            raise ConversionError(f"{obj.type()} can not be passed to Python")
+
+
+def from_python(value: Any) -> Any:
+    """Sloth object of a Python value, Sloth objects are returned as they are"""
+    match value:
+        case None:
+            return NULL
+        case bool():
+            return TRUE if value else FALSE
+        case int():
+            return make_integer(value)
+        case str():
+            return make_string(value)
+        case list() | tuple():
+            return Array.from_iterable(from_python(element) for element in value)
+        case dict():
+            pairs = PersistentMap()
+            for key, element in value.items():
+                key = from_python(key)
+                if fault := Hash.key_fault(key):
+                    raise ConversionError(fault.message)
+                pairs = pairs.set(key, from_python(element))
+            return Hash(pairs)
+        case _ if isinstance(value, _SLOTH_TYPES):
+            return value
+        case _:
+            raise ConversionError(f"{type(value).__name__} can not be passed to Sloth")
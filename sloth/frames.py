@@ -0,0 +1,70 @@
+from collections import defaultdict
+import threading
+
+from .objects import Environment
+
+
+class Frame(Environment):
+    """Scope of a single function call, recycled through a :FramePool:"""
+
+    __slots__ = ("arity", "escaped")
+
+    def __init__(self, arity: int, outer: Environment | None = None) -> None:
+        super().__init__(outer=outer)
+        self.arity = arity
+        self.escaped = False
+
+
+class _FreeLists(threading.local):
+    def __init__(self) -> None:
+        self.by_arity: defaultdict[int, list[Frame]] = defaultdict(list)
+
+
+class FramePool:
+    """Free lists of call frames, one per function arity.
+
+    A frame goes back to the pool when its call returns, unless a closure
+    linked to it or a snapshot shares its bindings. Every thread has lists of
+    its own, so a frame is never handed to two threads at once. ``hits`` and
+    ``misses`` are shared and only approximate when several threads count.
+    """
+
+    def __init__(self, max_free: int = 256) -> None:
+        self.max_free = max_free
+        self.hits = 0
+        self.misses = 0
+        self._free = _FreeLists()
+
+    def acquire(
+        self, outer: Environment, parameters: tuple[str, ...], values: list
+    ) -> Frame:
+        free = self._free.by_arity[len(parameters)]
+        if free:
+            self.hits += 1
+            frame = free.pop()
+            frame.outer = outer
+        else:
+            self.misses += 1
+            frame = Frame(len(parameters), outer)
+
+        store = frame._store
+        for name, value in zip(parameters, values):
+            store[name] = value
+        return frame
+
+    def release(self, frame: Frame) -> None:
+        if frame.escaped or frame._shared:
+            return
+
+        free = self._free.by_arity[frame.arity]
+        if len(free) < self.max_free:
+            frame._store.clear()
+            frame.outer = None
+            free.append(frame)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+
+FRAME_POOL = FramePool()
@@ -0,0 +1,91 @@
+from typing import Any
+
+from .builtins import BUILTINS
+from .frames import Frame
+from .objects import Builtin, Cell, Environment, Fault, Function
+
+
+# Scope the lookup started at, (scope, version) of every scope walked, result
+_Entry = tuple[Environment, tuple[tuple[Environment, int], ...], Function | Builtin]
+
+
+class InlineCache:
+    """Function a call site resolved to last time, with what it depends on.
+
+    Lookups of a name that is not an argument or local of the running function
+    start past its call frame, at the closure scope, which stays the same across
+    calls. The entry records every scope walked to find the function together
+    with its ``version``. While none of them changed, the same function is
+    returned without a lookup and the arity, checked when the entry was made,
+    is not checked again.
+    """
+
+    __slots__ = ("entry", "hits", "misses")
+
+    def __init__(self) -> None:
+        self.entry: _Entry | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(
+        self, name: str, arity: int, env: Environment
+    ) -> Function | Builtin | Fault:
+        start = env
+        if type(start) is Frame:
+            if name in start._store:
+                # Argument or local, different on every call
+                return self._validate(name, arity, start.get(name))
+            start = start.outer  # type: ignore[assignment]
+
+        entry = self.entry
+        if entry is not None and entry[0] is start:
+            for scope, version in entry[1]:
+                if scope.version != version:
+                    break
+            else:
+                self.hits += 1
+                return entry[2]
+
+        self.misses += 1
+        guards = []
+        scope: Environment | None = start
+        while scope is not None:
+            guards.append((scope, scope.version))
+            if name in scope._store:
+                break
+            scope = scope.outer
+
+        if scope is not None:
+            func = scope._store[name]
+            if type(func) is Cell:
+                # Rebound through the cell, no scope version tells
+                return self._validate(name, arity, func.value)
+            func = self._validate(name, arity, func)
+        elif name in BUILTINS:
+            func = self._validate(name, arity, BUILTINS[name])
+        else:
+            return Fault(f"func name {name} is not defined")
+
+        if type(func) is not Fault:
+            self.entry = (start, tuple(guards), func)
+        return func
+
+    def _validate(self, name: str, arity: int, func: Any) -> Function | Builtin | Fault:
+        match func:
+            case Function():
+                if len(func.arguments) != arity:
+                    return Fault(
+                        f"arguments passed {arity}, but arguments expected {func.arguments}"
+                    )
+            case Builtin():
+                if func.arity != arity:
+                    return Fault(
+                        f"arguments passed {arity}, but arguments expected {func.arity}"
+                    )
+            case _:
+                return Fault(f"{name} is not a function")
+        return func
+
+    def __reduce__(self):
+        # Entries point into live scopes, a copy starts cold
+        return InlineCache, ()
@@ -0,0 +1,123 @@
+"""Embedding API: parse a program once, run it many times.
+
+An :class:`Interpreter` owns the global scope shared by its programs, e.g.
+functions loaded from a prelude. :meth:`Interpreter.compile` parses a source
+and prepares its tree, so running the :class:`CompiledProgram` only costs the
+evaluation. Every run binds its names in a scope of its own on top of the
+globals, runs never see each other, and may happen from several threads.
+Within a run that scope behaves like the globals of a program, a closure sees
+the names it reads rebound later in the run.
+
+    interpreter = Interpreter()
+    interpreter.load("var double = func(x) { x * 2 };")
+    program = interpreter.compile("double(n) + 1")
+    program.run({"n": 20})  # Integer(value=41)
+"""
+
+from typing import Any, Callable, Mapping
+
+from .analysis import child_nodes
+from .ast import (
+    CallExpression,
+    FunctionLiteral,
+    IntegerLiteral,
+    Node,
+    Program,
+    StringLiteral,
+)
+from .batch import evaluate_batch
+from .evaluation import evaluate
+from .ffi import from_python
+from .memo import MEMO
+from .numeric import NumArray
+from .objects import Array, Environment, Fault
+from .parser import Parser
+from .unboxed import evaluate_unboxed, unbox
+
+Evaluator = Callable[[Program, Environment], Any]
+
+# Bindings of these types are converted, anything else is taken as a Sloth object
+_PYTHON = (type(None), bool, int, str, list, tuple, dict)
+
+
+class CompileError(ValueError):
+    """The source of a program does not parse"""
+
+    def __init__(self, errors: list[str]) -> None:
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+class CompiledProgram:
+    """Parsed program bound to the interpreter it runs in"""
+
+    __slots__ = ("source", "program", "interpreter")
+
+    def __init__(self, source: str, program: Program, interpreter: "Interpreter"):
+        self.source = source
+        self.program = program
+        self.interpreter = interpreter
+
+    def run(self, bindings: Mapping[str, Any] | None = None) -> Any:
+        """Result of the program, a Fault included, run with :bindings:.
+
+        Bindings may be Sloth objects or plain Python values, converted like
+        the results of exposed functions. The unboxed evaluator gets them raw.
+        """
+        store = {}
+        for name, value in (bindings or {}).items():
+            store[name] = from_python(value) if isinstance(value, _PYTHON) else value
+        if self.interpreter.evaluator is evaluate_unboxed:
+            store = {name: unbox(value) for name, value in store.items()}
+        env = Environment(store, self.interpreter.globals)
+        return self.interpreter.evaluator(self.program, env)
+
+    def run_batch(self, columns: Mapping[str, Any]) -> NumArray | Array:
+        """Results of the program for every row of :columns:, see evaluate_batch"""
+        return evaluate_batch(self.program, columns, self.interpreter.globals)
+
+    def __repr__(self) -> str:
+        return f"CompiledProgram({self.source!r})"
+
+
+class Interpreter:
+    """Global scope and evaluator shared by the programs it compiles"""
+
+    def __init__(self, evaluator: Evaluator = evaluate) -> None:
+        self.evaluator = evaluator
+        self.globals = Environment()
+
+    def compile(self, source: str) -> CompiledProgram:
+        parser = Parser.from_input(source)
+        program = parser.parse_program()
+        if parser.errors:
+            raise CompileError([str(error) for error in parser.errors])
+
+        _prepare(program)
+        return CompiledProgram(source, program, self)
+
+    def load(self, source: str) -> None:
+        """Evaluate :source: into the globals, seen by every later run"""
+        program = self.compile(source)
+        # Memoized results of earlier runs rest on the globals replaced here
+        MEMO.clear()
+        result = self.evaluator(program.program, self.globals)
+        if type(result) is Fault:
+            raise ValueError(f"{source!r} failed: {result.message}")
+
+    def run(self, source: str, bindings: Mapping[str, Any] | None = None) -> Any:
+        """Compile and run :source: once"""
+        return self.compile(source).run(bindings)
+
+
+def _prepare(node: Node) -> None:
+    """Compute what evaluation caches on the tree, before any run shares it"""
+    match node:
+        case IntegerLiteral() | StringLiteral():
+            node.boxed
+        case FunctionLiteral():
+            node.free_variables
+        case CallExpression():
+            node.inline_cache
+    for child in child_nodes(node):
+        _prepare(child)
@@ -42,8 +42,14 @@ class Lexer:
                 token = Token(TokenType.LBRACE, self._char)
             case TokenType.RBRACE:
                 token = Token(TokenType.RBRACE, self._char)
+            case TokenType.LBRACKET:
+                token = Token(TokenType.LBRACKET, self._char)
+            case TokenType.RBRACKET:
+                token = Token(TokenType.RBRACKET, self._char)
             case TokenType.SEMICOLON:
                 token = Token(TokenType.SEMICOLON, self._char)
+            case TokenType.COLON:
+                token = Token(TokenType.COLON, self._char)
             case TokenType.COMMA:
                 token = Token(TokenType.COMMA, self._char)
             case TokenType.GT:
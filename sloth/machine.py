@@ -0,0 +1,510 @@
+"""Evaluator keeping Sloth continuations on an explicit stack.
+
+Every compound node is evaluated by a generator that yields the sub-nodes it
+needs and gets their values sent back, so a Sloth call costs one generator on
+a heap allocated list instead of several Python frames. Operators and leaf
+nodes share their implementation with :mod:`sloth.evaluation`.
+
+The same stack can be suspended, which :meth:`StackEvaluator.evaluate_async`
+uses to run `spawn`ed calls as asyncio tasks, each with a stack of its own.
+Builtins with an awaitable variant, like `sleep` and `read`, let the event loop
+run other tasks while they wait.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Generator
+
+from .ast import (
+    ArrayLiteral,
+    AwaitExpression,
+    BlockStatement,
+    CallExpression,
+    ExpressionStatement,
+    ForStatement,
+    HashLiteral,
+    IfElseExpression,
+    IndexExpression,
+    InfixExpression,
+    Node,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    SpawnExpression,
+    Statement,
+    VarStatement,
+    WhileStatement,
+)
+from .evaluation import (
+    NULL,
+    ReturnValue,
+    TailCall,
+    apply_index,
+    apply_infix_operator,
+    apply_prefix_operator,
+    await_task,
+    evaluate,
+    is_truthy,
+    iterate,
+    resolve_function,
+)
+from .frames import FRAME_POOL, Frame
+from .objects import Array, Builtin, Environment, Fault, Function, Hash, Task
+from .persistent import PersistentMap
+
+DEFAULT_MAX_DEPTH = 100_000
+
+_Continuation = Generator[Any, Any, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class _Invoke:
+    func: Function
+    values: list
+
+
+# Requests that suspend the whole stack, they are resolved by the driver of
+# StackEvaluator._run, synchronously or on the event loop.
+
+
+@dataclass(frozen=True, slots=True)
+class _Blocking:
+    """Call of a builtin that has an awaitable variant"""
+
+    func: Builtin
+    values: list
+
+
+@dataclass(frozen=True, slots=True)
+class _Spawn:
+    """Start of a task, the driver answers None when it can not start one"""
+
+    func: Function | Builtin
+    values: list
+
+
+@dataclass(frozen=True, slots=True)
+class _Join:
+    """Wait for a task started by _Spawn"""
+
+    job: asyncio.Task
+
+
+def _invoke(func: Function, values: list) -> _Continuation:
+    return (yield _Invoke(func, values))
+
+
+def _statements(statements: list[Statement], env: Environment) -> _Continuation:
+    result = None
+    for stmt in statements:
+        if type(stmt) is ReturnStatement:
+            value = yield stmt.expression, env
+            return value if type(value) is Fault else ReturnValue(value)
+
+        result = yield stmt, env
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return result
+
+
+def _tail_statements(statements: list[Statement], env: Environment) -> _Continuation:
+    result = None
+    last = len(statements) - 1
+    for i, stmt in enumerate(statements):
+        if type(stmt) is ReturnStatement:
+            return (yield from _tail(stmt.expression, env))
+        if i == last and type(stmt) is ExpressionStatement:
+            return (yield from _tail(stmt.expression, env))
+
+        result = yield stmt, env
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return result
+
+
+def _arguments(node: CallExpression, env: Environment) -> _Continuation:
+    values = []
+    for arg in node.arguments:
+        value = yield arg, env
+        if type(value) is Fault:
+            return value
+        values.append(value)
+    return values
+
+
+def _tail(node: Any, env: Environment) -> _Continuation:
+    if type(node) is CallExpression:
+        func = resolve_function(node, env)
+        if type(func) is Fault:
+            return func
+
+        values = yield from _arguments(node, env)
+        if type(values) is Fault:
+            return values
+        if type(func) is Builtin:
+            if func.awaitable is None:
+                return func.fn(*values)
+            return (yield _Blocking(func, values))
+        return TailCall(func, values)
+
+    if type(node) is IfElseExpression:
+        condition = yield node.condition, env
+        if type(condition) is Fault:
+            return condition
+
+        if is_truthy(condition):
+            return (yield from _tail_statements(node.consequence.body, env))
+        if node.alternative:
+            return (yield from _tail_statements(node.alternative.body, env))
+        return NULL
+
+    return (yield node, env)
+
+
+def _program(node: Program, env: Environment) -> _Continuation:
+    result = yield from _statements(node.statements, env)
+    return result.value if type(result) is ReturnValue else result
+
+
+def _block(node: BlockStatement, env: Environment) -> _Continuation:
+    return _statements(node.body, env)
+
+
+def _expression_statement(
+    node: ExpressionStatement, env: Environment
+) -> _Continuation:
+    return (yield node.expression, env)
+
+
+def _var(node: VarStatement, env: Environment) -> _Continuation:
+    value = yield node.value, env
+    if type(value) is Fault or type(value) is ReturnValue:
+        return value
+
+    env[node.name_value()] = value
+    return NULL
+
+
+def _prefix(node: PrefixExpression, env: Environment) -> _Continuation:
+    right = yield node.right, env
+    if type(right) is Fault:
+        return right
+    return apply_prefix_operator(node.operator, right)
+
+
+def _infix(node: InfixExpression, env: Environment) -> _Continuation:
+    left = yield node.left, env
+    if type(left) is Fault:
+        return left
+
+    right = yield node.right, env
+    if type(right) is Fault:
+        return right
+    return apply_infix_operator(node.operator, left, right)
+
+
+def _if_else(node: IfElseExpression, env: Environment) -> _Continuation:
+    condition = yield node.condition, env
+    if type(condition) is Fault:
+        return condition
+
+    if is_truthy(condition):
+        return (yield node.consequence, env)
+    if node.alternative:
+        return (yield node.alternative, env)
+    return NULL
+
+
+def _call(node: CallExpression, env: Environment) -> _Continuation:
+    func = resolve_function(node, env)
+    if type(func) is Fault:
+        return func
+
+    values = yield from _arguments(node, env)
+    if type(values) is Fault:
+        return values
+    if type(func) is Builtin:
+        if func.awaitable is None:
+            return func.fn(*values)
+        return (yield _Blocking(func, values))
+    return (yield _Invoke(func, values))
+
+
+def _spawn(node: SpawnExpression, env: Environment) -> _Continuation:
+    func = resolve_function(node.call, env)
+    if type(func) is Fault:
+        return func
+
+    values = yield from _arguments(node.call, env)
+    if type(values) is Fault:
+        return values
+
+    task = yield _Spawn(func, values)
+    if task is not None:
+        return task
+    if type(func) is Builtin:
+        return Task(value=func.fn(*values))
+    return Task(value=(yield _Invoke(func, values)))
+
+
+def _await(node: AwaitExpression, env: Environment) -> _Continuation:
+    task = yield node.value, env
+    if type(task) is Fault:
+        return task
+    if type(task) is Task and task.job is not None and not task.job.done():
+        return (yield _Join(task.job))
+    return await_task(task)
+
+
+def _array(node: ArrayLiteral, env: Environment) -> _Continuation:
+    elements = []
+    for element_node in node.elements:
+        element = yield element_node, env
+        if type(element) is Fault:
+            return element
+        elements.append(element)
+    return Array.from_iterable(elements)
+
+
+def _index(node: IndexExpression, env: Environment) -> _Continuation:
+    left = yield node.left, env
+    if type(left) is Fault:
+        return left
+
+    index = yield node.index, env
+    if type(index) is Fault:
+        return index
+    return apply_index(left, index)
+
+
+def _hash(node: HashLiteral, env: Environment) -> _Continuation:
+    pairs = PersistentMap()
+    for key_node, value_node in node.pairs:
+        key = yield key_node, env
+        if type(key) is Fault:
+            return key
+        if fault := Hash.key_fault(key):
+            return fault
+
+        value = yield value_node, env
+        if type(value) is Fault:
+            return value
+        pairs = pairs.set(key, value)
+    return Hash(pairs)
+
+
+def _while(node: WhileStatement, env: Environment) -> _Continuation:
+    while True:
+        condition = yield node.condition, env
+        if type(condition) is Fault:
+            return condition
+        if not is_truthy(condition):
+            return NULL
+
+        result = yield from _statements(node.body.body, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+
+def _for(node: ForStatement, env: Environment) -> _Continuation:
+    values = yield node.iterable, env
+    if type(values) is Fault:
+        return values
+
+    elements = iterate(values)
+    if type(elements) is Fault:
+        return elements
+
+    for element in elements:
+        if type(element) is Fault:
+            return element
+        env[node.name.value] = element
+        result = yield from _statements(node.body.body, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+    return NULL
+
+
+_HANDLERS: dict[type, Callable[[Any, Environment], _Continuation]] = {
+    Program: _program,
+    BlockStatement: _block,
+    ExpressionStatement: _expression_statement,
+    VarStatement: _var,
+    PrefixExpression: _prefix,
+    InfixExpression: _infix,
+    IfElseExpression: _if_else,
+    CallExpression: _call,
+    ArrayLiteral: _array,
+    IndexExpression: _index,
+    HashLiteral: _hash,
+    WhileStatement: _while,
+    ForStatement: _for,
+    SpawnExpression: _spawn,
+    AwaitExpression: _await,
+}
+
+
+class StackEvaluator:
+    """Evaluate without recursing in Python.
+
+    Sloth calls are limited by :max_depth:, counted in Sloth frames. Going over
+    it results in a Fault instead of a RecursionError. Nodes without a handler
+    here are evaluated by :func:`sloth.evaluation.evaluate`.
+    """
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        self.max_depth = max_depth
+
+    def evaluate(self, node: Node, env: Environment) -> Any:
+        handler = _HANDLERS.get(type(node))
+        if handler is None:
+            return evaluate(node, env)
+
+        # Spawned calls run in place and blocking builtins are simply called
+        runner = self._run(handler(node, env))
+        value: Any = None
+        while True:
+            try:
+                request = runner.send(value)
+            except StopIteration as stop:
+                return stop.value
+
+            match request:
+                case _Blocking():
+                    value = request.func.fn(*request.values)
+                case _Spawn():
+                    value = None
+                case _Join():
+                    # Only reachable with a task left over from evaluate_async
+                    value = await_task(Task(job=request.job))
+
+    async def evaluate_async(self, node: Node, env: Environment) -> Any:
+        """Evaluate on the running event loop, `spawn` starts an asyncio task.
+
+        Tasks share :env: and the AST, each gets its own stack and call frames.
+        Returns once every task started along the way has finished. Functions
+        called back by builtins such as `map` still run to completion in place.
+        """
+        handler = _HANDLERS.get(type(node))
+        if handler is None:
+            return evaluate(node, env)
+
+        jobs: list[asyncio.Task] = []
+        result = await self._drive(handler(node, env), jobs)
+        while jobs:
+            await jobs.pop()
+        return result
+
+    async def _drive(self, root: _Continuation, jobs: list[asyncio.Task]) -> Any:
+        runner = self._run(root)
+        value: Any = None
+        error: Exception | None = None
+        while True:
+            try:
+                if error is not None:
+                    request = runner.throw(error)
+                    error = None
+                else:
+                    request = runner.send(value)
+            except StopIteration as stop:
+                return stop.value
+
+            try:
+                match request:
+                    case _Blocking():
+                        value = await request.func.awaitable(*request.values)
+                    case _Spawn():
+                        job = asyncio.create_task(self._task(request, jobs))
+                        jobs.append(job)
+                        value = Task(job=job)
+                    case _Join():
+                        value = await request.job
+            except Exception as e:
+                error = e
+
+    async def _task(self, request: _Spawn, jobs: list[asyncio.Task]) -> Any:
+        func, values = request.func, request.values
+        if type(func) is not Builtin:
+            return await self._drive(_invoke(func, values), jobs)
+        if func.awaitable is None:
+            return func.fn(*values)
+        return await func.awaitable(*values)
+
+    def _run(self, root: _Continuation) -> _Continuation:
+        """Run :root: to completion, yielding requests only a driver can answer"""
+        # Each entry is a continuation and, for function bodies, the call frame
+        stack: list[tuple[_Continuation, Frame | None]] = [(root, None)]
+        depth = 0
+        value: Any = None
+        error: BaseException | None = None
+
+        while stack:
+            continuation, frame = stack[-1]
+            try:
+                if error is not None:
+                    request = continuation.throw(error)
+                    error = None
+                else:
+                    request = continuation.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                if frame is None:
+                    continue
+
+                FRAME_POOL.release(frame)
+                if type(value) is ReturnValue:
+                    value = value.value
+                if type(value) is TailCall:
+                    frame = FRAME_POOL.acquire(
+                        value.func.env, value.func.parameters, value.values
+                    )
+                    body = _tail_statements(value.func.body.body, frame)
+                    stack.append((body, frame))
+                    value = None
+                else:
+                    depth -= 1
+                continue
+            except BaseException as e:
+                stack.pop()
+                if frame is not None:
+                    depth -= 1
+                if not stack:
+                    raise
+                error = e
+                continue
+
+            value = None
+            if type(request) is _Invoke:
+                if depth >= self.max_depth:
+                    value = Fault(
+                        f"maximum recursion depth of {self.max_depth} exceeded"
+                    )
+                    continue
+
+                depth += 1
+                func = request.func
+                frame = FRAME_POOL.acquire(func.env, func.parameters, request.values)
+                stack.append((_tail_statements(func.body.body, frame), frame))
+                continue
+
+            if type(request) is not tuple:
+                try:
+                    value = yield request
+                except BaseException as e:
+                    error = e
+                continue
+
+            sub_node, sub_env = request
+            handler = _HANDLERS.get(type(sub_node))
+            if handler is None:
+                try:
+                    value = evaluate(sub_node, sub_env)
+                except BaseException as e:
+                    error = e
+            else:
+                stack.append((handler(sub_node, sub_env), None))
+
+        return value
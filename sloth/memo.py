@@ -0,0 +1,212 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+from typing import Any, Hashable
+from weakref import WeakKeyDictionary
+
+from .analysis import callees, free_variables
+from .builtins import BUILTINS
+from .objects import Builtin, Environment, Function
+
+MISSING = object()
+
+
+@dataclass(frozen=True, slots=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+
+class LRUCache:
+    """Mapping bounded to :max_size: entries, evicting the least recently used.
+
+    Safe to share between threads, every operation holds the cache lock.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def resize(self, max_size: int) -> None:
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            size = len(self._entries)
+            return CacheStats(
+                self.hits, self.misses, self.evictions, size, self.max_size
+            )
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Rebinding a name to or from one of these may change what a function calls
+_CALLABLE = (Function, Builtin, type(None))
+
+
+@dataclass(frozen=True, slots=True)
+class Purity:
+    """Outcome of analysing a closure.
+
+    :reads: are the scope and name of every free variable a call reads, those
+    of its callees included, and :values: what they were bound to at the time.
+    """
+
+    pure: bool
+    reads: tuple[tuple[Environment, str], ...]
+    values: tuple
+
+    def bindings(self) -> tuple:
+        return tuple(scope.get(name) for scope, name in self.reads)
+
+    def rebound(self, bindings: tuple) -> bool:
+        """Whether a name called by the function is now bound to another value"""
+        for old, new in zip(self.values, bindings):
+            if old is not new and (type(old) in _CALLABLE or type(new) in _CALLABLE):
+                return True
+        return False
+
+
+class Memoizer:
+    """Results of pure Sloth functions, keyed by the function and its arguments.
+
+    A function is pure when every function it calls is known and pure itself.
+    Calling one of its own arguments or locals makes it impure, since those can
+    be bound to anything. The values of the free variables it reads, through
+    its callees too, are part of the key, so rebinding them is never answered
+    from the cache. Purity is decided on the first call of each closure and
+    again once a name it calls is rebound. Off unless enabled.
+    """
+
+    def __init__(self, max_size: int = 4096, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.cache = LRUCache(max_size)
+        self._purity: WeakKeyDictionary[Function, Purity] = WeakKeyDictionary()
+        self._purity_lock = threading.Lock()
+
+    def configure(self, max_size: int | None = None, enabled: bool | None = None):
+        if max_size is not None:
+            self.cache.resize(max_size)
+        if enabled is not None:
+            self.enabled = enabled
+
+    def key(self, func: Function, values: list) -> Hashable | None:
+        """Cache key of a call, None when the call must not be cached"""
+        if not self.enabled:
+            return None
+        purity, bindings = self._current(func)
+        if not purity.pure:
+            return None
+
+        # The arity is fixed, so arguments and bindings never run into each other
+        key = (func, *values, *bindings)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def is_pure(self, func: Function) -> bool:
+        return self._current(func)[0].pure
+
+    def stats(self) -> CacheStats:
+        return self.cache.stats()
+
+    def clear(self) -> None:
+        self.cache.clear()
+        with self._purity_lock:
+            self._purity.clear()
+
+    def _current(self, func: Function) -> tuple[Purity, tuple]:
+        """Purity of :func: with the values its reads are bound to now"""
+        purity = self._purity.get(func)
+        if purity is not None:
+            bindings = purity.bindings()
+            if not purity.rebound(bindings):
+                return purity, bindings
+
+        with self._purity_lock:
+            reads: dict[tuple[int, str], tuple[Environment, str]] = {}
+            pure = self._analyse(func, set(), reads)
+            found = tuple(reads.values())
+            purity = Purity(pure, found, tuple(s.get(name) for s, name in found))
+            self._purity[func] = purity
+        return purity, purity.values
+
+    def _analyse(
+        self,
+        func: Function,
+        visiting: set[int],
+        reads: dict[tuple[int, str], tuple[Environment, str]],
+    ) -> bool:
+        if id(func) in visiting:
+            return True  # recursion, pure unless something else says otherwise
+
+        visiting.add(id(func))
+        for name in free_variables(func):  # type: ignore[arg-type]
+            reads.setdefault((id(func.env), name), (func.env, name))
+
+        called = callees(func.arguments, func.body)
+        if called.dynamic:
+            return False
+        for name in called.free:
+            callee = func.env.get(name) or BUILTINS.get(name)
+            if type(callee) is Function:
+                # Results inside a cycle may rest on a caller still being
+                # analysed, only whole analyses are remembered, by _current.
+                known = self._purity.get(callee)
+                if known is not None and not known.rebound(known.bindings()):
+                    for scope, read in known.reads:
+                        reads.setdefault((id(scope), read), (scope, read))
+                    pure = known.pure
+                else:
+                    pure = self._analyse(callee, visiting, reads)
+            elif type(callee) is Builtin:
+                pure = callee.pure
+            else:
+                pure = False
+
+            if not pure:
+                return False
+        return True
+
+
+MEMO = Memoizer()
@@ -0,0 +1,181 @@
+"""Numeric arrays evaluated element-wise outside of the interpreter loop.
+
+A :class:`NumArray` holds 64-bit integers in a NumPy ``ndarray`` when NumPy is
+installed, otherwise in an ``array.array``. Operators run over the whole buffer
+at once, a scalar operand is broadcast to every element.
+
+Results that do not fit in 64 bits are a Fault and sums are exact, whichever
+buffer holds the elements.
+"""
+
+from array import array
+from dataclasses import dataclass
+import operator
+from typing import Any, Callable, Iterable
+
+from .objects import Fault, Integer, ObjectType, SlothObject, Types
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+HAVE_NUMPY = numpy is not None
+
+_TYPECODE = "q"
+
+_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+_COMPARISONS = frozenset(("==", "!=", ">", "<"))
+
+_INT64 = 1 << 63
+
+
+def _buffer(values: Iterable[int]) -> Any:
+    if numpy is not None:
+        return numpy.fromiter(values, dtype=numpy.int64)
+    return array(_TYPECODE, values)
+
+
+@dataclass(frozen=True, slots=True)
+class NumArray(SlothObject):
+    """Fixed size array of integers, comparisons give 1 and 0"""
+
+    data: Any
+
+    @classmethod
+    def from_values(cls, values: Iterable[int]) -> "NumArray":
+        return cls(_buffer(values))
+
+    @classmethod
+    def filled(cls, value: int, size: int) -> "NumArray":
+        if numpy is not None:
+            return cls(numpy.full(size, value, dtype=numpy.int64))
+        return cls(array(_TYPECODE, [value]) * size)
+
+    @classmethod
+    def range(cls, start: int, stop: int) -> "NumArray":
+        if numpy is not None:
+            return cls(numpy.arange(start, stop, dtype=numpy.int64))
+        return cls(array(_TYPECODE, range(start, stop)))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> int:
+        return int(self.data[index])
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not NumArray:
+            return NotImplemented
+        return len(self) == len(other) and self.tolist() == other.tolist()
+
+    def tolist(self) -> list[int]:
+        return [int(value) for value in self.data]
+
+    def slice(self, start: int, stop: int) -> "NumArray":
+        # NumPy hands out a view, fine since buffers are never written in place
+        return NumArray(self.data[start:stop])
+
+    def sum(self) -> int:
+        if numpy is not None and len(self) * _magnitude(self.data) < _INT64:
+            return int(self.data.sum())
+        return sum(self.tolist())  # Python ints never wrap
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.NUMARRAY)
+
+    def inspect(self) -> str:
+        return f"numarray([{', '.join(map(str, self.tolist()))}])"
+
+
+def _operand(value: Any) -> Any:
+    match value:
+        case NumArray():
+            return value.data
+        case Integer():
+            return value.value
+        case _:
+            return None
+
+
+def apply_elementwise(operator_: str, left: Any, right: Any) -> NumArray | Fault:
+    """Apply an infix operator where at least one side is a NumArray"""
+    function = _OPERATORS.get(operator_)
+    if function is None:
+        return Fault(f'operator "{operator_}" for {Types.NUMARRAY} is not supported')
+
+    lhs, rhs = _operand(left), _operand(right)
+    if lhs is None or rhs is None:
+        other = right if lhs is not None else left
+        return Fault(f"{Types.NUMARRAY} and {other.type()} can not be combined")
+
+    if type(left) is type(right) and len(left) != len(right):
+        return Fault(f"{Types.NUMARRAY} sizes {len(left)} and {len(right)} differ")
+
+    if operator_ == "/" and _has_zero(rhs):
+        return Fault("can not divide by zero")
+
+    if numpy is not None:
+        if operator_ in _COMPARISONS:
+            return NumArray(function(lhs, rhs).astype(numpy.int64))
+        if _fits(operator_, lhs, rhs):
+            return NumArray(function(lhs, rhs))
+        # NumPy would wrap around, compute with Python ints and check each result
+        lhs, rhs = _to_python(lhs), _to_python(rhs)
+
+    try:
+        return NumArray(_buffer(_fallback(function, lhs, rhs)))
+    except OverflowError:
+        return Fault(f"{Types.NUMARRAY} element overflow")
+
+
+def _has_zero(operand: Any) -> bool:
+    if isinstance(operand, int):
+        return operand == 0
+    if numpy is not None:
+        return bool((operand == 0).any())
+    return 0 in operand
+
+
+def _to_python(operand: Any) -> Any:
+    return operand if isinstance(operand, int) else operand.tolist()
+
+
+def _magnitude(operand: Any) -> int:
+    if isinstance(operand, int):
+        return abs(operand)
+    if not len(operand):
+        return 0
+    return max(abs(int(operand.min())), abs(int(operand.max())))
+
+
+def _fits(operator_: str, lhs: Any, rhs: Any) -> bool:
+    """Whether int64 arithmetic on :lhs: and :rhs: gives the exact result"""
+    left, right = _magnitude(lhs), _magnitude(rhs)
+    match operator_:
+        case "+" | "-":
+            return left + right < _INT64
+        case "*":
+            return left * right < _INT64
+        case _:
+            # Operands fit, and the lowest value is never divided by -1
+            return max(left, right) < _INT64
+
+
+def _fallback(function: Callable[[Any, Any], Any], lhs: Any, rhs: Any) -> Any:
+    # int() turns the booleans of comparisons into 1 and 0
+    if isinstance(lhs, int):
+        return (int(function(lhs, value)) for value in rhs)
+    if isinstance(rhs, int):
+        return (int(function(value, rhs)) for value in lhs)
+    return (int(function(a, b)) for a, b in zip(lhs, rhs))
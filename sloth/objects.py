@@ -1,11 +1,12 @@
 from dataclasses import dataclass, field
 import json
-from typing import Protocol
+import pickle
+from typing import Any, Awaitable, Callable, Iterator, Protocol
 
-from copy import deepcopy
 from enum import StrEnum, unique
 
 from sloth.ast import BlockStatement, Identifier
+from sloth.persistent import PersistentMap, PersistentVector
 
 
 @unique
@@ -17,6 +18,13 @@ class Types(StrEnum):
     FAULT = "FAULT"
     ENVIRONMENT = "ENVIRONMENT"
     FUNC = "FUNC"
+    BUILTIN = "BUILTIN"
+    ARRAY = "ARRAY"
+    NUMARRAY = "NUMARRAY"
+    HASH = "HASH"
+    RANGE = "RANGE"
+    STREAM = "STREAM"
+    TASK = "TASK"
 
 
 class ObjectType(str):
@@ -25,27 +33,145 @@ class ObjectType(str):
         return cls(str_)
 
 
+_MISSING = object()
+
+
 class SlothObject(Protocol):
     def type(self) -> ObjectType: ...
 
     def inspect(self) -> str: ...
 
 
-class Environment(SlothObject, dict):
-    def copy(self):
-        return deepcopy(self)
+class Cell:
+    """Binding shared by the scope that holds it and the closures reading it"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+class Environment(SlothObject):
+    """Scope of bindings linked to its enclosing scope.
+
+    Names are resolved by walking the ``outer`` chain, so a child scope is
+    created in O(1). ``copy`` is copy-on-write: the snapshot shares the store of
+    the scope until one of the sides binds a name, and links to the same outer
+    scopes. Names held in a :class:`Cell` stay shared by both sides.
+    ``version`` changes whenever a name is added or a function binding is
+    replaced, which lets callers cache function lookups while loops rebind
+    plain values.
+    """
+
+    __slots__ = ("_store", "_shared", "outer", "version")
+
+    def __init__(
+        self, store: dict | None = None, outer: "Environment | None" = None
+    ) -> None:
+        self._store: dict = {} if store is None else store
+        self._shared: bool = False
+        self.outer = outer
+        self.version = 0
+
+    def get(self, name: str, default=None):
+        env: Environment | None = self
+        while env is not None:
+            store = env._store
+            if name in store:
+                value = store[name]
+                return value.value if type(value) is Cell else value
+            env = env.outer
+        return default
+
+    def __getitem__(self, name: str):
+        value = self.get(name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name: str, value) -> None:
+        """Bind a name in this scope, never in the outer ones."""
+        if self._shared:
+            self._store = dict(self._store)
+            self._shared = False
+        store = self._store
+        current = store.get(name, _MISSING)
+        if type(current) is Cell:
+            # Captured by a closure, which sees the new value too
+            if type(current.value) in _VERSIONED:
+                self.version += 1
+            current.value = value
+            return
+        if type(current) in _VERSIONED:
+            self.version += 1
+        store[name] = value
+
+    def __contains__(self, name: object) -> bool:
+        return self.get(name, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self):
+        return iter(self._store)
+
+    def scope_of(self, name: str) -> "Environment | None":
+        """The nearest scope that binds :name:"""
+        env: Environment | None = self
+        while env is not None and name not in env._store:
+            env = env.outer
+        return env
+
+    def cell(self, name: str) -> Cell:
+        """Cell of :name:, bound in this scope, made on first use.
+
+        Closures hold the cell instead of the value, so they see the name
+        rebound afterwards and the other way around.
+        """
+        value = self._store[name]
+        if type(value) is Cell:
+            return value
+        if self._shared:
+            self._store = dict(self._store)
+            self._shared = False
+        cell = self._store[name] = Cell(value)
+        return cell
+
+    def root(self) -> "Environment":
+        env = self
+        while env.outer is not None:
+            env = env.outer
+        return env
+
+    def child(self) -> "Environment":
+        return Environment(outer=self)
+
+    def copy(self) -> "Environment":
+        """Snapshot of this scope in O(1), sharing its outer scopes.
+
+        Both sides keep the same store until one of them binds a name. Like a
+        closure, the snapshot sees later bindings made in the outer scopes.
+        """
+        self._shared = True
+        snapshot = Environment(self._store, self.outer)
+        snapshot._shared = True
+        return snapshot
 
     def type(self) -> ObjectType:
-        return ObjectType.from_type(Types.INTEGER)
+        return ObjectType.from_type(Types.ENVIRONMENT)
 
     def inspect(self) -> str:
-        return json.dumps(self, indent=4)
+        bindings = {name: self.get(name).inspect() for name in self._store}
+        return json.dumps(bindings, indent=4)
 
 
 @dataclass(frozen=True, slots=True)
 class Integer(SlothObject):
     value: int
 
+    def __eq__(self, other: object) -> bool:
+        return self is other or (type(other) is Integer and self.value == other.value)
+
     def type(self) -> ObjectType:
         return ObjectType.from_type(Types.INTEGER)
 
@@ -53,9 +179,118 @@ class Integer(SlothObject):
         return str(self.value)
 
 
-@dataclass(frozen=True, slots=True)
+ROPE_MIN_LENGTH = 256
+VIEW_MIN_LENGTH = 64
+
+
 class String(SlothObject):
-    value: str
+    """Immutable string, concatenated and sliced lazily.
+
+    ``concat`` of long strings only links both sides in a rope node and
+    ``slice`` of a long string is a view, an offset into the buffer of the
+    original. Either way the characters are copied once, the first time
+    ``value`` is read, so building a string piece by piece is linear and
+    slicing is O(1).
+    """
+
+    # A rope keeps its (left, right) halves and a view its (source, start) in
+    # _lazy, until value is read. Either is one immutable tuple, replaced by a
+    # single assignment, so threads reading a string at the same time see the
+    # whole pair or none of it. At worst they both copy the characters.
+    __slots__ = ("_value", "_lazy", "length")
+
+    def __init__(self, value: str) -> None:
+        self._value: str | None = value
+        self._lazy: tuple[Any, Any] | None = None
+        self.length = len(value)
+
+    @classmethod
+    def _lazy_string(cls, length: int, lazy: tuple[Any, Any]) -> "String":
+        string = cls.__new__(cls)
+        string._value = None
+        string._lazy = lazy
+        string.length = length
+        return string
+
+    @classmethod
+    def concat(cls, left: "String", right: "String") -> "String":
+        length = left.length + right.length
+        if length < ROPE_MIN_LENGTH:
+            return make_string(left.value + right.value)
+        if not right.length:
+            return left
+        if not left.length:
+            return right
+        return cls._lazy_string(length, (left, right))
+
+    def slice(self, start: int, stop: int) -> "String":
+        """Characters from :start: up to :stop:, negative indexes count from the end"""
+        start, stop, _ = slice(start, stop).indices(self.length)
+        length = max(stop - start, 0)
+        if length == self.length:
+            return self
+
+        source, offset = self._buffer()
+        if length < VIEW_MIN_LENGTH:
+            # Copying a short string is cheaper than keeping a view
+            return make_string(source[offset + start : offset + start + length])
+        return self._lazy_string(length, (source, offset + start))
+
+    def char_at(self, index: int) -> str:
+        source, offset = self._buffer()
+        return source[offset + index]
+
+    def find(self, sub: "String") -> int:
+        """Index of the first occurrence of :sub:, -1 when there is none"""
+        source, offset = self._buffer()
+        found = source.find(sub.value, offset, offset + self.length)
+        return found if found < 0 else found - offset
+
+    @property
+    def is_flat(self) -> bool:
+        return self._value is not None
+
+    @property
+    def value(self) -> str:
+        value = self._value
+        if value is not None:
+            return value
+
+        lazy = self._lazy
+        if lazy is None:
+            # Another thread copied the characters in the meantime
+            return self._value  # type: ignore[return-value]
+        first, second = lazy
+        if type(first) is str:
+            value = first[second : second + self.length]
+        else:
+            value = _flatten(lazy)
+        self._value = value
+        self._lazy = None
+        return value
+
+    def _buffer(self) -> tuple[str, int]:
+        """Backing str and the offset of this string in it, without copying views"""
+        lazy = self._lazy
+        if lazy is not None and type(lazy[0]) is str:
+            return lazy
+        return self.value, 0
+
+    def __eq__(self, other: object) -> bool:
+        return self is other or (
+            type(other) is String
+            and self.length == other.length
+            and self.value == other.value
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return f"String(value={self.value!r})"
+
+    def __reduce__(self):
+        return (String, (self.value,))
 
     def type(self) -> ObjectType:
         return ObjectType.from_type(Types.STRING)
@@ -75,6 +310,70 @@ class Boolean(SlothObject):
         return str(self.value)
 
 
+SMALL_INTEGER_MIN = -5
+SMALL_INTEGER_MAX = 256
+_SMALL_INTEGERS = [
+    Integer(value) for value in range(SMALL_INTEGER_MIN, SMALL_INTEGER_MAX + 1)
+]
+
+
+def make_integer(value: int) -> Integer:
+    """Box :value:, sharing one instance for each small integer"""
+    if SMALL_INTEGER_MIN <= value <= SMALL_INTEGER_MAX:
+        return _SMALL_INTEGERS[value - SMALL_INTEGER_MIN]
+    return Integer(value)
+
+
+class StringPool:
+    """Bounded table of interned short strings.
+
+    Once :max_size: strings are interned, new ones are boxed without being
+    remembered, so the table never grows past the bound.
+    """
+
+    def __init__(self, max_size: int = 4096, max_length: int = 64) -> None:
+        self.max_size = max_size
+        self.max_length = max_length
+        self._strings: dict[str, String] = {}
+
+    def intern(self, value: str) -> String:
+        if (string := self._strings.get(value)) is not None:
+            return string
+
+        string = String(value)
+        if len(value) <= self.max_length and len(self._strings) < self.max_size:
+            self._strings[value] = string
+        return string
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def clear(self) -> None:
+        self._strings.clear()
+
+
+STRING_POOL = StringPool()
+
+
+def _flatten(halves: tuple[String, String]) -> str:
+    # Iterative, a string built in a loop is a very deep left leaning rope
+    pieces = []
+    stack = [halves[1], halves[0]]
+    while stack:
+        node = stack.pop()
+        lazy = node._lazy
+        if lazy is not None and type(lazy[0]) is String:
+            stack.append(lazy[1])
+            stack.append(lazy[0])
+        else:
+            pieces.append(node.value)
+    return "".join(pieces)
+
+
+def make_string(value: str) -> String:
+    return STRING_POOL.intern(value)
+
+
 @dataclass(frozen=True, slots=True)
 class Null(SlothObject):
     def type(self) -> ObjectType:
@@ -84,6 +383,12 @@ class Null(SlothObject):
         return "Null"
 
 
+# Native constants
+TRUE = Boolean(True)
+FALSE = Boolean(False)
+NULL = Null()
+
+
 @dataclass(frozen=True, slots=True)
 class Fault(SlothObject):
     message: str
@@ -95,11 +400,20 @@ class Fault(SlothObject):
         return f"Fault: {self.message}"
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, eq=False)
 class Function(SlothObject):
+    """Closure, compared and hashed by identity"""
+
     arguments: list[Identifier]
     body: BlockStatement
     env: Environment = field(default_factory=Environment)
+    # Created by the unboxed mode, its scopes hold raw Python values
+    unboxed: bool = field(default=False, repr=False)
+    parameters: tuple[str, ...] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        names = tuple(ident.value for ident in self.arguments)
+        object.__setattr__(self, "parameters", names)
 
     def type(self) -> ObjectType:
         return ObjectType.from_type(Types.FUNC)
@@ -107,3 +421,139 @@ class Function(SlothObject):
     def inspect(self) -> str:
         args = ", ".join(map(str, self.arguments))
         return f"func({args}) {{ {str(self.body)} }}"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Builtin(SlothObject):
+    """Function implemented in Python"""
+
+    name: str
+    arity: int
+    fn: Callable[..., Any]
+    pure: bool = False
+    # Used instead of fn under evaluate_async, lets other tasks run meanwhile
+    awaitable: Callable[..., Awaitable[Any]] | None = None
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.BUILTIN)
+
+    def inspect(self) -> str:
+        return f"builtin {self.name}"
+
+    def __reduce__(self):
+        # Exposed callables are closures, a registered builtin is sent by name
+        # and looked up again where it is loaded, e.g. in a worker process.
+        from .builtins import BUILTINS
+
+        if BUILTINS.get(self.name) is self:
+            return (_registered_builtin, (self.name,))
+        return (Builtin, (self.name, self.arity, self.fn, self.pure, self.awaitable))
+
+
+def _registered_builtin(name: str) -> Builtin:
+    from .builtins import BUILTINS
+
+    builtin = BUILTINS.get(name)
+    if builtin is None:
+        raise pickle.UnpicklingError(f"builtin {name} is not registered here")
+    return builtin
+
+
+@dataclass(frozen=True, slots=True)
+class Range(SlothObject):
+    """Integers from :start: up to :stop:, produced one at a time"""
+
+    start: int
+    stop: int
+
+    def __len__(self) -> int:
+        return max(self.stop - self.start, 0)
+
+    def __iter__(self) -> Iterator[Integer]:
+        return map(make_integer, range(self.start, self.stop))
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.RANGE)
+
+    def inspect(self) -> str:
+        return f"range({self.start}, {self.stop})"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Stream(SlothObject):
+    """Values pulled one at a time from :source:, consumed by the first pass.
+
+    A Fault produced while pulling is yielded in place of the value, consumers
+    stop at it.
+    """
+
+    source: Iterator[Any]
+
+    # Unhashable so calls receiving a stream are never memoized
+    __hash__ = None  # type: ignore[assignment]
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.source
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.STREAM)
+
+    def inspect(self) -> str:
+        return "stream"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Task(SlothObject):
+    """Call started by `spawn`, `await` gives its result.
+
+    :job: is the asyncio task running the call under evaluate_async. The other
+    evaluators run the call right away and keep its result in :value:.
+    """
+
+    value: Any = None
+    job: Any = None
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.TASK)
+
+    def inspect(self) -> str:
+        return "task"
+
+
+# Bindings whose change invalidates cached function lookups
+_VERSIONED = (type(_MISSING), Function, Builtin)
+
+
+@dataclass(frozen=True, slots=True)
+class Array(SlothObject):
+    elements: PersistentVector = field(default_factory=PersistentVector)
+
+    @classmethod
+    def from_iterable(cls, elements) -> "Array":
+        return cls(PersistentVector.from_iterable(elements))
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.ARRAY)
+
+    def inspect(self) -> str:
+        return f"[{', '.join(element.inspect() for element in self.elements)}]"
+
+
+@dataclass(frozen=True, slots=True)
+class Hash(SlothObject):
+    """Immutable map, updates share structure with the original"""
+
+    pairs: PersistentMap = field(default_factory=PersistentMap)
+
+    @staticmethod
+    def key_fault(key: Any) -> Fault | None:
+        if type(key) in (Integer, String, Boolean):
+            return None
+        return Fault(f"unusable as hash key: {key.type()}")
+
+    def type(self) -> ObjectType:
+        return ObjectType.from_type(Types.HASH)
+
+    def inspect(self) -> str:
+        pairs = self.pairs.items()
+        return f"{{{', '.join(f'{k.inspect()}: {v.inspect()}' for k, v in pairs)}}}"
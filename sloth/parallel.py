@@ -0,0 +1,143 @@
+"""Map a Sloth function over a sequence in worker processes.
+
+The function is pickled together with the bindings it reads and sent to a
+:class:`WorkerPool` once per chunk of elements, so CPU bound work is not
+serialized by the GIL. Workers are started on first use and import the runtime
+before taking any work.
+"""
+
+from concurrent.futures import Future, ProcessPoolExecutor
+import importlib
+import multiprocessing
+import os
+import pickle
+import threading
+from typing import Any
+
+from .analysis import free_variables
+from .builtins import apply
+from .memo import MEMO
+from .objects import Array, Environment, Fault, Function, Range
+
+_MISSING = object()
+
+# Chunks handed out per worker, more evens out uneven elements
+CHUNKS_PER_WORKER = 4
+
+
+def _load_runtime() -> None:
+    importlib.import_module("sloth.evaluation")
+
+
+class WorkerPool:
+    """Process pool started on first use.
+
+    Workers are spawned rather than forked, so they never inherit the state of
+    a running program, only what :func:`parallel_map` sends them.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_runtime,
+                )
+            return self._executor
+
+    def resize(self, max_workers: int) -> None:
+        self.shutdown()
+        self.max_workers = max_workers
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+WORKERS = WorkerPool()
+
+
+def portable(func: Function) -> Function:
+    """Copy of :func: whose closure keeps only the names it reads.
+
+    Functions found there are copied the same way, so a closure over a large
+    or unpicklable global scope ships just what the call needs.
+    """
+    return _portable(func, {})
+
+
+def _portable(func: Function, copies: dict[Function, Function]) -> Function:
+    if func in copies:
+        return copies[func]
+
+    store: dict = {}
+    copy = Function(func.arguments, func.body, Environment(store), func.unboxed)
+    copies[func] = copy
+    for name in sorted(free_variables(func)):  # type: ignore[arg-type]
+        value = func.env.get(name, _MISSING)
+        if value is _MISSING:
+            continue  # A builtin, or a fault once the copy runs
+        store[name] = _portable(value, copies) if type(value) is Function else value
+    return copy
+
+
+# Last function a worker unpickled, chunks of the same call reuse it
+_loaded: tuple[bytes, Any] = (b"", None)
+
+
+def _run_chunk(payload: bytes, chunk: list, memoize: bool) -> list:
+    """Apply the pickled function to :chunk:, stopping at the first Fault"""
+    global _loaded
+    MEMO.configure(enabled=memoize)
+    if _loaded[0] != payload:
+        _loaded = (payload, pickle.loads(payload))
+    func = _loaded[1]
+
+    results = []
+    for element in chunk:
+        result = apply(func, [element])
+        results.append(result)
+        if type(result) is Fault:
+            break
+    return results
+
+
+def parallel_map(func: Any, items: Any, pool: WorkerPool = WORKERS) -> Array | Fault:
+    """Results of :func: over :items:, in order, computed by :pool:"""
+    match items:
+        case Array():
+            elements = list(items.elements)
+        case Range():
+            elements = list(items)
+        case _:
+            return Fault(f"parallel_map does not support {items.type()}")
+
+    try:
+        payload = pickle.dumps(portable(func) if type(func) is Function else func)
+        workers = pool.start()
+        size = max(-(-len(elements) // (pool.max_workers * CHUNKS_PER_WORKER)), 1)
+        futures: list[Future] = [
+            workers.submit(
+                _run_chunk, payload, elements[start : start + size], MEMO.enabled
+            )
+            for start in range(0, len(elements), size)
+        ]
+        results = []
+        for future in futures:
+            chunk = future.result()
+            if chunk and type(chunk[-1]) is Fault:
+                for pending in futures:
+                    pending.cancel()
+                return chunk[-1]
+            results.extend(chunk)
+    except Exception as e:
+        return Fault(f"parallel_map: {e}")
+    return Array.from_iterable(results)
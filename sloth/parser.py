@@ -1,22 +1,30 @@
 from enum import IntEnum, auto
 from typing import Protocol
 from .token import Token, TokenType
+from .analysis import enclose
 from .ast import (
+    ArrayLiteral,
+    AwaitExpression,
     BlockStatement,
     CallExpression,
     Expression,
     ExpressionStatement,
+    ForStatement,
     FunctionLiteral,
+    HashLiteral,
     Identifier,
     IfElseExpression,
+    IndexExpression,
     InfixExpression,
     IntegerLiteral,
     PrefixExpression,
     Program,
     ReturnStatement,
+    SpawnExpression,
     Statement,
     StringLiteral,
     VarStatement,
+    WhileStatement,
     BooleanLiteral,
 )
 from .lexer import Lexer
@@ -64,6 +72,25 @@ def parse_prefix_expression(parser: "Parser") -> PrefixExpression:
     return PrefixExpression(token, token.literal, right_expression)
 
 
+def parse_spawn_expression(parser: "Parser") -> SpawnExpression | None:
+    token = Token.copy(parser._token)
+    parser._next_token()
+    call = parser._parse_expression(Precedence.PREFIX)
+
+    if not isinstance(call, CallExpression):
+        parser.errors.append(ParsingError(f"spawn expects a call, got {call}"))
+        return None
+    return SpawnExpression(token, call)
+
+
+def parse_await_expression(parser: "Parser") -> AwaitExpression:
+    token = Token.copy(parser._token)
+    parser._next_token()
+    value = parser._parse_expression(Precedence.PREFIX)
+
+    return AwaitExpression(token, value)
+
+
 def parse_grouped_expression(parser: "Parser") -> Expression | None:
     parser._next_token()
     expression = parser._parse_expression(Precedence.LOWEST)
@@ -93,12 +120,15 @@ def parse_block_statement(parser: "Parser") -> BlockStatement:
     parser._assert_and_move(TokenType.LBRACE)
 
     while not parser._token_is(TokenType.RBRACE):
+        if parser._token_is(TokenType.EOF):
+            parser.errors.append(ParsingError("Expected } before end of input"))
+            break
+
         if stmt := parser._parse_statement():
             stmts.append(stmt)
         parser._next_token()  # move to next stmt
 
-    # current token is RBRACE, skip it - close the body
-    parser._assert_and_move(TokenType.RBRACE)
+    # Stay on RBRACE, like every other parse function stays on its last token
     return BlockStatement(token, stmts)
 
 
@@ -115,12 +145,58 @@ def parse_if_else_statement(parser: "Parser") -> IfElseExpression | None:
     consequance: BlockStatement = parse_block_statement(parser)
 
     alternative = None
-    if parser._token_is(TokenType.ELSE) and parser._expect_peek(TokenType.LBRACE):
+    if parser._peek_token_is(TokenType.ELSE):
+        parser._next_token()
+        if not parser._expect_peek(TokenType.LBRACE):
+            return None
         alternative = parse_block_statement(parser)
 
     return IfElseExpression(token, condition, consequance, alternative)
 
 
+def parse_while_statement(parser: "Parser") -> WhileStatement | None:
+    token = Token.copy(parser._token)
+
+    if not parser._expect_peek(TokenType.LPAREN):
+        return None
+
+    condition = parser._parse_expression(Precedence.LOWEST)
+    if not parser._expect_peek(TokenType.LBRACE):
+        return None
+
+    body = parse_block_statement(parser)
+    if parser._peek_token_is(TokenType.SEMICOLON):
+        parser._next_token()
+
+    return WhileStatement(token, condition, body)
+
+
+def parse_for_statement(parser: "Parser") -> ForStatement | None:
+    token = Token.copy(parser._token)
+
+    if not parser._expect_peek(TokenType.LPAREN):
+        return None
+    if not parser._expect_peek(TokenType.IDENT):
+        return None
+
+    name = Identifier(parser._token, parser._token.literal)
+    if not parser._expect_peek(TokenType.IN):
+        return None
+
+    parser._next_token()
+    iterable = parser._parse_expression(Precedence.LOWEST)
+    if not parser._expect_peek(TokenType.RPAREN):
+        return None
+    if not parser._expect_peek(TokenType.LBRACE):
+        return None
+
+    body = parse_block_statement(parser)
+    if parser._peek_token_is(TokenType.SEMICOLON):
+        parser._next_token()
+
+    return ForStatement(token, name, iterable, body)
+
+
 def parse_fn_arguments(parser: "Parser") -> list[Identifier]:
     parser._assert_and_move(TokenType.LPAREN)
 
@@ -148,12 +224,16 @@ def parse_function_literal(parser: "Parser") -> FunctionLiteral | None:
 
     body: BlockStatement = parse_block_statement(parser)
 
-    return FunctionLiteral(token, arguments, body)
+    literal = FunctionLiteral(token, arguments, body)
+    enclose(literal)
+    return literal
 
 
-def parse_call_arguments(parser: "Parser") -> list[Expression]:
-    parser._assert_and_move(TokenType.LPAREN)
-    if parser._token_is(TokenType.RPAREN):
+def parse_expression_list(
+    parser: "Parser", start: TokenType, end: TokenType
+) -> list[Expression]:
+    parser._assert_and_move(start)
+    if parser._token_is(end):
         return []
 
     exp = parser._parse_expression(Precedence.LOWEST)
@@ -171,18 +251,60 @@ def parse_call_arguments(parser: "Parser") -> list[Expression]:
             raise ValueError()
         args.append(exp)
 
-    if not parser._expect_peek(TokenType.RPAREN):
+    if not parser._expect_peek(end):
         return []
 
     return args
 
 
+def parse_call_arguments(parser: "Parser") -> list[Expression]:
+    return parse_expression_list(parser, TokenType.LPAREN, TokenType.RPAREN)
+
+
 def parse_call_expression(parser: "Parser", left: Expression) -> CallExpression:
     token = Token.copy(parser._token)
     args = parse_call_arguments(parser)
     return CallExpression(token, left, args)
 
 
+def parse_array_literal(parser: "Parser") -> ArrayLiteral:
+    token = Token.copy(parser._token)
+    elements = parse_expression_list(parser, TokenType.LBRACKET, TokenType.RBRACKET)
+    return ArrayLiteral(token, elements)
+
+
+def parse_index_expression(parser: "Parser", left: Expression) -> IndexExpression:
+    token = Token.copy(parser._token)
+    parser._next_token()
+    index = parser._parse_expression(Precedence.LOWEST)
+
+    parser._expect_peek(TokenType.RBRACKET)
+    return IndexExpression(token, left, index)
+
+
+def parse_hash_literal(parser: "Parser") -> HashLiteral | None:
+    token = Token.copy(parser._token)
+    pairs = []
+    while not parser._peek_token_is(TokenType.RBRACE):
+        parser._next_token()
+        key = parser._parse_expression(Precedence.LOWEST)
+        if not parser._expect_peek(TokenType.COLON):
+            return None
+
+        parser._next_token()
+        value = parser._parse_expression(Precedence.LOWEST)
+        pairs.append((key, value))
+
+        if parser._peek_token_is(TokenType.RBRACE):
+            break
+        if not parser._expect_peek(TokenType.COMMA):
+            return None
+
+    if not parser._expect_peek(TokenType.RBRACE):
+        return None
+    return HashLiteral(token, pairs)
+
+
 def parse_var_statement(parser: "Parser") -> VarStatement | None:
     var_token: Token = parser._token
     if not parser._expect_peek(TokenType.IDENT):
@@ -231,6 +353,7 @@ class Precedence(IntEnum):
     PRODUCT = auto()  # / or *
     PREFIX = auto()  # -x or !x
     CALL = auto()  # my_function(call)
+    INDEX = auto()  # array[index]
 
 
 precedence_mapper = {
@@ -243,6 +366,7 @@ precedence_mapper = {
     TokenType.SLASH: Precedence.PRODUCT,
     TokenType.ASTERISK: Precedence.PRODUCT,
     TokenType.LPAREN: Precedence.CALL,
+    TokenType.LBRACKET: Precedence.INDEX,
 }
 
 
@@ -266,6 +390,10 @@ class Parser:
         TokenType.BANG: parse_prefix_expression,
         TokenType.MINUS: parse_prefix_expression,
         TokenType.LPAREN: parse_grouped_expression,
+        TokenType.LBRACKET: parse_array_literal,
+        TokenType.LBRACE: parse_hash_literal,
+        TokenType.SPAWN: parse_spawn_expression,
+        TokenType.AWAIT: parse_await_expression,
     }
 
     _INFIX_REGISTRY: dict[TokenType, ParseInfixExpression] = {
@@ -278,6 +406,7 @@ class Parser:
         TokenType.MINUS: parse_infix_expression,
         TokenType.ASTERISK: parse_infix_expression,
         TokenType.SLASH: parse_infix_expression,
+        TokenType.LBRACKET: parse_index_expression,
     }
 
     def __init__(self, lexer: Lexer) -> None:
@@ -311,6 +440,10 @@ class Parser:
                 return parse_var_statement(self)
             case TokenType.RETURN:
                 return parse_return_statement(self)
+            case TokenType.WHILE:
+                return parse_while_statement(self)
+            case TokenType.FOR:
+                return parse_for_statement(self)
         return parse_expression_statement(self)
 
     def _parse_expression(self, precedence: Precedence) -> Expression | None:
@@ -0,0 +1,378 @@
+"""Immutable collections sharing structure between versions"""
+
+from typing import Any, Iterable, Iterator
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+class PersistentVector:
+    """Vector stored as a 32-way trie plus a tail of up to 32 elements.
+
+    ``append`` and ``set`` copy only the path to the changed leaf, at most
+    log32(n) nodes of 32 slots, and share the rest with the original vector.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(
+        self,
+        count: int = 0,
+        shift: int = _BITS,
+        root: list | None = None,
+        tail: list | None = None,
+    ) -> None:
+        self._count = count
+        self._shift = shift
+        self._root: list = [] if root is None else root
+        self._tail: list = [] if tail is None else tail
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[Any]) -> "PersistentVector":
+        values = list(items)
+        count = len(values)
+        tail_offset = cls._tail_offset_of(count)
+
+        nodes: list = [values[i : i + _WIDTH] for i in range(0, tail_offset, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [nodes[i : i + _WIDTH] for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+
+        return cls(count, shift, nodes, values[tail_offset:])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Any:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._leaf_for(index)[index & _MASK]
+
+    def __iter__(self) -> Iterator[Any]:
+        tail_offset = self._tail_offset_of(self._count)
+        for base in range(0, tail_offset, _WIDTH):
+            yield from self._leaf_for(base)
+        yield from self._tail
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, PersistentVector) or len(self) != len(other):
+            return False
+        return all(a == b for a, b in zip(self, other))
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"PersistentVector({list(self)!r})"
+
+    def append(self, value: Any) -> "PersistentVector":
+        count = self._count
+        if count - self._tail_offset_of(count) < _WIDTH:
+            tail = [*self._tail, value]
+            return PersistentVector(count + 1, self._shift, self._root, tail)
+
+        # The tail is full, it becomes a leaf of the trie
+        shift = self._shift
+        if (count >> _BITS) > (1 << shift):
+            root = [self._root, self._new_path(shift, self._tail)]
+            shift += _BITS
+        else:
+            root = self._push_tail(shift, self._root, self._tail)
+        return PersistentVector(count + 1, shift, root, [value])
+
+    def set(self, index: int, value: Any) -> "PersistentVector":
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+
+        if index >= self._tail_offset_of(self._count):
+            tail = list(self._tail)
+            tail[index & _MASK] = value
+            return PersistentVector(self._count, self._shift, self._root, tail)
+
+        root = self._assoc(self._shift, self._root, index, value)
+        return PersistentVector(self._count, self._shift, root, self._tail)
+
+    @staticmethod
+    def _tail_offset_of(count: int) -> int:
+        if count < _WIDTH:
+            return 0
+        return ((count - 1) >> _BITS) << _BITS
+
+    def _leaf_for(self, index: int) -> list:
+        if index >= self._tail_offset_of(self._count):
+            return self._tail
+
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(index >> level) & _MASK]
+            level -= _BITS
+        return node
+
+    def _push_tail(self, level: int, parent: list, tail: list) -> list:
+        node = list(parent)
+        index = ((self._count - 1) >> level) & _MASK
+        if level == _BITS:
+            child = tail
+        elif index < len(parent):
+            child = self._push_tail(level - _BITS, parent[index], tail)
+        else:
+            child = self._new_path(level - _BITS, tail)
+
+        if index < len(node):
+            node[index] = child
+        else:
+            node.append(child)
+        return node
+
+    @classmethod
+    def _new_path(cls, level: int, node: list) -> list:
+        if level == 0:
+            return node
+        return [cls._new_path(level - _BITS, node)]
+
+    @classmethod
+    def _assoc(cls, level: int, node: list, index: int, value: Any) -> list:
+        copy = list(node)
+        if level == 0:
+            copy[index & _MASK] = value
+        else:
+            child = (index >> level) & _MASK
+            copy[child] = cls._assoc(level - _BITS, node[child], index, value)
+        return copy
+
+
+_HASH_BITS = 32
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+_NOT_FOUND = object()
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+class _BitmapNode:
+    """Up to 32 slots, present ones packed in :entries: in bit order.
+
+    An entry is either a ``(key, value)`` tuple or a child node one level down.
+    """
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: list) -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+
+    def find(self, shift: int, key_hash: int, key: Any) -> Any:
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return _NOT_FOUND
+
+        entry = self.entries[(self.bitmap & (bit - 1)).bit_count()]
+        if type(entry) is tuple:
+            return entry[1] if entry[0] == key else _NOT_FOUND
+        return entry.find(shift + _BITS, key_hash, key)
+
+    def assoc(
+        self, shift: int, key_hash: int, key: Any, value: Any
+    ) -> tuple[Any, bool]:
+        """Node with :key: bound and whether the key is new"""
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        index = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            entries = list(self.entries)
+            entries.insert(index, (key, value))
+            return _BitmapNode(self.bitmap | bit, entries), True
+
+        entry = self.entries[index]
+        if type(entry) is tuple:
+            if entry[0] == key:
+                if entry[1] is value:
+                    return self, False
+                return self._replace(index, (key, value)), False
+            child = _pair_node(shift + _BITS, entry, key_hash, key, value)
+            return self._replace(index, child), True
+
+        child, added = entry.assoc(shift + _BITS, key_hash, key, value)
+        if child is entry:
+            return self, False
+        return self._replace(index, child), added
+
+    def without(self, shift: int, key_hash: int, key: Any) -> Any:
+        """Node without :key:, None once empty and self if :key: is missing"""
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+
+        index = (self.bitmap & (bit - 1)).bit_count()
+        entry = self.entries[index]
+        if type(entry) is tuple:
+            if entry[0] != key:
+                return self
+            child = None
+        else:
+            child = entry.without(shift + _BITS, key_hash, key)
+            if child is entry:
+                return self
+
+        if child is None:
+            if self.bitmap == bit:
+                return None
+            entries = list(self.entries)
+            del entries[index]
+            return _BitmapNode(self.bitmap ^ bit, entries)
+
+        # A child left with a single pair is pulled up into this node
+        return self._replace(index, child.single() or child)
+
+    def single(self) -> tuple | None:
+        if len(self.entries) == 1 and type(self.entries[0]) is tuple:
+            return self.entries[0]
+        return None
+
+    def items(self) -> Iterator[tuple]:
+        for entry in self.entries:
+            if type(entry) is tuple:
+                yield entry
+            else:
+                yield from entry.items()
+
+    def _replace(self, index: int, entry: Any) -> "_BitmapNode":
+        entries = list(self.entries)
+        entries[index] = entry
+        return _BitmapNode(self.bitmap, entries)
+
+
+class _CollisionNode:
+    """Pairs whose keys share the whole hash"""
+
+    __slots__ = ("key_hash", "pairs")
+
+    def __init__(self, key_hash: int, pairs: tuple) -> None:
+        self.key_hash = key_hash
+        self.pairs = pairs
+
+    def find(self, shift: int, key_hash: int, key: Any) -> Any:
+        for pair_key, value in self.pairs:
+            if pair_key == key:
+                return value
+        return _NOT_FOUND
+
+    def assoc(
+        self, shift: int, key_hash: int, key: Any, value: Any
+    ) -> tuple[Any, bool]:
+        if key_hash != self.key_hash:
+            # Placed above the last level, split by the bits that differ
+            node = _BitmapNode(1 << ((self.key_hash >> shift) & _MASK), [self])
+            return node.assoc(shift, key_hash, key, value)
+
+        for i, (pair_key, pair_value) in enumerate(self.pairs):
+            if pair_key == key:
+                if pair_value is value:
+                    return self, False
+                pairs = (*self.pairs[:i], (key, value), *self.pairs[i + 1 :])
+                return _CollisionNode(key_hash, pairs), False
+        return _CollisionNode(key_hash, (*self.pairs, (key, value))), True
+
+    def without(self, shift: int, key_hash: int, key: Any) -> Any:
+        pairs = tuple(pair for pair in self.pairs if pair[0] != key)
+        if len(pairs) == len(self.pairs):
+            return self
+        if not pairs:
+            return None
+        return _CollisionNode(self.key_hash, pairs)
+
+    def single(self) -> tuple | None:
+        return self.pairs[0] if len(self.pairs) == 1 else None
+
+    def items(self) -> Iterator[tuple]:
+        return iter(self.pairs)
+
+
+def _pair_node(shift: int, pair: tuple, key_hash: int, key: Any, value: Any) -> Any:
+    pair_hash = _hash(pair[0])
+    if pair_hash == key_hash:
+        return _CollisionNode(key_hash, (pair, (key, value)))
+
+    node, _ = _BitmapNode(0, []).assoc(shift, pair_hash, *pair)
+    node, _ = node.assoc(shift, key_hash, key, value)
+    return node
+
+
+class PersistentMap:
+    """Hash array mapped trie.
+
+    Each level consumes 5 bits of the key hash, so ``set`` and ``delete`` copy
+    at most log32(n) small nodes and share everything else with the original
+    map. Iteration follows the hashes, not the insertion order.
+    """
+
+    __slots__ = ("_count", "_root")
+
+    def __init__(self, count: int = 0, root: _BitmapNode | None = None) -> None:
+        self._count = count
+        self._root = _BitmapNode(0, []) if root is None else root
+
+    @classmethod
+    def from_items(cls, items: Iterable[tuple[Any, Any]]) -> "PersistentMap":
+        result = cls()
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = self._root.find(0, _hash(key), key)
+        return default if value is _NOT_FOUND else value
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._root.find(0, _hash(key), key)
+        if value is _NOT_FOUND:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self._root.find(0, _hash(key), key) is not _NOT_FOUND
+
+    def __iter__(self) -> Iterator[Any]:
+        return (key for key, _ in self._root.items())
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        return self._root.items()
+
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in self._root.items())
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, PersistentMap) or len(self) != len(other):
+            return False
+        return all(
+            other._root.find(0, _hash(key), key) == value for key, value in self.items()
+        )
+
+    def __hash__(self) -> int:
+        return hash(frozenset(self.items()))
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
+
+    def set(self, key: Any, value: Any) -> "PersistentMap":
+        root, added = self._root.assoc(0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PersistentMap(self._count + added, root)
+
+    def delete(self, key: Any) -> "PersistentMap":
+        root = self._root.without(0, _hash(key), key)
+        if root is self._root:
+            return self
+        return PersistentMap(self._count - 1, root)
@@ -1,6 +1,7 @@
 from sloth.objects import Environment, SlothObject
 from .evaluation import evaluate, NULL
 from .parser import Parser
+from .unboxed import evaluate_unboxed
 
 from pathlib import Path
 import sys
@@ -43,6 +44,9 @@ class History:
         readline.append_history_file(new_h_len - prev_h_len, cls.HISTORY_FILE)
 
 
+EVALUATE = evaluate
+
+
 def loop(main):
     def wrapper():
         try:
@@ -80,11 +84,14 @@ def relp(env):
         print(f"ERRORS: {errors}")
         return
 
-    evaluated = evaluate(program, env)
+    evaluated = EVALUATE(program, env)
     if evaluated is not NULL:
         print(evaluated.inspect())
 
 
 if __name__ == "__main__":
+    if "--unboxed" in sys.argv[1:]:
+        EVALUATE = evaluate_unboxed
+
     History.init()
     relp()
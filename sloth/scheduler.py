@@ -0,0 +1,279 @@
+"""Evaluate independent top-level statements of a program at the same time.
+
+Statements are read in program order. One that only calls pure functions
+joins the current batch unless it reads or binds a name another statement of
+the batch binds. A batch runs on a :class:`sloth.parallel.WorkerPool` and its
+results are bound in program order, so the environment, the result and the
+first Fault are the ones a sequential run gives.
+"""
+
+from concurrent.futures import Future
+from dataclasses import dataclass
+import pickle
+from typing import Any
+
+from .analysis import child_nodes, free_variables, statement_reads, statement_writes
+from .ast import (
+    ArrayLiteral,
+    AwaitExpression,
+    BlockStatement,
+    BooleanLiteral,
+    CallExpression,
+    Expression,
+    ExpressionStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfElseExpression,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    Node,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    SpawnExpression,
+    Statement,
+    StringLiteral,
+    VarStatement,
+)
+from .builtins import BUILTINS
+from .evaluation import ReturnValue, evaluate
+from .memo import MEMO
+from .numeric import NumArray
+from .objects import (
+    NULL,
+    Array,
+    Boolean,
+    Builtin,
+    Environment,
+    Fault,
+    Function,
+    Hash,
+    Integer,
+    Null,
+    Range,
+    String,
+)
+from .parallel import WORKERS, WorkerPool, portable
+
+# Expressions a worker can evaluate on a copy of the bindings they read.
+# Function literals are left out, their closure would be that copy.
+_PORTABLE = frozenset(
+    (
+        Identifier,
+        IntegerLiteral,
+        StringLiteral,
+        BooleanLiteral,
+        PrefixExpression,
+        InfixExpression,
+        IfElseExpression,
+        BlockStatement,
+        ExpressionStatement,
+        CallExpression,
+        ArrayLiteral,
+        IndexExpression,
+        HashLiteral,
+    )
+)
+
+_CALLS = (CallExpression, SpawnExpression, AwaitExpression)
+
+_DATA = (Integer, String, Boolean, Null, Fault, NumArray, Range)
+
+
+@dataclass(frozen=True, slots=True)
+class _Job:
+    """Statement of a batch with the names it depends on.
+
+    Remote jobs only call pure functions and are evaluated by the pool, the
+    others have no calls at all and run here once the batch is merged.
+    """
+
+    statement: Statement
+    reads: frozenset[str]
+    writes: frozenset[str]
+    remote: bool
+
+    @property
+    def expression(self) -> Expression:
+        stmt = self.statement
+        return stmt.value if type(stmt) is VarStatement else stmt.expression
+
+
+def evaluate_parallel(
+    program: Program, env: Environment, pool: WorkerPool = WORKERS
+) -> Any:
+    """Evaluate :program: like evaluate, independent statements at once"""
+    result = _evaluate_batches(program, env, pool)
+    return result.value if type(result) is ReturnValue else result
+
+
+def _evaluate_batches(program: Program, env: Environment, pool: WorkerPool) -> Any:
+    batch: list[_Job] = []
+    result: Any = None
+
+    def merge() -> Fault | ReturnValue | None:
+        nonlocal result
+        values = _run_batch(batch, env, pool)
+        for job in batch:
+            if not job.remote:
+                value = evaluate(job.statement, env)
+            elif type(job.statement) is VarStatement:
+                value = values[id(job)]
+                if type(value) is not Fault:
+                    env[job.statement.name_value()] = value
+                    value = NULL
+            else:
+                value = values[id(job)]
+            if type(value) is Fault or type(value) is ReturnValue:
+                return value
+            result = value
+        batch.clear()
+        return None
+
+    for stmt in program.statements:
+        # A callee bound earlier in the batch is only known once it is merged
+        if _conflicts(statement_reads(stmt), frozenset(), batch):
+            if stop := merge():
+                return stop
+
+        job = _job(stmt, env)
+        if job is not None and _conflicts(job.reads, job.writes, batch):
+            if stop := merge():
+                return stop
+            job = _job(stmt, env)
+
+        if job is not None:
+            batch.append(job)
+            continue
+
+        if stop := merge():
+            return stop
+        result = evaluate(stmt, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return merge() or result
+
+
+def _job(stmt: Statement, env: Environment) -> _Job | None:
+    match stmt:
+        case VarStatement():
+            expression = stmt.value
+        case ExpressionStatement():
+            expression = stmt.expression
+        case ReturnStatement():
+            return None
+        case _:
+            expression = None
+
+    if not _has_calls(stmt):
+        return _Job(stmt, statement_reads(stmt), statement_writes(stmt), False)
+
+    calls: list[CallExpression] = []
+    if expression is None or not _portable(expression, calls):
+        return None
+    for call in calls:
+        if type(call.function) is not Identifier:
+            return None
+        callee = env.get(call.function.value) or BUILTINS.get(call.function.value)
+        if type(callee) is Builtin:
+            if not callee.pure:
+                return None
+        elif type(callee) is not Function or not MEMO.is_pure(callee):
+            return None
+
+    return _Job(stmt, _reads(stmt, env), statement_writes(stmt), True)
+
+
+def _portable(node: Node, calls: list[CallExpression]) -> bool:
+    if type(node) not in _PORTABLE:
+        return False
+    if type(node) is CallExpression:
+        calls.append(node)
+    return all(_portable(child, calls) for child in child_nodes(node))
+
+
+def _has_calls(node: Node) -> bool:
+    if isinstance(node, _CALLS):
+        return True
+    if type(node) is FunctionLiteral:
+        return False  # The body only runs once called
+    return any(_has_calls(child) for child in child_nodes(node))
+
+
+def _reads(stmt: Statement, env: Environment) -> frozenset[str]:
+    """Names :stmt: reads, including the globals of the functions it calls"""
+    names = set(statement_reads(stmt))
+    pending = list(names)
+    seen: set[int] = set()
+    while pending:
+        value = env.get(pending.pop())
+        if type(value) is not Function or id(value) in seen:
+            continue
+        seen.add(id(value))
+        for name in free_variables(value):  # type: ignore[arg-type]
+            if name not in names:
+                names.add(name)
+                pending.append(name)
+    return frozenset(names)
+
+
+def _conflicts(
+    reads: frozenset[str], writes: frozenset[str], batch: list[_Job]
+) -> bool:
+    return any(reads & job.writes or writes & (job.reads | job.writes) for job in batch)
+
+
+def _is_data(value: Any) -> bool:
+    if type(value) in _DATA:
+        return True
+    if type(value) is Array:
+        return all(map(_is_data, value.elements))
+    if type(value) is Hash:
+        return all(_is_data(k) and _is_data(v) for k, v in value.pairs.items())
+    return False
+
+
+def _run_statement(payload: bytes, memoize: bool) -> Any:
+    MEMO.configure(enabled=memoize)
+    expression, store = pickle.loads(payload)
+    return evaluate(expression, Environment(store))
+
+
+def _run_batch(batch: list[_Job], env: Environment, pool: WorkerPool) -> dict:
+    """Values of the remote jobs of :batch:, keyed by the id of the job.
+
+    They only call pure functions, so a job that can not be shipped, or
+    whose value is not plain data, is simply evaluated here again.
+    """
+    remote = [job for job in batch if job.remote]
+    if len(remote) < 2:
+        return {id(job): evaluate(job.expression, env) for job in remote}
+
+    workers = pool.start()
+    futures: list[Future | None] = []
+    for job in remote:
+        store = {}
+        for name in job.reads:
+            value = env.get(name)
+            if value is not None:
+                store[name] = portable(value) if type(value) is Function else value
+        try:
+            payload = pickle.dumps((job.expression, store))
+        except Exception:
+            futures.append(None)
+            continue
+        futures.append(workers.submit(_run_statement, payload, MEMO.enabled))
+
+    values = {}
+    for job, future in zip(remote, futures):
+        try:
+            value = future.result() if future is not None else None
+        except Exception:
+            value = None
+        if value is None or not _is_data(value):
+            value = evaluate(job.expression, env)
+        values[id(job)] = value
+    return values
@@ -24,12 +24,15 @@ class TokenType(StrEnum):
     NOT_EQ = "!="
 
     SEMICOLON = ";"
+    COLON = ":"
     COMMA = ","
 
     LPAREN = "("
     RPAREN = ")"
     LBRACE = "{"
     RBRACE = "}"
+    LBRACKET = "["
+    RBRACKET = "]"
 
     VAR = "var"
     FUNC = "func"
@@ -37,6 +40,11 @@ class TokenType(StrEnum):
     RETURN = "return"
     IF = "if"
     ELSE = "else"
+    WHILE = "while"
+    FOR = "for"
+    IN = "in"
+    SPAWN = "spawn"
+    AWAIT = "await"
     TRUE = "true"
     FALSE = "false"
 
@@ -47,6 +55,11 @@ _keywords: dict[TokenType | str, TokenType] = {
     TokenType.RETURN: TokenType.RETURN,
     TokenType.IF: TokenType.IF,
     TokenType.ELSE: TokenType.ELSE,
+    TokenType.WHILE: TokenType.WHILE,
+    TokenType.FOR: TokenType.FOR,
+    TokenType.IN: TokenType.IN,
+    TokenType.SPAWN: TokenType.SPAWN,
+    TokenType.AWAIT: TokenType.AWAIT,
     TokenType.TRUE: TokenType.TRUE,
     TokenType.FALSE: TokenType.FALSE,
 }
@@ -0,0 +1,437 @@
+"""Runtime mode working on raw Python values.
+
+Integers, strings and booleans stay plain `int`, `str` and `bool` while the
+program runs, NULL and faults are the usual singletons/objects. Values are
+boxed into Sloth objects only when they leave :func:`evaluate_unboxed`, so
+numeric code does not allocate a box per operation. Long concatenations and
+slices are the exception, they stay boxed ropes and views. Environments used
+with this mode hold raw values too, see :func:`box` and :func:`unbox`.
+
+Anything off the fast paths is handed to the boxed operators of
+:mod:`sloth.evaluation`, which keeps faults and `inspect` output identical.
+Builtins get boxed arguments as well, and array and hash contents are stored
+boxed. Functions created in this mode are marked, so the ones builtins call
+back, like the function given to `map`, run in this mode again.
+"""
+
+import operator
+from typing import Any, Callable
+
+from .ast import (
+    ArrayLiteral,
+    AwaitExpression,
+    BlockStatement,
+    BooleanLiteral,
+    CallExpression,
+    ExpressionStatement,
+    ForStatement,
+    FunctionLiteral,
+    HashLiteral,
+    Identifier,
+    IfElseExpression,
+    IndexExpression,
+    InfixExpression,
+    IntegerLiteral,
+    Node,
+    PrefixExpression,
+    Program,
+    ReturnStatement,
+    SpawnExpression,
+    Statement,
+    StringLiteral,
+    VarStatement,
+    WhileStatement,
+)
+from .evaluation import (
+    FALSE,
+    NULL,
+    TRUE,
+    ReturnValue,
+    TailCall,
+    apply_index,
+    apply_infix_operator,
+    apply_prefix_operator,
+    await_task,
+    evaluate_function_literal,
+    iterate,
+    resolve_function,
+)
+from .builtins import BUILTINS
+from .frames import FRAME_POOL
+from .persistent import PersistentMap
+from .objects import (
+    ROPE_MIN_LENGTH,
+    Array,
+    Boolean,
+    Builtin,
+    Environment,
+    Fault,
+    Function,
+    Hash,
+    Integer,
+    Range,
+    SlothObject,
+    String,
+    Task,
+    make_integer,
+    make_string,
+)
+
+_INTEGER_OPERATORS: dict[str, Callable[[int, int], int | bool]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+}
+
+
+_STRINGS = (str, String)
+
+
+def box(value: Any) -> SlothObject:
+    match value:
+        case bool():
+            return TRUE if value else FALSE
+        case int():
+            return make_integer(value)
+        case str():
+            return make_string(value)
+        case _:
+            return value
+
+
+def unbox(obj: SlothObject) -> Any:
+    if type(obj) is String and not obj.is_flat:
+        return obj  # Ropes and views are copied only once they are observed
+    if type(obj) in (Integer, String, Boolean):
+        return obj.value  # type: ignore[attr-defined]
+    return obj
+
+
+def evaluate_unboxed(node: Node, env: Environment) -> SlothObject:
+    return box(_evaluate(node, env))
+
+
+def _evaluate(node: Node, env: Environment) -> Any:
+    evaluator = _EVALUATORS.get(type(node))
+    if evaluator is None:
+        raise NotImplementedError(f"{type(node)} is still not implemented")
+    return evaluator(node, env)
+
+
+def _statements(statements: list[Statement], env: Environment) -> Any:
+    result = None
+    for stmt in statements:
+        if type(stmt) is ReturnStatement:
+            return _return(stmt, env)
+
+        result = _evaluate(stmt, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return result
+
+
+def _return(node: ReturnStatement, env: Environment) -> Any:
+    value = _evaluate(node.expression, env)
+    return value if type(value) is Fault else ReturnValue(value)
+
+
+def _program(node: Program, env: Environment) -> Any:
+    result = _statements(node.statements, env)
+    return result.value if type(result) is ReturnValue else result
+
+
+def _is_truthy(value: Any) -> bool:
+    if type(value) is int:
+        return value != 0
+    return value is not False and value is not NULL
+
+
+def _prefix(node: PrefixExpression, env: Environment) -> Any:
+    right = _evaluate(node.right, env)
+    if type(right) is Fault:
+        return right
+
+    if node.operator == "!":
+        if type(right) is bool:
+            return not right
+        return False if type(right) is int else NULL
+    if node.operator == "-":
+        return -right if type(right) is int else NULL
+
+    return unbox(apply_prefix_operator(node.operator, box(right)))
+
+
+def _infix(node: InfixExpression, env: Environment) -> Any:
+    left = _evaluate(node.left, env)
+    if type(left) is Fault:
+        return left
+
+    right = _evaluate(node.right, env)
+    if type(right) is Fault:
+        return right
+
+    left_type, right_type, op = type(left), type(right), node.operator
+    if left_type is int and right_type is int:
+        if (integer_operator := _INTEGER_OPERATORS.get(op)) is not None:
+            return integer_operator(left, right)
+        if op == "/" and right != 0:
+            return left // right
+    elif op == "+" and left_type in _STRINGS and right_type in _STRINGS:
+        if left_type is str and right_type is str:
+            if len(left) + len(right) < ROPE_MIN_LENGTH:
+                return left + right
+        # Long strings stay boxed ropes, joining raw str copies both sides
+        return String.concat(box(left), box(right))
+    elif left_type is bool and right_type is bool:
+        if op == "==":
+            return left is right
+        if op == "!=":
+            return left is not right
+
+    # Faults and unsupported combinations behave exactly as in boxed mode
+    return unbox(apply_infix_operator(op, box(left), box(right)))
+
+
+def _if_else(node: IfElseExpression, env: Environment) -> Any:
+    condition = _evaluate(node.condition, env)
+    if type(condition) is Fault:
+        return condition
+
+    if _is_truthy(condition):
+        return _statements(node.consequence.body, env)
+    if node.alternative:
+        return _statements(node.alternative.body, env)
+    return NULL
+
+
+def _var(node: VarStatement, env: Environment) -> Any:
+    value = _evaluate(node.value, env)
+    if type(value) is Fault or type(value) is ReturnValue:
+        return value
+
+    env[node.name_value()] = value
+    return NULL
+
+
+def _identifier(node: Identifier, env: Environment) -> Any:
+    value = env.get(node.value)
+    if value is None:
+        value = BUILTINS.get(node.value)
+        if value is None:
+            return Fault(f"name {node.value} is not defined")
+    return value
+
+
+def _array(node: ArrayLiteral, env: Environment) -> Any:
+    # Elements are kept boxed, the builtins working on arrays expect objects
+    elements = []
+    for element_node in node.elements:
+        element = _evaluate(element_node, env)
+        if type(element) is Fault:
+            return element
+        elements.append(box(element))
+    return Array.from_iterable(elements)
+
+
+def _index(node: IndexExpression, env: Environment) -> Any:
+    left = _evaluate(node.left, env)
+    if type(left) is Fault:
+        return left
+
+    index = _evaluate(node.index, env)
+    if type(index) is Fault:
+        return index
+    return unbox(apply_index(box(left), box(index)))
+
+
+def _hash(node: HashLiteral, env: Environment) -> Any:
+    pairs = PersistentMap()
+    for key_node, value_node in node.pairs:
+        key = _evaluate(key_node, env)
+        if type(key) is Fault:
+            return key
+        key = box(key)
+        if fault := Hash.key_fault(key):
+            return fault
+
+        value = _evaluate(value_node, env)
+        if type(value) is Fault:
+            return value
+        pairs = pairs.set(key, box(value))
+    return Hash(pairs)
+
+
+def _while(node: WhileStatement, env: Environment) -> Any:
+    condition, body = node.condition, node.body.body
+    while True:
+        value = _evaluate(condition, env)
+        if type(value) is Fault:
+            return value
+        if not _is_truthy(value):
+            return NULL
+
+        result = _statements(body, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+
+def _for(node: ForStatement, env: Environment) -> Any:
+    values = _evaluate(node.iterable, env)
+    if type(values) is Fault:
+        return values
+
+    if type(values) is Range:
+        elements: Any = range(values.start, values.stop)
+    else:
+        elements = iterate(box(values))
+        if type(elements) is Fault:
+            return elements
+        elements = map(unbox, elements)
+
+    name, body = node.name.value, node.body.body
+    for element in elements:
+        if type(element) is Fault:
+            return element
+        env[name] = element
+        result = _statements(body, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+    return NULL
+
+
+def _call_builtin(func: Builtin, values: list) -> Any:
+    return unbox(func.fn(*map(box, values)))
+
+
+def _arguments(call: CallExpression, env: Environment) -> list | Fault:
+    values = []
+    for arg in call.arguments:
+        value = _evaluate(arg, env)
+        if type(value) is Fault:
+            return value
+        values.append(value)
+    return values
+
+
+def _call(node: CallExpression, env: Environment) -> Any:
+    func = resolve_function(node, env)
+    if type(func) is Fault:
+        return func
+
+    values = _arguments(node, env)
+    if type(values) is Fault:
+        return values
+    if type(func) is Builtin:
+        return _call_builtin(func, values)
+    return _run_function(func, values)
+
+
+def _run_function(func: Function, values: list) -> Any:
+    while True:
+        frame = FRAME_POOL.acquire(func.env, func.parameters, values)
+        result = _tail_statements(func.body.body, frame)
+        FRAME_POOL.release(frame)
+
+        if type(result) is ReturnValue:
+            return result.value
+        if type(result) is not TailCall:
+            return result
+        func, values = result.func, result.values
+
+
+def call_unboxed(func: Function, values: list) -> SlothObject:
+    """Call :func:, created in this mode, with boxed :values: from Python"""
+    return box(_run_function(func, [unbox(value) for value in values]))
+
+
+def _spawn(node: SpawnExpression, env: Environment) -> Any:
+    func = resolve_function(node.call, env)
+    if type(func) is Fault:
+        return func
+
+    values = _arguments(node.call, env)
+    if type(values) is Fault:
+        return values
+    if type(func) is Builtin:
+        return Task(value=box(_call_builtin(func, values)))
+    return Task(value=box(_run_function(func, values)))
+
+
+def _await(node: AwaitExpression, env: Environment) -> Any:
+    task = _evaluate(node.value, env)
+    if type(task) is Fault:
+        return task
+    return unbox(await_task(box(task)))
+
+
+def _tail(node: Any, env: Environment) -> Any:
+    if type(node) is CallExpression:
+        func = resolve_function(node, env)
+        if type(func) is Fault:
+            return func
+
+        values = _arguments(node, env)
+        if type(values) is Fault:
+            return values
+        if type(func) is Builtin:
+            return _call_builtin(func, values)
+        return TailCall(func, values)
+
+    if type(node) is IfElseExpression:
+        condition = _evaluate(node.condition, env)
+        if type(condition) is Fault:
+            return condition
+
+        if _is_truthy(condition):
+            return _tail_statements(node.consequence.body, env)
+        if node.alternative:
+            return _tail_statements(node.alternative.body, env)
+        return NULL
+
+    return _evaluate(node, env)
+
+
+def _tail_statements(statements: list[Statement], env: Environment) -> Any:
+    result = None
+    last = len(statements) - 1
+    for i, stmt in enumerate(statements):
+        if type(stmt) is ReturnStatement:
+            return _tail(stmt.expression, env)
+        if i == last and type(stmt) is ExpressionStatement:
+            return _tail(stmt.expression, env)
+
+        result = _evaluate(stmt, env)
+        if type(result) is Fault or type(result) is ReturnValue:
+            return result
+
+    return result
+
+
+_EVALUATORS: dict[type, Callable[[Any, Environment], Any]] = {
+    Program: _program,
+    BlockStatement: lambda node, env: _statements(node.body, env),
+    ExpressionStatement: lambda node, env: _evaluate(node.expression, env),
+    ReturnStatement: _return,
+    IntegerLiteral: lambda node, env: node.value,
+    StringLiteral: lambda node, env: node.value,
+    BooleanLiteral: lambda node, env: node.value,
+    PrefixExpression: _prefix,
+    InfixExpression: _infix,
+    IfElseExpression: _if_else,
+    VarStatement: _var,
+    Identifier: _identifier,
+    FunctionLiteral: lambda node, env: evaluate_function_literal(node, env, True),
+    CallExpression: _call,
+    ArrayLiteral: _array,
+    IndexExpression: _index,
+    HashLiteral: _hash,
+    WhileStatement: _while,
+    ForStatement: _for,
+    SpawnExpression: _spawn,
+    AwaitExpression: _await,
+}
@@ -0,0 +1,47 @@
+from sloth.analysis import statement_reads, statement_writes
+from sloth.ast import ExpressionStatement, FunctionLiteral, VarStatement
+from sloth.parser import Parser
+
+
+def parse_function(input_: str) -> FunctionLiteral:
+    program = Parser.from_input(input_).parse_program()
+    stmt = program.statements[0]
+    assert isinstance(stmt, (ExpressionStatement, VarStatement))
+
+    func = stmt.expression if isinstance(stmt, ExpressionStatement) else stmt.value
+    assert isinstance(func, FunctionLiteral)
+    return func
+
+
+def test_free_variables():
+    tests = [
+        ("func(a) { a }", set()),
+        ("func(a) { a + b }", {"b"}),
+        ("func() { var x = 1; x + y }", {"y"}),
+        ("func() { var x = x + 1; x }", {"x"}),
+        ("func(a) { func(b) { a + b + c } }", {"c"}),
+        ("func(n) { if (n < 2) { n } else { fib(n - 1) } }", {"fib"}),
+        ("var loop = func(n) { loop(n - 1) }", {"loop"}),
+        ("func() { var loop = func(n) { loop(n - 1) }; loop(1) }", set()),
+        ("func(a) { {a: b, c: [d]} }", {"b", "c", "d"}),
+        ("func() { for (x in xs) { f(x, y) } }", {"xs", "f", "y"}),
+        ("func() { var i = 0; while (i < n) { var i = i + 1 } }", {"n"}),
+    ]
+
+    for input_, expected in tests:
+        assert parse_function(input_).free_variables == expected
+
+
+def test_statement_reads_and_writes():
+    tests = [
+        ("var a = f(b) + a", {"f", "b", "a"}, {"a"}),
+        ("a + 1", {"a"}, set()),
+        ("var g = func(x) { var y = x + z }", {"z"}, {"g"}),
+        ("for (i in xs) { var s = s + i }", {"xs", "s"}, {"i", "s"}),
+        ("while (i < n) { var i = i + 1 }", {"i", "n"}, {"i"}),
+    ]
+
+    for input_, reads, writes in tests:
+        stmt = Parser.from_input(input_).parse_program().statements[0]
+        assert statement_reads(stmt) == reads
+        assert statement_writes(stmt) == writes
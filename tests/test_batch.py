@@ -0,0 +1,111 @@
+import pytest
+
+from sloth import Interpreter, batch
+from sloth.batch import evaluate_batch
+from sloth.evaluation import evaluate
+from sloth.ffi import from_python
+from sloth.numeric import NumArray
+from sloth.objects import Array, Environment, Fault, make_integer
+from sloth.parser import Parser
+
+COLUMNS = {
+    "x": [3, -7, 0, 12, 5, 9, -2, 4],
+    "y": [1, 2, 0, -3, 5, 0, 4, -1],
+    "b": [True, False, False, True, True, False, True, False],
+    "s": ["", "ab", "xyz", "q", "", "ab", "z", "yy"],
+}
+
+SOURCES = (
+    "x + y * 2",
+    "x / y",
+    "-x + 1",
+    "!b",
+    "!x",
+    "b == (x < y)",
+    "if (x > y) { x - y } else { y * 3 }",
+    "if (x) { 1 }",
+    "if (b) { x / (y - 4) } else { x }",
+    "if (x / y > 1) { 1 } else { 2 }",
+    "if (if (b) { x } else { y } > 3) { x * y } else { if (y < 2) { y } else { 0 } }",
+    "var z = x * x; if (z > 50) { z } else { -z + y }",
+    "var q = x / y; q + 1",
+    "return x; y",
+    "x * 100000000000 * 100000000000",
+    '"a" + s',
+    "if (b) { s } else { x }",
+    "-b",
+    "len(s) + x",
+    "g * x",
+    "missing + x",
+    "((false + false) - 1) < (1 == false)",
+    "(x / y) + (if (y == 0) { 1 == false } else { 1 })",
+    "(x / y) * (if (b) { 2 } else { y })",
+    "var q = x / y; if (y == 0) { 1 == false } else { q }",
+)
+
+
+def _row_by_row(program, columns, env):
+    results = []
+    for row in range(len(columns["x"])):
+        store = {name: from_python(values[row]) for name, values in columns.items()}
+        results.append(evaluate(program, Environment(store, env)))
+    return results
+
+
+def _check_batches():
+    env = Environment()
+    env["g"] = make_integer(7)
+    for source in SOURCES:
+        program = Parser.from_input(source).parse_program()
+        expected = _row_by_row(program, COLUMNS, env)
+        result = evaluate_batch(program, COLUMNS, env)
+        if type(result) is NumArray:
+            assert result.tolist() == [value.value for value in expected], source
+        else:
+            assert result == Array.from_iterable(expected), source
+
+
+def test_batch_matches_row_by_row():
+    _check_batches()
+
+
+def test_batch_matches_row_by_row_without_numpy(monkeypatch):
+    monkeypatch.setattr(batch, "numpy", None)
+    _check_batches()
+
+
+def test_batch_columns():
+    program = Parser.from_input("x * 2").parse_program()
+    tests = (
+        [1, 2, 3],
+        (1, 2, 3),
+        NumArray.from_values([1, 2, 3]),
+        Array.from_iterable(map(make_integer, [1, 2, 3])),
+    )
+
+    for column in tests:
+        assert evaluate_batch(program, {"x": column}) == NumArray.from_values([2, 4, 6])
+
+
+def test_batch_rejects_bad_columns():
+    program = Parser.from_input("x").parse_program()
+    tests = (
+        ({}, ValueError),
+        ({"x": [1, 2], "y": [1]}, ValueError),
+        ({"x": {1, 2}}, TypeError),
+    )
+
+    for columns, error in tests:
+        with pytest.raises(error):
+            evaluate_batch(program, columns)
+
+
+def test_batch_of_compiled_program():
+    interpreter = Interpreter()
+    interpreter.load("var limit = 10;")
+    program = interpreter.compile("if (x > limit) { limit } else { x / y }")
+
+    result = program.run_batch({"x": [4, 20, 9], "y": [2, 1, 0]})
+    assert result == Array.from_iterable(
+        [make_integer(2), make_integer(10), Fault("can not divide by zero")]
+    )
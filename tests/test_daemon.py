@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import socket
+import struct
+
+import pytest
+
+from sloth.client import Client, recv_message, send_message
+from sloth.daemon import Daemon
+
+PRELUDE = "var double = func(x) { x * 2 }; var base = 40;"
+
+
+@pytest.fixture
+def daemon_path(tmp_path):
+    path = str(tmp_path / "sloth.sock")
+    server = Daemon(PRELUDE, workers=4).bind(path)
+    thread = server.serve_in_background()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+    assert not os.path.exists(path)
+
+
+def test_daemon_replies(daemon_path):
+    tests = (
+        ("1 + 2", {"value": "3"}),
+        ("double(base + 1)", {"value": "82"}),
+        ('"a" + "b"', {"value": '"ab"'}),
+        ("var x = 1;", {"value": "Null"}),
+        ("undefined", {"fault": "name undefined is not defined"}),
+        ('"s" - "t"', {"fault": 'operator "-" for STRING is not supported'}),
+    )
+
+    with Client(daemon_path) as client:
+        for input_, expected in tests:
+            assert client.evaluate(input_) == expected
+
+
+def test_daemon_reports_parse_errors(daemon_path):
+    with Client(daemon_path) as client:
+        reply = client.evaluate("var = 1;")
+    assert list(reply) == ["errors"]
+    assert reply["errors"]
+
+
+def test_daemon_requests_do_not_see_each_other(daemon_path):
+    with Client(daemon_path) as client:
+        assert client.evaluate("var base = 1; base") == {"value": "1"}
+        assert client.evaluate("base") == {"value": "40"}
+
+
+def test_daemon_caches_parsed_programs():
+    daemon = Daemon()
+    for _ in range(3):
+        assert daemon.evaluate("1 + 1") == {"value": "2"}
+    assert daemon.programs.misses == 1
+    assert daemon.programs.hits == 2
+
+
+def test_daemon_rejects_bad_prelude():
+    for prelude in ("var = 1;", "missing(1)"):
+        with pytest.raises(ValueError):
+            Daemon(prelude)
+
+
+def test_daemon_rejects_bad_requests(daemon_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(daemon_path)
+        send_message(sock, {"code": "1"})
+        assert recv_message(sock) == {"error": "request without a source"}
+        send_message(sock, [])
+        assert recv_message(sock) == {"error": "request is not an object"}
+        send_message(sock, "1 + 1")
+        assert recv_message(sock) == {"error": "request is not an object"}
+
+        sock.sendall(struct.pack(">I", 1 << 30))
+        assert "over the limit" in recv_message(sock)["error"]
+        assert recv_message(sock) is None
+
+
+def test_daemon_serves_concurrent_clients(daemon_path):
+    def run(n: int) -> list[dict]:
+        with Client(daemon_path) as client:
+            return [client.evaluate(f"double({n + i})") for i in range(10)]
+
+    with ThreadPoolExecutor(8) as pool:
+        replies = list(pool.map(run, range(16)))
+    assert replies == [
+        [{"value": str(2 * (n + i))} for i in range(10)] for n in range(16)
+    ]
+
+
+def test_daemon_idle_clients_do_not_hold_workers(tmp_path):
+    path = str(tmp_path / "idle.sock")
+    server = Daemon(workers=1).bind(path)
+    thread = server.serve_in_background()
+    idle = [Client(path) for _ in range(3)]
+
+    def run() -> dict:
+        with Client(path) as client:
+            return client.evaluate("6 * 7")
+
+    try:
+        with ThreadPoolExecutor(1) as pool:
+            assert pool.submit(run).result(timeout=5) == {"value": "42"}
+    finally:
+        for client in idle:
+            client.close()
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_daemon_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "stale.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(path)
+
+    server = Daemon().bind(path)
+    thread = server.serve_in_background()
+    with Client(path) as client:
+        assert client.evaluate("7") == {"value": "7"}
+    server.shutdown()
+    server.server_close()
+    thread.join()
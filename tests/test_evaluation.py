@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 from sloth.evaluation import FALSE, TRUE, NULL, Environment, evaluate
+from sloth.frames import FRAME_POOL
+from sloth.memo import MEMO
 from sloth.objects import Boolean, Fault, Integer, String
 from sloth.parser import Parser
 
@@ -182,8 +184,39 @@ def test_nested_return_eval():
     }
     """
 
+    # The inner return ends the whole program, not just its block
     evaluated = input_eval(input)
-    assert evaluated == Integer(1)
+    assert evaluated == Integer(10)
+
+
+def test_return_ends_function_eval():
+    tests = (
+        (
+            """
+            var loop = func(n, acc) {
+                if (n == 0) { return acc; };
+                return loop(n - 1, acc + 1);
+            };
+            loop(3, 0);
+            """,
+            3,
+        ),
+        (
+            """
+            var f = func(x) {
+                if (x > 1) { if (x > 2) { return 3; }; return 2; };
+                1
+            };
+            f(1) * 100 + f(2) * 10 + f(3)
+            """,
+            123,
+        ),
+        ("var f = func() { var y = if (true) { return 7 }; 100 }; f()", 7),
+        ("var f = func() { if (true) { return 1 }; 2 }; f() + f()", 2),
+    )
+
+    for input, expected in tests:
+        assert input_eval(input) == Integer(expected), input
 
 
 def test_divide_by_zero_fault():
@@ -267,3 +300,484 @@ def test_string_concationation_eval():
     for input, expected in tests:
         evaluated = input_eval(input)
         assert evaluated == String(expected)
+
+
+def test_closures_eval():
+    tests = [
+        ("var x = 5; var f = func() { x }; f()", 5),
+        (
+            "var adder = func(a) { func(b) { a + b } }; var addTwo = adder(2); addTwo(3)",
+            5,
+        ),
+        (
+            """
+            var fact = func(n) { if (n < 2) { 1 } else { n * fact(n - 1) } };
+            fact(5);
+        """,
+            120,
+        ),
+        ("var a = 1; var f = func(a) { a }; f(2); a", 1),
+        ("var mk = func() { var x = 1; var g = func() { x }; var x = 2; g() }; mk()", 2),
+        (
+            """
+            var mk = func() {
+                var i = 0; var g = func() { i };
+                while (i < 3) { var i = i + 1 };
+                g()
+            };
+            mk()
+            """,
+            3,
+        ),
+        (
+            """
+            var mk = func() {
+                var h = func() { 1 }; var g = func() { h() };
+                var h = func() { 5 };
+                g() + h()
+            };
+            mk()
+            """,
+            10,
+        ),
+        (
+            "var x = 1;"
+            "var mk = func() { var g = func() { x }; var x = 5; g() }; mk()",
+            5,
+        ),
+        ("var mk = func() { var g = func() { len }; var len = 5; g() }; mk()", 5),
+        (
+            """
+            var x = 1;
+            var mk = func() { var g = func() { func() { x } }; var x = 5; var h = g(); h() };
+            mk()
+            """,
+            5,
+        ),
+    ]
+
+    for input, expected in tests:
+        evaluated = input_eval(input)
+        assert evaluated == Integer(expected)
+
+
+def test_closure_captures_only_free_variables():
+    input = """
+    var big = "unused";
+    var make = func(a, b) { var c = a + b; func(x) { x + a } };
+    make(1, 2);
+    """
+
+    closure = input_eval(input)
+    assert closure.env["a"] == Integer(1)
+    assert list(closure.env) == ["a"]
+    assert closure.env.outer is not None and closure.env.outer.outer is None
+
+
+def test_call_frames_are_recycled():
+    FRAME_POOL.reset_stats()
+    input = """
+    var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+    fib(10);
+    """
+
+    assert input_eval(input) == Integer(55)
+    assert FRAME_POOL.hits > FRAME_POOL.misses
+
+
+def test_escaped_frame_is_not_recycled():
+    input = """
+    var outer = func(a) {
+        var loop = func(n) { if (n < 1) { a } else { loop(n - 1) } };
+        loop
+    };
+    var f = outer(7);
+    outer(8);
+    f(3);
+    """
+
+    assert input_eval(input) == Integer(7)
+
+
+def test_tail_calls_eval():
+    tests = [
+        (
+            """
+            var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };
+            count(20000, 0);
+        """,
+            20000,
+        ),
+        (
+            """
+            var even = func(n) { if (n == 0) { true } else { return odd(n - 1) } };
+            var odd = func(n) { if (n == 0) { false } else { return even(n - 1) } };
+            even(10001);
+        """,
+            FALSE,
+        ),
+        ("var id = func(x) { x }; var f = func(x) { return id(x); 5 }; f(3)", 3),
+    ]
+
+    for input, expected in tests:
+        evaluated = input_eval(input)
+        if isinstance(expected, int):
+            expected = Integer(expected)
+        assert evaluated == expected
+
+
+def test_fault_propagation_eval():
+    tests = [
+        ("var f = func() { 2 / 0 }; f() + 1", "can not divide by zero"),
+        ("var x = y; 5", "name y is not defined"),
+        ("if (true) { 1 / 0 }; 5", "can not divide by zero"),
+        ("var f = func(a) { a }; -f(missing)", "name missing is not defined"),
+        ('"a" - "b"', 'operator "-" for STRING is not supported'),
+    ]
+
+    for input, expected in tests:
+        evaluated = input_eval(input)
+        assert evaluated == Fault(expected)
+
+
+def test_literals_and_small_results_are_interned():
+    program = Parser.from_input("1 + 1; 2").parse_program()
+    env = Environment()
+
+    first = evaluate(program.statements[0], env)
+    assert first is evaluate(program.statements[1], env)
+    assert first is evaluate(program.statements[1], env)
+
+
+def test_pure_calls_are_memoized(monkeypatch):
+    monkeypatch.setattr(MEMO, "enabled", True)
+    MEMO.clear()
+    input = """
+    var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+    fib(80);
+    """
+
+    assert input_eval(input) == Integer(23416728348467685)
+    stats = MEMO.stats()
+    assert stats.misses == 81
+    assert stats.hits == 78
+
+
+def test_array_eval():
+    tests = [
+        ("[1, 2 * 2, 3 + 3]", "[1, 4, 6]"),
+        ("[]", "[]"),
+        ("[1, 2, 3][0]", "1"),
+        ("[1, 2, 3][1 + 1]", "3"),
+        ("var a = [1, 2, 3]; a[0] + a[1] + a[2]", "6"),
+        ("[1, 2, 3][3]", "Null"),
+        ("[1, 2, 3][-1]", "Null"),
+        ("1[0]", "Fault: index operator for INTEGER is not supported"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_array_builtins_eval():
+    tests = [
+        ("len([1, 2, 3])", "3"),
+        ('len("sloth")', "5"),
+        ("len(1)", "Fault: len does not support INTEGER"),
+        ("len(1, 2)", "Fault: arguments passed 2, but arguments expected 1"),
+        ("var a = [1]; var b = push(a, 2); [a, b]", "[[1], [1, 2]]"),
+        ("var a = [1, 2]; var b = set(a, 0, 5); [a, b]", "[[1, 2], [5, 2]]"),
+        ("set([1], 1, 5)", "Fault: index 1 out of range"),
+        ("map(func(x) { x * 2 }, [1, 2, 3])", "[2, 4, 6]"),
+        ("filter(func(x) { x > 1 }, [1, 2, 3])", "[2, 3]"),
+        ("reduce(func(acc, x) { acc + x }, [1, 2, 3], 10)", "16"),
+        ("map(func(x) { x / 0 }, [1])", "Fault: can not divide by zero"),
+        ("map(len, [[1], [1, 2]])", "[1, 2]"),
+        ("var len = func(x) { 0 }; len([1, 2])", "0"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_large_array_eval():
+    input = """
+    var fill = func(a, n) { if (n == 0) { a } else { fill(push(a, n), n - 1) } };
+    var a = fill([], 2000);
+    [len(a), a[0], a[1999], reduce(func(acc, x) { acc + x }, a, 0)]
+    """
+
+    assert input_eval(input).inspect() == "[2000, 2000, 1, 2001000]"
+
+
+def test_numarray_eval():
+    tests = [
+        ("numarray([1, 2, 3]) * 2 + 1", "numarray([3, 5, 7])"),
+        ("10 - numarray([1, 2])", "numarray([9, 8])"),
+        ("numarray([1, 2]) * numarray([3, 4])", "numarray([3, 8])"),
+        ("numarray([1, 5, 3]) > 2", "numarray([0, 1, 1])"),
+        ("numarray([1, 2]) == broadcast(2, 2)", "numarray([0, 1])"),
+        ("sum(numrange(0, 1000))", "499500"),
+        ("sum([1, 2, 3])", "6"),
+        ("slice(numrange(0, 10), 2, -5)", "numarray([2, 3, 4])"),
+        ("slice([1, 2, 3, 4], 1, 3)", "[2, 3]"),
+        ("var a = numrange(5, 8); a[1] + len(a)", "9"),
+        ("numarray([1, 2]) / 0", "Fault: can not divide by zero"),
+        ("numarray([1, true])", "Fault: numarray does not support BOOLEAN"),
+        ('numarray([1]) + "a"', "Fault: NUMARRAY and STRING can not be combined"),
+        ("sum(true)", "Fault: sum does not support BOOLEAN"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_hash_eval():
+    tests = [
+        ('{"a": 1}["a"]', "1"),
+        ("{1 + 1: 2 * 2}[2]", "4"),
+        ("{true: 1, false: 0}[1 > 2]", "0"),
+        ("{1: 1}[2]", "Null"),
+        ('{"a": 1, "a": 2}', '{"a": 2}'),
+        ("{[1]: 1}", "Fault: unusable as hash key: ARRAY"),
+        ("{1: 1}[{}]", "Fault: unusable as hash key: HASH"),
+        ("{1: 2 / 0}", "Fault: can not divide by zero"),
+        ("var key = func(x) { {x: x * 2} }; key(4)[4]", "8"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_hash_builtins_eval():
+    tests = [
+        ('get({"a": 1}, "a")', "1"),
+        ('get({"a": 1}, "b")', "Null"),
+        ('var h = {"a": 1}; var g = put(h, "b", 2); [len(h), g["b"]]', "[1, 2]"),
+        ("var h = {1: 1, 2: 2}; var g = del(h, 1); [keys(g), len(h)]", "[[2], 2]"),
+        ("del({1: 1}, 5)", "{1: 1}"),
+        ("len(keys({1: 1, 2: 2, 3: 3}))", "3"),
+        ("put(1, 2, 3)", "Fault: put does not support INTEGER"),
+        ("get({}, [])", "Fault: unusable as hash key: ARRAY"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_long_string_concatenation_eval():
+    input = """
+    var repeat = func(text, n) { if (n == 0) { text } else { repeat(text + "ab", n - 1) } };
+    var long = repeat("", 5000);
+    [len(long), len(long + long), long]
+    """
+
+    assert input_eval(input).inspect() == f'[10000, 20000, "{"ab" * 5000}"]'
+
+
+def test_string_view_builtins_eval():
+    text = "ab" * 50 + "needle" + "cd" * 50
+    tests = [
+        (f'len(slice("{text}", 10, -10))', "186"),
+        (f'find(slice("{text}", 10, -10), "needle")', "90"),
+        (f'find("{text}", "pin")', "-1"),
+        (f'index(slice("{text}", 101, 200), 0)', '"e"'),
+        ('slice("sloth", 1, 3)', '"lo"'),
+        ('"sloth"[0]', '"s"'),
+        ('"sloth"[5]', "Null"),
+        ('index("sloth", -1)', "Null"),
+        ("index(1, 0)", "Fault: index does not support INTEGER"),
+        ('find("sloth", 1)', "Fault: find does not support INTEGER"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_native_helpers_eval():
+    tests = [
+        ("abs(-5) + max(1, 2) + min(1, 2)", "8"),
+        ('int("41") + 1', "42"),
+        ('upper("sloth") + lower("ABC")', '"SLOTHabc"'),
+        ('join(split("a,b,c", ","), "-")', '"a-b-c"'),
+        ('int("x")', "Fault: int: invalid literal for int() with base 10: 'x'"),
+        ("upper(1)", "Fault: upper does not support INTEGER"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_while_eval():
+    tests = [
+        ("var i = 0; while (i < 10) { var i = i + 1 }; i", "10"),
+        ("var i = 0; while (false) { var i = 1 }; i", "0"),
+        ("while (1 < 2) { 1 / 0 }", "Fault: can not divide by zero"),
+        ("while (missing) { 1 }", "Fault: name missing is not defined"),
+        (
+            """
+            var sum = func(n) {
+                var s = 0; var i = 0;
+                while (i < n) { var i = i + 1; var s = s + i };
+                s
+            };
+            sum(100)
+            """,
+            "5050",
+        ),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_for_eval():
+    tests = [
+        ("var s = 0; for (i in range(0, 5)) { var s = s + i }; s", "10"),
+        ("var s = []; for (x in [1, 2, 3]) { var s = push(s, x * x) }; s", "[1, 4, 9]"),
+        ('var s = ""; for (c in "abc") { var s = c + s }; s', '"cba"'),
+        ("var s = 0; for (k in {1: 0, 2: 0}) { var s = s + k }; s", "3"),
+        ("var s = 0; for (x in numrange(0, 4) * 2) { var s = s + x }; s", "12"),
+        ("for (x in range(0, 0)) { 1 / 0 }", "Null"),
+        ("for (x in 5) { x }", "Fault: INTEGER is not iterable"),
+        ("for (x in [1, 0]) { 1 / x }", "Fault: can not divide by zero"),
+        (
+            """
+            var make = func() {
+                var fs = [];
+                for (i in range(0, 3)) { var fs = push(fs, func() { i }) };
+                fs
+            };
+            var f = make()[1];
+            f()
+            """,
+            "2",  # The loop binds i in the enclosing scope, closures share it
+        ),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_return_ends_loop_eval():
+    tests = [
+        (
+            """
+            var f = func() {
+                var i = 0;
+                while (i < 10) { if (i == 3) { return i; }; var i = i + 1; };
+                99
+            };
+            f()
+            """,
+            "3",
+        ),
+        (
+            "var f = func() { for (x in range(0, 9)) { return x + 7; }; 99 }; f()",
+            "7",
+        ),
+        (
+            """
+            var f = func() {
+                for (x in range(0, 9)) { var y = if (x == 4) { return x; } else { x } };
+                99
+            };
+            f()
+            """,
+            "4",
+        ),
+        ("var i = 0; while (true) { var i = i + 1; if (i == 2) { return i } }; 5", "2"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_loops_count_far_past_recursion_depth():
+    input = """
+    var i = 0; var s = 0;
+    while (i < 100000) { var i = i + 1; var s = s + i };
+    for (j in range(0, 100000)) { var s = s - j };
+    [i, s]
+    """
+
+    assert input_eval(input).inspect() == "[100000, 100000]"
+
+
+def test_stream_eval():
+    square = "var sq = func(x) { x * x };"
+    tests = [
+        (square + "map(sq, range(0, 3))", "stream"),
+        (square + "collect(map(sq, range(0, 4)))", "[0, 1, 4, 9]"),
+        ("collect(filter(func(x) { x > 1 }, range(0, 4)))", "[2, 3]"),
+        ("take(range(0, 100), 3)", "range(0, 3)"),
+        ("take([1, 2, 3], 2)", "[1, 2]"),
+        (square + "collect(take(map(sq, range(0, 1000000000)), 3))", "[0, 1, 4]"),
+        ("sum(range(1, 101))", "5050"),
+        ("sum(map(func(x) { x }, range(1, 101)))", "5050"),
+        ("reduce(func(a, x) { a + x }, range(0, 5), 0)", "10"),
+        (
+            "var s = 0; for (x in map(func(x) { 2 * x }, range(0, 4))) { var s = s + x }; s",
+            "12",
+        ),
+        ("var s = map(func(x) { x }, range(0, 3)); collect(s); collect(s)", "[]"),
+        ("collect(map(func(x) { 1 / x }, range(-2, 2)))", "Fault: can not divide by zero"),
+        ("sum(map(func(x) { 1 / x }, range(-2, 2)))", "Fault: can not divide by zero"),
+        (
+            "for (x in map(func(x) { 1 / x }, range(0, 2))) { x }",
+            "Fault: can not divide by zero",
+        ),
+        ("collect([1])", "Fault: collect does not support ARRAY"),
+        ("take(1, 1)", "Fault: take does not support INTEGER"),
+        (
+            'lines("/nonexistent/file")',
+            "Fault: lines: No such file or directory: /nonexistent/file",
+        ),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_spawn_await_eval():
+    tests = [
+        ("var f = func(x) { x * 2 }; var t = spawn f(21); await t", "42"),
+        ("await spawn len([1, 2])", "2"),
+        ("spawn len([])", "task"),
+        ("await spawn sleep(0)", "Null"),
+        (
+            "var f = func() { 1 / 0 }; var t = spawn f(); 5; await t",
+            "Fault: can not divide by zero",
+        ),
+        ("spawn f(1)", "Fault: func name f is not defined"),
+        ("spawn len(1 / 0)", "Fault: can not divide by zero"),
+        ("await 1", "Fault: INTEGER can not be awaited"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_read_eval(tmp_path):
+    path = tmp_path / "note.txt"
+    path.write_text("slow\nsloth", encoding="utf-8")
+
+    assert input_eval(f'read("{path}")').inspect() == '"slow\nsloth"'
+    assert input_eval(f'len(read("{path}"))').inspect() == "10"
+    assert input_eval("read(1)").inspect() == "Fault: read does not support INTEGER"
+
+
+def test_lines_stream_eval(tmp_path):
+    path = tmp_path / "words.txt"
+    path.write_text("alpha\nbeta\ngamma\n", encoding="utf-8")
+    tests = [
+        (f'collect(lines("{path}"))', '["alpha", "beta", "gamma"]'),
+        (f'collect(take(lines("{path}"), 1))', '["alpha"]'),
+        (
+            f'collect(filter(func(l) {{ len(l) > 4 }}, lines("{path}")))',
+            '["alpha", "gamma"]',
+        ),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
@@ -0,0 +1,90 @@
+from sloth.builtins import BUILTINS, expose
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO
+from sloth.ffi import ConversionError, from_python, to_python
+from sloth.objects import NULL, TRUE, Array, Environment, Fault, Integer, String
+from sloth.parser import Parser
+
+
+def ffi_eval(input_: str):
+    program = Parser.from_input(input_).parse_program()
+    return evaluate(program, Environment())
+
+
+def test_python_values_roundtrip():
+    tests = [1, "sloth", True, None, [1, "a", [False]], {"a": 1, 2: [3]}, []]
+
+    for value in tests:
+        assert to_python(from_python(value)) == value
+
+    assert from_python(True) is TRUE
+    assert from_python(None) is NULL
+    assert from_python((1, 2)) == Array.from_iterable([Integer(1), Integer(2)])
+    assert from_python(String("kept")) == String("kept")
+
+
+def test_unconvertible_values():
+    tests = [
+        (from_python, object()),
+        (from_python, {(1, 2): 1}),
+        (to_python, Fault("boom")),
+    ]
+
+    for convert, value in tests:
+        try:
+            convert(value)
+        except ConversionError:
+            continue
+        raise AssertionError(f"{value!r} was converted")
+
+
+def test_expose_python_callables():
+    def repeat(text: str, times: int) -> str:
+        return text * times
+
+    def first(values, default=None):
+        return values[0]
+
+    expose(repeat)
+    expose(first, name="head", pure=False)
+    expose(lambda *values: sum(values), name="total", arity=3)
+    try:
+        assert BUILTINS["repeat"].arity == 2
+        assert not BUILTINS["repeat"].pure
+        assert not BUILTINS["head"].pure
+
+        tests = [
+            ('repeat("ab", 3)', String("ababab")),
+            ("head([4, 5])", Integer(4)),
+            ("total(1, 2, 3)", Integer(6)),
+            ("repeat(3, 3)", Fault("repeat does not support INTEGER")),
+            ('repeat("a")', Fault("arguments passed 1, but arguments expected 2")),
+            ("head([])", Fault("head: list index out of range")),
+        ]
+        for input_, expected in tests:
+            assert ffi_eval(input_) == expected
+    finally:
+        for name in ("repeat", "head", "total"):
+            del BUILTINS[name]
+
+
+def test_expose_needs_arity_for_variadic_callables():
+    try:
+        expose(lambda *values: values, name="variadic")
+    except ValueError:
+        assert "variadic" not in BUILTINS
+    else:
+        raise AssertionError("arity was inferred")
+
+
+def test_exposed_callables_are_not_memoized(monkeypatch):
+    monkeypatch.setattr(MEMO, "enabled", True)
+    ticks = iter(range(100))
+
+    expose(lambda: next(ticks), name="tick", arity=0)
+    try:
+        assert ffi_eval("var now = func() { tick() }; [now(), now(), now()]") == (
+            Array.from_iterable([Integer(0), Integer(1), Integer(2)])
+        )
+    finally:
+        del BUILTINS["tick"]
@@ -0,0 +1,34 @@
+from sloth.frames import FramePool
+from sloth.objects import Environment, Integer
+
+ZERO = Integer(0)
+
+
+def test_frame_pool_recycles_by_arity():
+    pool = FramePool()
+    env = Environment()
+
+    frame = pool.acquire(env, ("a",), [Integer(1)])
+    assert frame["a"] == Integer(1)
+    assert (pool.hits, pool.misses) == (0, 1)
+
+    pool.release(frame)
+    assert pool.acquire(env, ("a", "b"), [ZERO, ZERO]) is not frame
+
+    again = pool.acquire(env, ("b",), [Integer(2)])
+    assert again is frame
+    assert "a" not in again
+    assert again["b"] == Integer(2)
+    assert (pool.hits, pool.misses) == (1, 2)
+
+
+def test_frame_pool_keeps_escaped_frames():
+    pool = FramePool()
+
+    frame = pool.acquire(Environment(), ("a",), [Integer(1)])
+    frame.escaped = True
+    pool.release(frame)
+
+    assert frame["a"] == Integer(1)
+    assert pool.acquire(Environment(), ("a",), [Integer(2)]) is not frame
+
@@ -0,0 +1,76 @@
+from sloth.ast import CallExpression, ExpressionStatement
+from sloth.evaluation import evaluate
+from sloth.objects import Environment, Fault, Integer
+from sloth.parser import Parser
+
+
+def call_site(input_: str) -> CallExpression:
+    stmt = Parser.from_input(input_).parse_program().statements[0]
+    assert isinstance(stmt, ExpressionStatement)
+    assert isinstance(stmt.expression, CallExpression)
+    return stmt.expression
+
+
+def define(input_: str) -> Environment:
+    env = Environment()
+    evaluate(Parser.from_input(input_).parse_program(), env)
+    return env
+
+
+def test_inline_cache_hits_until_rebound():
+    env = define("var one = func() { 1 }")
+    call = call_site("one()")
+
+    assert evaluate(call, env) == Integer(1)
+    assert evaluate(call, env) == Integer(1)
+    assert (call.inline_cache.hits, call.inline_cache.misses) == (1, 1)
+
+    evaluate(Parser.from_input("var one = func() { 2 }").parse_program(), env)
+    assert evaluate(call, env) == Integer(2)
+    assert call.inline_cache.misses == 2
+
+
+def test_inline_cache_sees_shadowing_scopes():
+    env = define("var one = func() { 1 }")
+    call = call_site("one()")
+    child = env.child()
+
+    assert evaluate(call, child) == Integer(1)
+    child["one"] = define("var one = func() { 3 }")["one"]
+    assert evaluate(call, child) == Integer(3)
+
+
+def test_inline_cache_inside_function_bodies():
+    input_ = """
+    var double = func(a) { a * 2 };
+    var apply = func(f, a) { f(a) };
+    var quad = func(a) { double(double(a)) };
+    var triple = func(a) { a * 3 };
+    apply(double, 1) + apply(triple, 1) + quad(1) + quad(2);
+    """
+
+    program = Parser.from_input(input_).parse_program()
+    assert evaluate(program, Environment()) == Integer(2 + 3 + 4 + 8)
+
+
+def test_inline_cache_survives_loop_rebinding():
+    input_ = """
+    var inc = func(a) { a + 1 };
+    var i = 0;
+    while (i < 100) { var i = inc(i) };
+    """
+    program = Parser.from_input(input_).parse_program()
+    evaluate(program, Environment())
+
+    call = program.statements[2].body.body[0].value
+    assert (call.inline_cache.hits, call.inline_cache.misses) == (99, 1)
+
+
+def test_inline_cache_faults():
+    env = define("var one = func() { 1 }; var x = 5")
+
+    assert evaluate(call_site("one(1)"), env) == Fault(
+        "arguments passed 1, but arguments expected []"
+    )
+    assert evaluate(call_site("x()"), env) == Fault("x is not a function")
+    assert evaluate(call_site("nope()"), env) == Fault("func name nope is not defined")
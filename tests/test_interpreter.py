@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sloth import CompiledProgram, CompileError, Interpreter
+from sloth.evaluation import evaluate
+from sloth.machine import StackEvaluator
+from sloth.memo import MEMO
+from sloth.objects import Fault, Integer, make_integer
+from sloth.unboxed import evaluate_unboxed
+
+PRELUDE = """
+var double = func(x) { x * 2 };
+var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+"""
+
+
+def test_compiled_program_runs_with_bindings():
+    interpreter = Interpreter()
+    interpreter.load(PRELUDE)
+    program = interpreter.compile("double(n) + len(name)")
+    assert isinstance(program, CompiledProgram)
+
+    tests = (
+        ({"n": 1, "name": "ab"}, 4),
+        ({"n": 20, "name": ""}, 40),
+        ({"n": make_integer(5), "name": "abc"}, 13),
+    )
+
+    for bindings, expected in tests:
+        assert program.run(bindings) == Integer(expected)
+    assert program.run() == Fault("name n is not defined")
+
+
+def test_runs_are_isolated():
+    interpreter = Interpreter()
+    interpreter.load("var total = 0;")
+    program = interpreter.compile(
+        "var total = total + n; var helper = func() { total }; helper()"
+    )
+
+    for n in (1, 2, 3):
+        assert program.run({"n": n}) == Integer(n)
+    assert interpreter.run("total") == Integer(0)
+    assert interpreter.run("helper") == Fault("name helper is not defined")
+
+
+def test_runs_see_rebindings(monkeypatch):
+    monkeypatch.setattr(MEMO, "enabled", True)
+    for evaluator in (evaluate, evaluate_unboxed, StackEvaluator().evaluate):
+        interpreter = Interpreter(evaluator)
+        source = "var k = 2; var f = func(x) { x * k }; var k = 3; f(1)"
+        assert interpreter.run(source) == Integer(3)
+
+        interpreter.load("var k = 2; var f = func(x) { x * k };")
+        program = interpreter.compile("f(1)")
+        assert program.run() == Integer(2)
+        interpreter.load("var k = 10;")
+        assert program.run() == Integer(10)
+
+
+def test_compile_reports_parse_errors():
+    interpreter = Interpreter()
+    with pytest.raises(CompileError) as info:
+        interpreter.compile("var = 1;")
+    assert info.value.errors
+
+
+def test_load_raises_on_fault():
+    interpreter = Interpreter()
+    with pytest.raises(ValueError):
+        interpreter.load("missing(1)")
+
+
+def test_interpreter_evaluators():
+    for evaluator in (evaluate_unboxed, StackEvaluator().evaluate):
+        interpreter = Interpreter(evaluator)
+        interpreter.load(PRELUDE)
+        program = interpreter.compile("fib(n)")
+        assert [program.run({"n": n}) for n in (10, 15)] == [
+            Integer(55),
+            Integer(610),
+        ]
+
+
+def test_bindings_across_evaluators():
+    tests = (
+        ("if (b) { 1 } else { 2 }", {"b": False}, "2"),
+        ("if (b) { 1 } else { 2 }", {"b": True}, "1"),
+        ("if (n) { 1 } else { 2 }", {"n": 0}, "2"),
+        ("if (n) { 1 } else { 2 }", {"n": make_integer(0)}, "2"),
+        ("!b", {"b": True}, "False"),
+        ("-n", {"n": 4}, "-4"),
+        ('s + "!"', {"s": "hi"}, '"hi!"'),
+        ("len(a) + a[0]", {"a": [5, 6]}, "7"),
+    )
+
+    for evaluator in (evaluate, evaluate_unboxed, StackEvaluator().evaluate):
+        interpreter = Interpreter(evaluator)
+        for source, bindings, expected in tests:
+            assert interpreter.run(source, bindings).inspect() == expected, source
+
+
+def test_compiled_program_runs_from_threads():
+    interpreter = Interpreter()
+    interpreter.load(PRELUDE)
+    program = interpreter.compile("var a = fib(n); double(a)")
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda n: program.run({"n": n % 12}), range(48)))
+    fibs = [0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89]
+    assert results == [Integer(2 * fibs[n % 12]) for n in range(48)]
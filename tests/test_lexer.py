@@ -142,3 +142,69 @@ def test_bool():
     ]
 
     validate_input(input_, expected)
+
+
+def test_brackets():
+    input_ = "[1, 2][0]"
+
+    expected = [
+        (TokenType.LBRACKET, "["),
+        (TokenType.INT, "1"),
+        (TokenType.COMMA, ","),
+        (TokenType.INT, "2"),
+        (TokenType.RBRACKET, "]"),
+        (TokenType.LBRACKET, "["),
+        (TokenType.INT, "0"),
+        (TokenType.RBRACKET, "]"),
+    ]
+
+    validate_input(input_, expected)
+
+
+def test_colon():
+    input_ = '{"a": 1}'
+
+    expected = [
+        (TokenType.LBRACE, "{"),
+        (TokenType.STRING, "a"),
+        (TokenType.COLON, ":"),
+        (TokenType.INT, "1"),
+        (TokenType.RBRACE, "}"),
+    ]
+
+    validate_input(input_, expected)
+
+
+def test_loop_keywords():
+    input_ = "while (x) { } for (i in y) { }"
+
+    expected = [
+        (TokenType.WHILE, "while"),
+        (TokenType.LPAREN, "("),
+        (TokenType.IDENT, "x"),
+        (TokenType.RPAREN, ")"),
+        (TokenType.LBRACE, "{"),
+        (TokenType.RBRACE, "}"),
+        (TokenType.FOR, "for"),
+        (TokenType.LPAREN, "("),
+        (TokenType.IDENT, "i"),
+        (TokenType.IN, "in"),
+        (TokenType.IDENT, "y"),
+        (TokenType.RPAREN, ")"),
+    ]
+
+    validate_input(input_, expected)
+
+
+def test_task_keywords():
+    input_ = "await spawn f()"
+
+    expected = [
+        (TokenType.AWAIT, "await"),
+        (TokenType.SPAWN, "spawn"),
+        (TokenType.IDENT, "f"),
+        (TokenType.LPAREN, "("),
+        (TokenType.RPAREN, ")"),
+    ]
+
+    validate_input(input_, expected)
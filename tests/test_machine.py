@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+from sloth.builtins import expose
+from sloth.evaluation import evaluate
+from sloth.machine import StackEvaluator
+from sloth.objects import Environment, Fault, Integer
+from sloth.parser import Parser
+
+
+def stack_eval(input_: str, max_depth: int = 100_000):
+    program = Parser.from_input(input_).parse_program()
+    return StackEvaluator(max_depth).evaluate(program, Environment())
+
+
+def recursive_eval(input_: str):
+    program = Parser.from_input(input_).parse_program()
+    return evaluate(program, Environment())
+
+
+def async_eval(input_: str, max_depth: int = 100_000):
+    program = Parser.from_input(input_).parse_program()
+    evaluator = StackEvaluator(max_depth)
+    return asyncio.run(evaluator.evaluate_async(program, Environment()))
+
+
+def test_stack_evaluator_matches_evaluate():
+    tests = [
+        "5",
+        "!-5",
+        "(5 + 5) * 2 == 20",
+        '"Iva" + " and " + "Marti"',
+        "if (5 < 2) { 10 } else { 5 }",
+        "3 * 3; return 10; 8 * 8",
+        "if (10 > 1) { if (10 > 1) { return 10; } return 1; }",
+        "var f = func(x) { if (x > 1) { return x * 2; }; x }; [f(1), f(5)]",
+        "var loop = func(n, acc) {"
+        "    if (n == 0) { return acc; }; return loop(n - 1, acc + 1)"
+        "}; loop(3, 0)",
+        "2 / 0",
+        "var x = 5; var y = x + 5; y",
+        "var sum = func(a, b) { return a + b }; sum(sum(1, 2), 3)",
+        "var adder = func(a) { func(b) { a + b } }; var addTwo = adder(2); addTwo(3)",
+        "undefined",
+        "[1, 2 * 2, 3][1]",
+        "var a = push([1], 2); len(a) + a[1]",
+        "filter(func(x) { x > 1 }, [1, 2, 3])",
+        '{"a": 1, 2: [3]}[2]',
+        "var i = 0; while (i < 50) { var i = i + 1 }; i",
+        "var f = func() { var i = 0;"
+        "while (i < 9) { if (i == 3) { return i }; var i = i + 1 }; 99 }; f()",
+        "var f = func() { for (x in range(0, 9)) { return x + 7 }; 99 }; f()",
+        "var s = 0; for (x in [1, 2, 3]) { var s = s + x }; s",
+        "var s = 0; for (x in map(func(x) { x * 2 }, range(0, 3))) { var s = s + x }; s",
+        "for (x in map(func(x) { 1 / x }, range(0, 3))) { x }",
+        "var f = func(a) { a }; f(1, 2)",
+        "var x = 1; var mk = func() { var g = func() { x }; var x = 5; g() }; mk()",
+        "var f = func(x) { x + 1 }; var t = spawn f(1); await t",
+        "await spawn sleep(1)",
+        "var f = func() { 1 / 0 }; await spawn f()",
+    ]
+
+    for input_ in tests:
+        assert stack_eval(input_) == recursive_eval(input_)
+
+
+def test_async_evaluator_matches_evaluate():
+    tests = [
+        "(5 + 5) * 2 == 20",
+        "var sum = func(a, b) { return a + b }; sum(sum(1, 2), 3)",
+        "var f = func(x) { x + 1 }; var t = spawn f(1); await t",
+        "var f = func(x) { sleep(1); x }; [await spawn f(1), await spawn f(2)]",
+        "await spawn len([1, 2])",
+        "await spawn sleep(1)",
+        "var f = func() { 1 / 0 }; var t = spawn f(); await t",
+        "var t = spawn len(1); var u = t; [await t, await u]",
+        "await 5",
+    ]
+
+    for input_ in tests:
+        assert async_eval(input_) == recursive_eval(input_)
+
+
+def test_async_tasks_wait_concurrently():
+    input_ = """
+    var work = func(i) { sleep(200); i };
+    var tasks = [];
+    for (i in range(0, 20)) { var tasks = push(tasks, spawn work(i)) };
+    var s = 0; for (t in tasks) { var s = s + await t }; s
+    """
+
+    start = time.perf_counter()
+    assert async_eval(input_) == Integer(190)
+    # Twenty sleeps one after the other take four seconds
+    assert time.perf_counter() - start < 2
+
+
+def test_async_evaluation_waits_for_unawaited_tasks():
+    finished = []
+    expose(finished.append, name="finish_task", arity=1, pure=False)
+    input_ = """
+    var later = func(i) { sleep(20); finish_task(i) };
+    spawn later(1); spawn later(2);
+    0
+    """
+
+    assert async_eval(input_) == Integer(0)
+    assert sorted(finished) == [1, 2]
+
+
+def test_async_tasks_get_their_own_depth():
+    input_ = """
+    var down = func(n) { if (n == 0) { 0 } else { down(n - 1) + 0 } };
+    var a = spawn down(40); var b = spawn down(40);
+    [await a, await b]
+    """
+
+    assert async_eval(input_, max_depth=50).inspect() == "[0, 0]"
+
+    evaluated = async_eval(input_ + "; await spawn down(60)", max_depth=50)
+    assert isinstance(evaluated, Fault)
+    assert "maximum recursion depth" in evaluated.message
+
+
+def test_stack_evaluator_deep_recursion():
+    input_ = """
+    var sum = func(n) { if (n == 0) { 0 } else { n + sum(n - 1) } };
+    sum(20000);
+    """
+
+    assert stack_eval(input_) == Integer(200010000)
+
+
+def test_stack_evaluator_tail_calls_do_not_count_depth():
+    input_ = """
+    var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };
+    count(5000, 0);
+    """
+
+    assert stack_eval(input_, max_depth=10) == Integer(5000)
+
+
+def test_stack_evaluator_max_depth_fault():
+    input_ = """
+    var down = func(n) { if (n == 0) { 0 } else { down(n - 1) + 0 } };
+    down(100);
+    """
+
+    evaluated = stack_eval(input_, max_depth=50)
+    assert isinstance(evaluated, Fault)
+    assert "maximum recursion depth" in evaluated.message
@@ -0,0 +1,123 @@
+from sloth.evaluation import evaluate
+from sloth.memo import MEMO, LRUCache, Memoizer
+from sloth.objects import Builtin, Environment, Integer
+from sloth.parser import Parser
+
+
+def define(input_: str) -> Environment:
+    env = Environment()
+    evaluate(Parser.from_input(input_).parse_program(), env)
+    return env
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (3, 1, 1, 2)
+
+    cache.resize(1)
+    assert len(cache) == 1
+    assert cache.get("c") == 3
+
+
+def test_purity():
+    env = define(
+        """
+        var add = func(a, b) { a + b };
+        var twice = func(a) { add(a, a) };
+        var apply = func(f, a) { f(a) };
+        var indirect = func(a) { apply(add, a) };
+        var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+        var even = func(n) { if (n == 0) { true } else { odd(n - 1) } };
+        var odd = func(n) { if (n == 0) { false } else { even(n - 1) } };
+        var broken = func(n) { missing(n) };
+        var uses = func(n) { broken(n) };
+        """
+    )
+    memo = Memoizer()
+
+    tests = [
+        ("add", True),
+        ("twice", True),
+        ("apply", False),
+        ("indirect", False),
+        ("fib", True),
+        ("even", True),
+        ("odd", True),
+        ("broken", False),
+        ("uses", False),
+    ]
+
+    for name, expected in tests:
+        assert memo.is_pure(env[name]) is expected
+
+
+def test_memoizer_key():
+    env = define("var add = func(a, b) { a + b }; var apply = func(f) { f(1) };")
+    memo = Memoizer()
+    assert memo.key(env["add"], [Integer(1), Integer(2)]) is None
+
+    memo.configure(enabled=True)
+
+    assert memo.key(env["add"], [Integer(1), Integer(2)]) is not None
+    assert memo.key(env["apply"], [env["add"]]) is None
+
+    memo.configure(enabled=False)
+    assert memo.key(env["add"], [Integer(1), Integer(2)]) is None
+
+
+def test_memoized_calls_see_rebindings(monkeypatch):
+    monkeypatch.setattr(MEMO, "enabled", True)
+    MEMO.clear()
+    tests = (
+        ("var x = 1; var f = func() { x }; f(); var x = 2; f()", 2),
+        (
+            """
+            var h = func(x) { x + 1 };
+            var g = func(x) { h(x) };
+            var a = g(1);
+            var h = func(x) { x + 100 };
+            g(1)
+            """,
+            101,
+        ),
+        (
+            """
+            var k = 2;
+            var h = func(x) { x * k };
+            var g = func(x) { h(x) + 1 };
+            var a = g(1);
+            var k = 10;
+            g(1)
+            """,
+            11,
+        ),
+        ("var f = func(x) { x + 1 }; var a = f(1); var f = func(x) { x }; f(1)", 1),
+    )
+
+    for input_, expected in tests:
+        assert evaluate(Parser.from_input(input_).parse_program(), Environment()) == (
+            Integer(expected)
+        ), input_
+
+
+def test_purity_follows_rebound_callees():
+    env = define("var h = func(x) { x }; var g = func(x) { h(x) };")
+    memo = Memoizer()
+    assert memo.is_pure(env["g"])
+
+    calls = []
+    env["h"] = Builtin("h", 1, lambda x: calls.append(x) or x, pure=False)
+    assert not memo.is_pure(env["g"])
+
+    env["h"] = Builtin("h", 1, lambda x: x, pure=True)
+    assert memo.is_pure(env["g"])
@@ -0,0 +1,93 @@
+from sloth import numeric
+from sloth.numeric import NumArray, apply_elementwise
+from sloth.objects import Boolean, Fault, Integer
+
+
+def test_numarray_elementwise_operators():
+    left = NumArray.from_values([6, 4, 2])
+    right = NumArray.from_values([3, 2, 1])
+
+    tests = [
+        ("+", [9, 6, 3]),
+        ("-", [3, 2, 1]),
+        ("*", [18, 8, 2]),
+        ("/", [2, 2, 2]),
+        ("==", [0, 0, 0]),
+        ("!=", [1, 1, 1]),
+        (">", [1, 1, 1]),
+        ("<", [0, 0, 0]),
+    ]
+
+    for operator, expected in tests:
+        result = apply_elementwise(operator, left, right)
+        assert result == NumArray.from_values(expected)
+
+
+def test_numarray_broadcasts_scalars():
+    array = NumArray.from_values([1, 2, 3])
+
+    tests = [
+        (("-", array, Integer(1)), [0, 1, 2]),
+        (("-", Integer(1), array), [0, -1, -2]),
+        (("/", Integer(7), array), [7, 3, 2]),
+    ]
+
+    for arguments, expected in tests:
+        assert apply_elementwise(*arguments) == NumArray.from_values(expected)
+
+
+def test_numarray_faults():
+    array = NumArray.from_values([1, 2])
+
+    tests = [
+        (("/", array, Integer(0)), "can not divide by zero"),
+        (("/", Integer(1), NumArray.from_values([1, 0])), "can not divide by zero"),
+        (("+", array, NumArray.from_values([1])), "NUMARRAY sizes 2 and 1 differ"),
+        (("+", array, Boolean(True)), "NUMARRAY and BOOLEAN can not be combined"),
+        (("+", array, Integer(10**20)), "NUMARRAY element overflow"),
+        (("-", Integer(-(10**20)), array), "NUMARRAY element overflow"),
+    ]
+
+    for arguments, expected in tests:
+        assert apply_elementwise(*arguments) == Fault(expected)
+
+
+def test_numarray_constructors():
+    assert NumArray.range(2, 5) == NumArray.from_values([2, 3, 4])
+    assert NumArray.filled(7, 2) == NumArray.from_values([7, 7])
+    assert NumArray.range(0, 10).slice(8, 20) == NumArray.from_values([8, 9])
+    assert NumArray.range(0, 101).sum() == 5050
+    assert NumArray.from_values([-1, 5]).inspect() == "numarray([-1, 5])"
+
+
+def _check_overflow():
+    big = NumArray.filled(2**62, 2)
+    tests = [
+        ("+", big, big),
+        ("*", NumArray.from_values([2**62, 1]), Integer(4)),
+        ("-", NumArray.from_values([-(2**62), 0]), Integer(2**62 + 1)),
+        ("/", NumArray.from_values([-(2**63), 4]), Integer(-1)),
+        ("+", NumArray.from_values([1, 2]), Integer(10**20)),
+    ]
+
+    for operator, left, right in tests:
+        assert apply_elementwise(operator, left, right) == Fault(
+            "NUMARRAY element overflow"
+        )
+
+    # Near the bound, yet exact
+    assert apply_elementwise(
+        "*", NumArray.from_values([2**61, -3]), Integer(3)
+    ) == NumArray.from_values([3 * 2**61, -9])
+    assert NumArray.from_values([2**63 - 1, 1]).sum() == 2**63
+    assert NumArray.from_values([-(2**63), -1, 5]).sum() == -(2**63) + 4
+    assert NumArray.range(0, 101).sum() == 5050
+
+
+def test_numarray_overflow():
+    _check_overflow()
+
+
+def test_numarray_overflow_without_numpy(monkeypatch):
+    monkeypatch.setattr(numeric, "numpy", None)
+    _check_overflow()
@@ -0,0 +1,152 @@
+import pickle
+
+from sloth.objects import (
+    ROPE_MIN_LENGTH,
+    VIEW_MIN_LENGTH,
+    Environment,
+    Hash,
+    Integer,
+    String,
+    StringPool,
+    make_integer,
+    make_string,
+)
+from sloth.persistent import PersistentMap
+
+
+def test_environment_child_resolves_outer():
+    env = Environment()
+    env["x"] = Integer(1)
+
+    child = env.child()
+    child["y"] = Integer(2)
+
+    assert child["x"] == Integer(1)
+    assert child["y"] == Integer(2)
+    assert "y" not in env
+    assert "x" in child
+
+
+def test_environment_child_shadows_outer():
+    env = Environment()
+    env["x"] = Integer(1)
+
+    child = env.child()
+    child["x"] = Integer(2)
+
+    assert child["x"] == Integer(2)
+    assert env["x"] == Integer(1)
+
+
+def test_environment_copy_is_isolated():
+    env = Environment()
+    env["x"] = Integer(1)
+    child = env.child()
+    child["y"] = Integer(2)
+
+    snapshot = child.copy()
+    child["y"] = Integer(3)
+    env["x"] = Integer(4)
+    snapshot["z"] = Integer(5)
+
+    assert snapshot.outer is env
+    assert snapshot["x"] == Integer(4)
+    assert snapshot["y"] == Integer(2)
+    assert child["y"] == Integer(3)
+    assert "z" not in child
+
+
+def test_environment_copy_of_deep_chain():
+    env = Environment()
+    env["x"] = Integer(1)
+    for _ in range(10_000):
+        env = env.child()
+
+    snapshot = env.copy()
+    assert snapshot.outer is env.outer
+    assert snapshot["x"] == Integer(1)
+
+
+def test_small_integers_are_shared():
+    assert make_integer(0) is make_integer(0)
+    assert make_integer(-5) is make_integer(-5)
+    assert make_integer(256) is make_integer(256)
+    assert make_integer(1000) == Integer(1000)
+    assert make_integer(1000) is not make_integer(1000)
+
+
+def test_string_pool_is_bounded():
+    pool = StringPool(max_size=2, max_length=3)
+
+    assert pool.intern("a") is pool.intern("a")
+    assert pool.intern("long") is not pool.intern("long")
+    assert pool.intern("b") is pool.intern("b")
+    assert pool.intern("c") == String("c")
+    assert pool.intern("c") is not pool.intern("c")
+    assert len(pool) == 2
+
+
+def test_interned_equality():
+    assert make_string("") is make_string("")
+    assert make_string("sloth") == String("sloth")
+    assert Integer(1) != String("1")
+
+
+def test_string_concat_builds_ropes():
+    short = String.concat(String("ab"), String("c"))
+    assert short == String("abc")
+    assert short is make_string("abc")
+
+    piece = String("x" * ROPE_MIN_LENGTH)
+    rope = String.concat(String.concat(piece, String("y")), piece)
+    assert rope._value is None
+    assert rope.length == 2 * ROPE_MIN_LENGTH + 1
+    assert rope == String("x" * ROPE_MIN_LENGTH + "y" + "x" * ROPE_MIN_LENGTH)
+    assert rope._value is not None
+    assert String.concat(piece, String("")) is piece
+
+
+def test_deep_rope_flattens_and_behaves_like_a_string():
+    text = String("")
+    for i in range(50_000):
+        text = String.concat(text, String(str(i % 10)))
+
+    expected = "".join(str(i % 10) for i in range(50_000))
+    assert text.value == expected
+    assert hash(text) == hash(String(expected))
+    assert text.inspect() == f'"{expected}"'
+    assert pickle.loads(pickle.dumps(text)) == text
+
+
+def test_string_slices_are_views():
+    text = "".join(chr(ord("a") + i % 26) for i in range(10 * VIEW_MIN_LENGTH))
+    string = String(text)
+
+    view = string.slice(5, -5)
+    assert not view.is_flat
+    assert view._buffer() == (text, 5)
+    assert view.length == len(text) - 10
+
+    nested = view.slice(VIEW_MIN_LENGTH, 3 * VIEW_MIN_LENGTH)
+    assert nested._buffer() == (text, 5 + VIEW_MIN_LENGTH)
+    assert nested.char_at(0) == text[5 + VIEW_MIN_LENGTH]
+    assert nested.find(String(text[100:110])) == text.find(text[100:110], 69) - 69
+    assert nested.find(String("0")) == -1
+    assert nested == String(text[5 + VIEW_MIN_LENGTH : 5 + 3 * VIEW_MIN_LENGTH])
+    assert nested.is_flat and nested._lazy is None
+
+    assert string.slice(0, 3) is make_string(text[:3])
+    assert string.slice(0, len(text)) is string
+    assert string.slice(10, 5) == String("")
+
+
+def test_environment_copy_shares_hash_values():
+    env = Environment()
+    env["table"] = Hash(PersistentMap.from_items([(Integer(1), Integer(1))]))
+
+    snapshot = env.copy()
+    env["table"] = Hash(env["table"].pairs.set(Integer(2), Integer(2)))
+
+    assert len(snapshot["table"].pairs) == 1
+    assert len(env["table"].pairs) == 2
+    assert snapshot.copy()["table"] is snapshot["table"]
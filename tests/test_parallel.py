@@ -0,0 +1,85 @@
+import pickle
+
+from sloth.evaluation import evaluate
+from sloth.builtins import BUILTINS, expose
+from sloth.objects import Environment, Function
+from sloth.parallel import portable
+from sloth.parser import Parser
+
+
+def input_eval(input_: str, env: Environment | None = None):
+    program = Parser.from_input(input_).parse_program()
+    return evaluate(program, Environment() if env is None else env)
+
+
+FIB = "var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };"
+
+
+def test_parallel_map_eval():
+    tests = [
+        (
+            FIB + "parallel_map(fib, range(0, 12))",
+            "[0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89]",
+        ),
+        ("var k = 3; parallel_map(func(x) { x * k }, [1, 2, 3])", "[3, 6, 9]"),
+        ('parallel_map(func(s) { s + "!" }, ["a", "b"])', '["a!", "b!"]'),
+        ("parallel_map(len, [[1], [1, 2], {}])", "[1, 2, 0]"),
+        ("parallel_map(abs, [-1, 2, -3])", "[1, 2, 3]"),
+        ('var up = upper; parallel_map(func(s) { up(s) }, ["a", "b"])', '["A", "B"]'),
+        ("parallel_map(func(x) { x }, [])", "[]"),
+        (
+            "parallel_map(func(x) { 10 / x }, [1, 2, 0, 4])",
+            "Fault: can not divide by zero",
+        ),
+        ("parallel_map(func(x) { x }, 1)", "Fault: parallel_map does not support INTEGER"),
+    ]
+
+    for input, expected in tests:
+        assert input_eval(input).inspect() == expected
+
+
+def test_parallel_map_keeps_order_across_chunks():
+    evaluated = input_eval("parallel_map(func(x) { x * x }, range(0, 500))")
+
+    assert [element.value for element in evaluated.elements] == [
+        x * x for x in range(500)
+    ]
+
+
+def test_parallel_map_unpicklable_closure():
+    input_ = 'var s = lines("{path}"); parallel_map(func(x) {{ s }}, [1])'
+
+    evaluated = input_eval(input_.format(path=__file__))
+    assert evaluated.inspect() == (
+        "Fault: parallel_map: cannot pickle 'generator' object"
+    )
+
+
+def test_portable_keeps_only_read_names():
+    env = Environment()
+    unused = 'var unused = lines("%s");' % __file__
+    input_eval(FIB + unused + "var k = 2; var g = func(n) { fib(n) * k }", env)
+
+    copy = portable(env["g"])
+    assert sorted(copy.env) == ["fib", "k"]
+    assert type(copy.env["fib"]) is Function
+    assert copy.env["fib"].env["fib"] is copy.env["fib"]
+
+    restored = pickle.loads(pickle.dumps(copy))
+    assert restored.env["fib"].env["fib"] is restored.env["fib"]
+
+
+def test_builtins_pickle_by_name():
+    for name in ("abs", "len", "upper"):
+        assert pickle.loads(pickle.dumps(BUILTINS[name])) is BUILTINS[name]
+
+
+def test_parallel_map_builtin_exposed_in_this_process_only():
+    expose(lambda x: x * 10, name="tenfold", arity=1)
+    try:
+        evaluated = input_eval("parallel_map(tenfold, [1, 2])")
+    finally:
+        del BUILTINS["tenfold"]
+    assert evaluated.inspect() == (
+        "Fault: parallel_map: builtin tenfold is not registered here"
+    )
@@ -2,19 +2,26 @@ from dataclasses import dataclass
 import builtins
 
 from sloth.ast import (
+    ArrayLiteral,
+    AwaitExpression,
     BlockStatement,
     BooleanLiteral,
     CallExpression,
     Expression,
     ExpressionStatement,
+    ForStatement,
     FunctionLiteral,
+    HashLiteral,
     Identifier,
+    IndexExpression,
     InfixExpression,
     IntegerLiteral,
     PrefixExpression,
     ReturnStatement,
+    SpawnExpression,
     StringLiteral,
     VarStatement,
+    WhileStatement,
     IfElseExpression,
 )
 from sloth.parser import Parser
@@ -222,6 +229,44 @@ def test_call_expression_parser():
     assert str(exp) == "add(3, (2 * 3), (4 + 5))"
 
 
+def test_array_literal_parser():
+    parser = Parser.from_input("[1, 2 * 2, 3 + 3]; []")
+    program = parser.parse_program()
+
+    assert len(program.statements) == 2
+    array = program.statements[0].expression
+    assert isinstance(array, ArrayLiteral)
+    assert [str(element) for element in array.elements] == ["1", "(2 * 2)", "(3 + 3)"]
+
+    empty = program.statements[1].expression
+    assert isinstance(empty, ArrayLiteral)
+    assert empty.elements == []
+
+
+def test_index_expression_parser():
+    parser = Parser.from_input("numbers[1 + 1]")
+    program = parser.parse_program()
+
+    index = program.statements[0].expression
+    assert isinstance(index, IndexExpression)
+    assert str(index.left) == "numbers"
+    assert str(index.index) == "(1 + 1)"
+
+
+def test_hash_literal_parser():
+    tests = [
+        ("{}", []),
+        ('{"one": 1, "two": 2}', [("one", "1"), ("two", "2")]),
+        ("{1 + 1: a * 2, true: [1]}", [("(1 + 1)", "(a * 2)"), ("true", "[1]")]),
+    ]
+
+    for input_, expected in tests:
+        program = Parser.from_input(input_).parse_program()
+        hash_ = program.statements[0].expression
+        assert isinstance(hash_, HashLiteral)
+        assert [(str(key), str(value)) for key, value in hash_.pairs] == expected
+
+
 def test_function_literal_parser():
     input_ = """func(x, y) { 
         x + y
@@ -420,9 +465,68 @@ def test_operator_precedence():
         ("a * (b / c)", "(a * (b / c))"),
         ("a * (b + c)", "(a * (b + c))"),
         ("a * (b + c) / d", "((a * (b + c)) / d)"),
+        ("a * [1, 2, 3][b * c] * d", "((a * ([1, 2, 3][(b * c)])) * d)"),
+        ("add(a[1], b[2])", "add((a[1]), (b[2]))"),
     ]
 
     for input_, expected in tests:
         parser = Parser.from_input(input_)
         program = parser.parse_program()
         assert str(program) == expected
+
+
+def test_while_statement_parser():
+    input_ = """while (i < 10) {
+        var i = i + 1;
+    }; i"""
+
+    parser = Parser.from_input(input_)
+    program = parser.parse_program()
+
+    assert not parser.errors
+    assert len(program.statements) == 2
+
+    loop = program.statements[0]
+    assert isinstance(loop, WhileStatement)
+    assert loop.token.type == TokenType.WHILE
+    assert str(loop.condition) == "(i < 10)"
+    assert len(loop.body.body) == 1
+    assert str(loop) == "while (i < 10) { var i = (i + 1); }"
+
+
+def test_for_statement_parser():
+    input_ = "for (x in range(0, n)) { total(x) }"
+
+    parser = Parser.from_input(input_)
+    program = parser.parse_program()
+
+    assert not parser.errors
+    loop = program.statements[0]
+    assert isinstance(loop, ForStatement)
+    assert loop.name.value == "x"
+    assert str(loop.iterable) == "range(0, n)"
+    assert str(loop) == "for (x in range(0, n)) { total(x) }"
+
+
+def test_spawn_await_parser():
+    input_ = "var t = spawn fetch(url, 1); await t + 1"
+
+    parser = Parser.from_input(input_)
+    program = parser.parse_program()
+
+    assert not parser.errors
+    spawn = program.statements[0].value
+    assert isinstance(spawn, SpawnExpression)
+    assert isinstance(spawn.call, CallExpression)
+    assert str(spawn) == "(spawn fetch(url, 1))"
+
+    sum_ = program.statements[1].expression
+    assert isinstance(sum_.left, AwaitExpression)
+    assert str(sum_) == "((await t) + 1)"
+
+
+def test_spawn_needs_a_call():
+    parser = Parser.from_input("spawn 1 + 2")
+    parser.parse_program()
+
+    assert [str(error) for error in parser.errors] == ["spawn expects a call, got 1"]
@@ -0,0 +1,101 @@
+import random
+
+from sloth.persistent import PersistentMap, PersistentVector
+
+
+def test_persistent_vector_append_and_get():
+    for size in (0, 1, 31, 32, 33, 1024, 1056, 1057, 40000):
+        vector = PersistentVector()
+        for i in range(size):
+            vector = vector.append(i)
+
+        assert len(vector) == size
+        assert list(vector) == list(range(size))
+        assert all(vector[i] == i for i in range(0, size, 7))
+        assert vector == PersistentVector.from_iterable(range(size))
+
+
+def test_persistent_vector_from_iterable_appends():
+    for size in (0, 32, 33, 1024, 1056, 1057, 33000):
+        vector = PersistentVector.from_iterable(range(size))
+        grown = vector.append(size).append(size + 1)
+
+        assert list(grown) == list(range(size + 2))
+        assert len(vector) == size
+
+
+def test_persistent_vector_set_shares_structure():
+    original = PersistentVector.from_iterable(range(2000))
+    updated = original.set(5, "five").set(1999, "last")
+
+    assert original[5] == 5
+    assert original[1999] == 1999
+    assert updated[5] == "five"
+    assert updated[1999] == "last"
+    assert updated._root[1] is original._root[1]
+
+
+def test_persistent_vector_bounds():
+    vector = PersistentVector.from_iterable([1, 2])
+
+    for index in (-1, 2):
+        try:
+            vector[index]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError(f"{index} should be out of range")
+
+
+class _Key:
+    """Key with a chosen hash, to force collisions"""
+
+    def __init__(self, name: int, hash_: int) -> None:
+        self.name = name
+        self.hash = hash_
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Key) and self.name == other.name
+
+
+def test_persistent_map_matches_dict():
+    rnd = random.Random(38)
+    for _ in range(50):
+        # Few distinct hashes, hashes differing only in high bits, and random ones
+        keys = []
+        for i in range(rnd.randrange(1, 200)):
+            hashes = (rnd.randrange(4), rnd.randrange(64) << 30, rnd.getrandbits(40))
+            keys.append(_Key(i, rnd.choice(hashes)))
+        mapping = PersistentMap()
+        expected: dict = {}
+        for _ in range(400):
+            key = rnd.choice(keys)
+            if rnd.random() < 0.3:
+                mapping = mapping.delete(key)
+                expected.pop(key, None)
+            else:
+                value = rnd.randrange(10)
+                mapping = mapping.set(key, value)
+                expected[key] = value
+            assert len(mapping) == len(expected)
+
+        assert dict(mapping.items()) == expected
+        assert all(mapping.get(key) == expected.get(key) for key in keys)
+        assert mapping == PersistentMap.from_items(expected.items())
+
+
+def test_persistent_map_updates_share_structure():
+    original = PersistentMap.from_items((i, i) for i in range(10_000))
+    updated = original.set(5, "five").delete(7)
+
+    assert original[5] == 5 and 7 in original
+    assert updated[5] == "five" and 7 not in updated
+    assert len(original) == 10_000
+    assert len(updated) == 9_999
+    assert original.set(5, 5) is original
+    assert original.delete("missing") is original
+    shared = zip(original._root.entries, updated._root.entries)
+    assert sum(a is b for a, b in shared) >= 30
@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sloth.evaluation import evaluate
+from sloth.objects import Environment
+from sloth.parser import Parser
+from sloth.scheduler import evaluate_parallel
+
+
+class CountingPool:
+    """Runs jobs on threads and counts them, in place of a WorkerPool"""
+
+    def __init__(self) -> None:
+        self.submitted = 0
+        self._executor = ThreadPoolExecutor(2)
+
+    def start(self) -> "CountingPool":
+        return self
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        return self._executor.submit(fn, *args)
+
+
+def parallel_eval(input_: str, pool: CountingPool | None = None):
+    program = Parser.from_input(input_).parse_program()
+    env = Environment()
+    result = evaluate_parallel(program, env, pool or CountingPool())
+    return result, env
+
+
+def sequential_eval(input_: str):
+    program = Parser.from_input(input_).parse_program()
+    env = Environment()
+    return evaluate(program, env), env
+
+
+DOUBLE = "var double = func(x) { x * 2 };"
+
+
+def test_parallel_evaluation_matches_evaluate():
+    tests = [
+        "5",
+        DOUBLE + "var a = double(1); var b = double(2); a + b",
+        DOUBLE + "var a = double(1); var a = double(a); a",
+        DOUBLE + "var a = double(1); var k = 3; var b = double(k); [a, b, k]",
+        DOUBLE + "var a = double(1); var b = double(2); return a; b",
+        DOUBLE + "var a = double(1); if (a > 1) { return a; }; double(3)",
+        DOUBLE + "var a = double(1); var b = 1 / 0; var c = double(2)",
+        DOUBLE + "var a = double(0) / 0; var b = missing; var c = double(2)",
+        DOUBLE + 'var a = double(1); var b = halve(2); var c = sleep(0); a',
+        DOUBLE + "var a = double(1); for (i in range(0, 3)) { var a = a + i }; a",
+        "var f = func() { func(x) { x } }; var g = f(); var h = f(); g(1) + h(2)",
+        "var k = 1; var f = func(x) { x + k }; var a = f(1); var k = 10; f(1) + a",
+    ]
+
+    for input_ in tests:
+        result, env = parallel_eval(input_)
+        expected, expected_env = sequential_eval(input_)
+        assert result.inspect() == expected.inspect()
+        assert env.inspect() == expected_env.inspect()
+
+
+def test_independent_statements_run_in_workers():
+    input_ = """
+    var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+    var a = fib(10);
+    var b = fib(11);
+    var c = fib(12);
+    var total = a + b + c;
+    var d = fib(total / 100);
+    var e = fib(4);
+    [total, d, e]
+    """
+    pool = CountingPool()
+
+    result, _ = parallel_eval(input_, pool)
+    assert result.inspect() == "[288, 1, 3]"
+    # a, b and c in one batch, then d and e once total is bound
+    assert pool.submitted == 5
+
+
+def test_impure_calls_are_not_shipped():
+    pool = CountingPool()
+
+    parallel_eval('var a = upper("x"); var b = sleep(0); var c = read("/")', pool)
+    assert pool.submitted == 0
+
+
+def test_first_fault_in_program_order_wins():
+    input_ = """
+    var f = func(x) { 1 / x };
+    var g = func(x) { "s" - "t" };
+    var a = f(0);
+    var b = g(1);
+    """
+    pool = CountingPool()
+
+    result, env = parallel_eval(input_, pool)
+    assert result.inspect() == "Fault: can not divide by zero"
+    assert "a" not in env and "b" not in env
+    assert pool.submitted == 2
+
+
+def test_worker_processes_evaluate_batches():
+    input_ = DOUBLE + "var a = double(1); var b = double(2); [a, b]"
+    program = Parser.from_input(input_).parse_program()
+
+    assert evaluate_parallel(program, Environment()).inspect() == "[2, 4]"
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from sloth.evaluation import evaluate
+from sloth.frames import FramePool
+from sloth.memo import LRUCache
+from sloth.objects import VIEW_MIN_LENGTH, Environment, Integer, String
+from sloth.parser import Parser
+
+SHARED = """
+var fib = func(n) { if (n < 2) { n } else { fib(n - 1) + fib(n - 2) } };
+var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };
+"""
+
+
+def test_threads_share_functions_and_ast():
+    shared = Environment()
+    evaluate(Parser.from_input(SHARED).parse_program(), shared)
+    input_ = "var a = fib(12); var b = count(300, a); b"
+    program = Parser.from_input(input_).parse_program()
+
+    def run(_: int) -> int:
+        return evaluate(program, shared.child()).value
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(run, range(64)))
+    assert results == [144 + 300] * 64
+
+
+def test_frame_pool_lists_are_per_thread():
+    pool = FramePool()
+    env = Environment()
+    released = threading.Event()
+
+    def release_elsewhere() -> None:
+        pool.release(pool.acquire(env, ("a",), [Integer(1)]))
+        released.set()
+
+    thread = threading.Thread(target=release_elsewhere)
+    thread.start()
+    thread.join()
+    assert released.is_set()
+
+    frame = pool.acquire(env, ("a",), [Integer(2)])
+    pool.release(frame)
+    assert pool.acquire(env, ("b",), [Integer(3)]) is frame
+    assert (pool.hits, pool.misses) == (1, 2)
+
+
+def test_lru_cache_shared_between_threads():
+    cache = LRUCache(16)
+
+    def churn(offset: int) -> None:
+        for i in range(2000):
+            key = (offset + i) % 64
+            cache.put(key, key)
+            assert cache.get(key, key) == key
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(churn, range(8)))
+    assert cache.stats().size == 16
+
+
+def test_lazy_strings_read_from_threads():
+    text = "".join(chr(ord("a") + i % 26) for i in range(10 * VIEW_MIN_LENGTH))
+    for _ in range(20):
+        rope = String("")
+        for i in range(200):
+            rope = String.concat(rope, String(text[i : i + VIEW_MIN_LENGTH]))
+        view = String(text).slice(3, -3)
+        barrier = threading.Barrier(8)
+
+        def read(i: int) -> tuple:
+            barrier.wait()
+            if i % 2:
+                return view.char_at(VIEW_MIN_LENGTH), view.value
+            return rope.length, rope.value
+
+        with ThreadPoolExecutor(8) as pool:
+            results = set(pool.map(read, range(8)))
+
+        expected = "".join(text[i : i + VIEW_MIN_LENGTH] for i in range(200))
+        assert results == {
+            (len(expected), expected),
+            (text[3 + VIEW_MIN_LENGTH], text[3:-3]),
+        }
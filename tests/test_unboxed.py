@@ -0,0 +1,125 @@
+from sloth.evaluation import evaluate
+from sloth.objects import Environment, Integer, String
+from sloth.parser import Parser
+from sloth.unboxed import box, evaluate_unboxed, unbox
+
+
+def unboxed_eval(input_: str):
+    program = Parser.from_input(input_).parse_program()
+    return evaluate_unboxed(program, Environment())
+
+
+def boxed_eval(input_: str):
+    program = Parser.from_input(input_).parse_program()
+    return evaluate(program, Environment())
+
+
+def test_unboxed_matches_boxed():
+    tests = [
+        "5",
+        "-10",
+        "!5",
+        "!!false",
+        "-true",
+        "(5 + 5) / 2 * 3 - 1",
+        "4 < 5",
+        "(4 + 1) != 5",
+        "(2 < 1) != true",
+        "true == false",
+        '"Iva" + " and " + "Marti"',
+        "if (0) { 10 } else { 5 }",
+        "if (5 < 2) { 10 }",
+        "3 * 3; return 10; 8 * 8",
+        "var f = func(x) { if (x > 1) { return x * 2; }; x }; [f(1), f(5)]",
+        "var loop = func(n, acc) {"
+        "    if (n == 0) { return acc; }; return loop(n - 1, acc + 1)"
+        "}; loop(3, 0)",
+        "2 / 0",
+        "true < false",
+        '"a" - "b"',
+        "var x = 5; var y = x * 2; y",
+        "missing",
+        "var sum = func(a, b) { return a + b }; sum(sum(1, 2), 3)",
+        "var adder = func(a) { func(b) { a + b } }; var addTwo = adder(2); addTwo(3)",
+        "var f = func() { 2 / 0 }; f() + 1",
+        "var x = 1; x(2)",
+        "[1, 2 * 2, true][1]",
+        "len(push([1, 2], 3))",
+        "[1][5]",
+        "5[0]",
+        "true[0]",
+        "var n = 3; n[1]",
+        "[1, 2][true]",
+        '"abc"[1]',
+        'var s = "abc"; s[1]',
+        '"abc"[3]',
+        '("ab" + "cd")[2]',
+        "map(func(x) { x + 1 }, [1, 2])",
+        '{"a": 1 + 1, true: "yes"}["a"]',
+        "len(put({1: 2}, 3, 4))",
+        "var i = 0; while (i < 50) { var i = i + 1 }; i",
+        "var f = func() { var i = 0;"
+        "while (i < 9) { if (i == 3) { return i }; var i = i + 1 }; 99 }; f()",
+        "var f = func() { for (x in range(0, 9)) { return x + 7 }; 99 }; f()",
+        'var s = ""; for (c in "abc") { var s = c + s }; s',
+        "var s = 0; for (x in range(0, 10)) { var s = s + x }; s",
+        "for (x in [1, 0]) { 1 / x }",
+        "var f = func(x) { x * 2 }; var t = spawn f(21); [await t, await t]",
+        "await spawn len([1, 2])",
+        "await 5",
+        "var s = 0; for (x in take(map(func(x) { x * 2 }, range(0, 9)), 3)) { var s = s + x }; s",
+        "for (x in filter(func(x) { 1 / x }, range(0, 3))) { x }",
+        'var s = "%s"; len(s + s + "!")' % ("x" * 300),
+        'var s = "%s"; s + "!"' % ("x" * 300),
+        "var x = 1; var mk = func() { var g = func() { x }; var x = 5; g() }; mk()",
+        'var s = slice("%s", 1, -1); [len(s), find(s, "y"), s[0]]' % ("x" * 300 + "y"),
+    ]
+
+    for input_ in tests:
+        unboxed = unboxed_eval(input_)
+        boxed = boxed_eval(input_)
+        assert unboxed == boxed
+        assert unboxed.inspect() == boxed.inspect()
+
+
+def test_unboxed_tail_calls():
+    input_ = """
+    var count = func(n, acc) { if (n == 0) { acc } else { count(n - 1, acc + 1) } };
+    count(5000, 0);
+    """
+
+    assert unboxed_eval(input_) == Integer(5000)
+
+
+def test_unboxed_callbacks_from_builtins():
+    tests = (
+        ("var k = 2; map(func(x) { x * k }, [1, 2])", "[2, 4]"),
+        ("var k = 3; reduce(func(a, x) { a + x * k }, [1, 2], 0)", "9"),
+        (
+            "var k = 1; var s = 0;"
+            "for (x in filter(func(x) { x > k }, range(0, 5))) { var s = s + x }; s",
+            "9",
+        ),
+        ('var p = "a"; map(func(x) { p + x }, ["b", "c"])', '["ab", "ac"]'),
+    )
+
+    for input_, expected in tests:
+        assert unboxed_eval(input_).inspect() == expected
+        assert boxed_eval(input_).inspect() == expected
+
+
+def test_box_unbox_roundtrip():
+    for raw in (1, "sloth", True, False):
+        assert unbox(box(raw)) == raw
+        assert type(unbox(box(raw))) is type(raw)
+
+    assert box("a") == String("a")
+
+
+def test_unboxed_environment_holds_raw_values():
+    env = Environment()
+    env["x"] = 41
+
+    program = Parser.from_input("var y = x + 1; y").parse_program()
+    assert evaluate_unboxed(program, env) == Integer(42)
+    assert env["y"] == 42